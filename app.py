@@ -3,15 +3,11 @@ import os
 import json
 import pandas as pd
 import io
-from fatura_analiz_motoru import FaturaAnalizMotoru
-
-# Geçici dosyaların kaydedileceği klasör
-UPLOAD_DIR = "temp_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+from fatura_analiz_motoru import ayarlardan_motor_olustur
 
 st.set_page_config(layout="wide", page_title="Akıllı Fatura Tanıma Sistemi")
 
-def display_results(results: dict, source_path: str | None = None):
+def display_results(results: dict):
     """Analiz sonuçlarını Streamlit arayüzünde gösterir."""
     
     st.subheader("Çıkarılan Yapılandırılmış Veri")
@@ -62,16 +58,9 @@ def display_results(results: dict, source_path: str | None = None):
 
     # Debug görselini (varsa) göster
     with st.expander("Debug Görselini Göster (Bölge İşaretleri)"):
-        debug_img_path = None
-        try:
-            if source_path:
-                base = os.path.splitext(os.path.basename(source_path))[0]
-                candidate = os.path.join("test_reports", "debug_images", f"debug_{base}.png")
-                if os.path.exists(candidate):
-                    debug_img_path = candidate
-        except Exception:
-            debug_img_path = None
-        if debug_img_path:
+        # Motor görselin yolunu döndürür (ad, içerik özetini taşır; aynı adlı yüklemeler çakışmaz)
+        debug_img_path = results.get("debug_gorsel_yolu")
+        if debug_img_path and os.path.exists(debug_img_path):
             st.image(debug_img_path, caption=os.path.basename(debug_img_path), use_column_width=True)
         else:
             st.write("Debug görseli bulunamadı.")
@@ -120,43 +109,41 @@ def main():
     """)
 
     uploaded_file = st.file_uploader(
-        "Analiz etmek için bir fatura dosyası seçin (PDF, PNG, JPG)",
-        type=["pdf", "png", "jpg", "jpeg"]
+        "Analiz etmek için bir fatura dosyası seçin (PDF, PNG, JPG, TIFF)",
+        type=["pdf", "png", "jpg", "jpeg", "tif", "tiff", "bmp"]
     )
 
     if uploaded_file is not None:
-        # Dosyayı geçici olarak kaydet
-        temp_path = os.path.join(UPLOAD_DIR, uploaded_file.name)
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-
         st.success(f"'{uploaded_file.name}' dosyası başarıyla yüklendi.")
         
         if st.button("Faturayı Analiz Et", type="primary"):
             with st.spinner("Fatura analiz ediliyor... Bu işlem biraz zaman alabilir."):
                 try:
-                    # Tesseract yolunu config'den oku
-                    tesseract_path = None
+                    # Tesseract yolu ve diğer motor ayarlarını config'den oku
+                    config = {}
                     try:
                         with open('config.json', 'r', encoding='utf-8') as f:
                             config = json.load(f)
-                        tesseract_path = config.get('tesseract_cmd_path')
                     except FileNotFoundError:
                         st.warning("config.json bulunamadı, varsayılan Tesseract yolu kullanılacak.")
 
                     # Analiz motorunu başlat ve çalıştır
-                    analiz_motoru = FaturaAnalizMotoru(tesseract_cmd_path=tesseract_path)
-                    results = analiz_motoru.analiz_et(temp_path)
+                    # (arayüz debug görselini gösterdiği için varsayılan olarak açık)
+                    analiz_motoru = ayarlardan_motor_olustur(config, debug_gorsel=config.get('debug_gorsel', True))
+                    try:
+                        # Yüklenen içerik diske yazılmadan, bellekten analiz edilir
+                        results = analiz_motoru.analiz_et(uploaded_file.getvalue(), dosya_adi=uploaded_file.name)
+                        # Arka planda yazılan debug görselinin hazır olmasını bekle
+                        analiz_motoru.hata_ayiklama_bekle()
+                    finally:
+                        # Her analizde yeni motor kurulduğundan OCR iş parçacıkları bırakılmalı
+                        analiz_motoru.kapat()
                     
                     st.divider()
-                    display_results(results, source_path=temp_path)
+                    display_results(results)
 
                 except Exception as e:
                     st.error(f"Analiz sırasında beklenmedik bir hata oluştu: {e}")
-                finally:
-                    # Geçici dosyayı sil
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,366 @@
+import io
+import os
+import struct
+import hashlib
+import logging
+import threading
+from typing import List, Dict, Optional, Any, Tuple, Union, BinaryIO
+import numpy as np
+# cv2, fitz (PyMuPDF) ve pdfplumber ağır modüllerdir; başlangıç süresini
+# kısaltmak için yalnızca onları kullanan yollarda içe aktarılırlar
+from kelime_dizisi import KelimeDizisi
+from sonuc_onbellegi import dosya_ozeti
+
+# PyMuPDF iş parçacığı güvenli değildir; arka plan debug yazıcısı ile ana akış
+# aynı süreçte fitz kullanabildiği için tüm fitz çağrıları bu kilitle sıralanır.
+FITZ_KILIDI = threading.Lock()
+
+# Analiz edilebilir belge kaynağı: dosya yolu, bellekteki baytlar ya da okunabilir dosya nesnesi
+BelgeKaynagi = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+GORUNTU_UZANTILARI = ('.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp')
+# Görüntü dosyalarında çözünürlük bilgisi okunmadığından piksel -> pt dönüşümünde varsayılan
+VARSAYILAN_GORUNTU_DPI = 300
+_GORUNTU_IMZALARI = (b'\x89PNG', b'\xff\xd8\xff', b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+', b'BM')
+
+
+def _tiff_basligi(veri: Any) -> Optional[Tuple[str, bool]]:
+    """(bayt sırası, BigTIFF mi); TIFF değilse None."""
+    bayt_sirasi = {b'II': '<', b'MM': '>'}.get(bytes(veri[:2]))
+    if bayt_sirasi is None:
+        return None
+    surum = struct.unpack_from(bayt_sirasi + 'H', veri, 2)[0]
+    return (bayt_sirasi, surum == 43) if surum in (42, 43) else None
+
+
+def tiff_kare_konumlari(veri: Any) -> List[int]:
+    """
+    TIFF'in sayfa (IFD) konumlarını piksel verisini çözmeden, IFD zincirini
+    izleyerek döndürür. Klasik TIFF ve BigTIFF desteklenir; `veri` bayt
+    dizisi ya da bellek eşlemli dosya olabilir.
+    """
+    baslik = _tiff_basligi(veri)
+    if baslik is None:
+        return []
+    bayt_sirasi, big = baslik
+    if not big:
+        sayac_bicimi, konum_bicimi, giris_boyutu = 'H', 'I', 12
+        konum = struct.unpack_from(bayt_sirasi + 'I', veri, 4)[0]
+    else:
+        sayac_bicimi, konum_bicimi, giris_boyutu = 'Q', 'Q', 20
+        konum = struct.unpack_from(bayt_sirasi + 'Q', veri, 8)[0]
+    sayac_boyutu = struct.calcsize(sayac_bicimi)
+    konumlar: List[int] = []
+    gorulenler = set()
+    try:
+        while konum and konum not in gorulenler:
+            gorulenler.add(konum)
+            giris_sayisi = struct.unpack_from(bayt_sirasi + sayac_bicimi, veri, konum)[0]
+            konumlar.append(konum)
+            konum = struct.unpack_from(bayt_sirasi + konum_bicimi, veri, konum + sayac_boyutu + giris_sayisi * giris_boyutu)[0]
+    except struct.error:
+        pass  # bozuk zincir: okunabilen sayfalar kadar
+    return konumlar
+
+
+def tiff_sayfa_sayisi(veri: Any) -> int:
+    """TIFF'in sayfa sayısı (bkz. `tiff_kare_konumlari`)."""
+    return len(tiff_kare_konumlari(veri))
+
+
+def tiff_karesini_coz(tampon: np.ndarray, sayfa_no: int) -> Optional[np.ndarray]:
+    """
+    Tampondaki TIFF'in yalnızca `sayfa_no` karesini çözer. Başlıktaki ilk
+    IFD konumu istenen kareye çevrilir; imdecode yalnızca ilk kareyi
+    okuduğundan diğer kareler hiç çözülmez. `tampon` yazılabilir olmalıdır
+    (kopya ya da yazıldığında kopyalanan bellek eşlemi).
+    """
+    import cv2
+    if sayfa_no:
+        konumlar = tiff_kare_konumlari(tampon)
+        if sayfa_no >= len(konumlar):
+            return None
+        bayt_sirasi, big = _tiff_basligi(tampon)
+        struct.pack_into(bayt_sirasi + ('Q' if big else 'I'), tampon, 8 if big else 4, konumlar[sayfa_no])
+    return cv2.imdecode(tampon, cv2.IMREAD_COLOR)
+
+
+class BelgeOturumu:
+    """
+    Tek bir belge için açılan pdfplumber/fitz nesnelerini ve ara çıktıları
+    (sayfa kelimeleri, render edilmiş sayfa görüntüleri) paylaşan oturum.
+
+    Dosya her kütüphane ile en fazla bir kez açılır; analiz aşamaları aynı
+    oturumu kullanarak tekrar açma/ayrıştırma maliyetinden kaçınır.
+
+    Kaynak bir dosya yolu, bayt dizisi ya da dosya nesnesi olabilir; bellekteki
+    içerik pdfplumber'a BytesIO, fitz'e `stream` olarak verilir, diske yazılmaz.
+    `dosya_adi` bellekteki içeriğin türünü (uzantı) ve raporlardaki adını belirler.
+
+    Görüntü dosyaları (PNG/JPG/BMP/TIFF) doğrudan OpenCV ile çözülür; çok
+    sayfalı TIFF'lerde her sayfa istendiğinde tek kare olarak okunur, dosyanın
+    tamamı belleğe açılmaz. Piksel boyutları `goruntu_dpi` varsayılarak sayfa
+    birimine çevrilir.
+    """
+
+    def __init__(self, kaynak: BelgeKaynagi, logger: Optional[logging.Logger] = None, dosya_adi: Optional[str] = None,
+                 goruntu_dpi: int = VARSAYILAN_GORUNTU_DPI):
+        self.logger = logger or logging.getLogger(__name__)
+        self.dosya_yolu: Optional[str] = None
+        self.veri: Optional[bytes] = None
+        if isinstance(kaynak, (str, os.PathLike)):
+            self.dosya_yolu = os.fspath(kaynak)
+        elif isinstance(kaynak, (bytes, bytearray, memoryview)):
+            self.veri = bytes(kaynak)
+        else:
+            self.veri = kaynak.read()
+        self.dosya_adi = dosya_adi or self.dosya_yolu or ''
+        self.uzanti = os.path.splitext(self.dosya_adi)[1].lower()
+        if self.uzanti:
+            self.pdf_mi = self.uzanti == '.pdf'
+            self.goruntu_mu = self.uzanti in GORUNTU_UZANTILARI
+        else:
+            # Adı bilinmeyen bellek içeriğinde tür imzadan anlaşılır
+            self.pdf_mi = self.veri is not None and self.veri[:5] == b'%PDF-'
+            self.goruntu_mu = self.veri is not None and self.veri.startswith(_GORUNTU_IMZALARI)
+        self.goruntu_dpi = goruntu_dpi or VARSAYILAN_GORUNTU_DPI
+        self._kare_sayisi: Optional[int] = None
+        self._son_kare: Optional[Tuple[Tuple[int, int], Optional[np.ndarray]]] = None  # bölge kırpımları için son çözülen kare
+        self._ozet: Optional[str] = None
+        self._pdf = None
+        self._pdf_acilamadi = False
+        self._fitz_belgesi = None
+        self._fitz_acilamadi = False
+        self._kelimeler: Dict[int, Tuple[KelimeDizisi, Tuple[float, float]]] = {}
+        self._goruntuler: Dict[Tuple[int, int], np.ndarray] = {}
+
+    @property
+    def kaynak(self) -> Union[str, bytes]:
+        """Belgeyi yeniden açmak için yol ya da baytlar (ör. arka plan iş parçacıkları için)."""
+        return self.dosya_yolu if self.dosya_yolu is not None else self.veri
+
+    def icerik_ozeti(self) -> str:
+        """İçeriğin SHA-256 özeti (bir kez hesaplanır)."""
+        if self._ozet is None:
+            if self.veri is not None:
+                self._ozet = hashlib.sha256(self.veri).hexdigest()
+            else:
+                self._ozet = dosya_ozeti(self.dosya_yolu)
+        return self._ozet
+
+    def __enter__(self) -> 'BelgeOturumu':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.kapat()
+
+    def kapat(self) -> None:
+        if self._pdf is not None:
+            try:
+                self._pdf.close()
+            except Exception:
+                pass
+            self._pdf = None
+        if self._fitz_belgesi is not None:
+            try:
+                with FITZ_KILIDI:
+                    self._fitz_belgesi.close()
+            except Exception:
+                pass
+            self._fitz_belgesi = None
+        self._goruntuler.clear()
+        self._son_kare = None
+
+    @property
+    def pdf(self) -> Optional[Any]:
+        """pdfplumber belgesi (ilk erişimde bir kez açılır)."""
+        if self._pdf is None and self.pdf_mi and not self._pdf_acilamadi:
+            try:
+                import pdfplumber
+                self._pdf = pdfplumber.open(io.BytesIO(self.veri) if self.veri is not None else self.dosya_yolu)
+            except Exception as e:
+                self._pdf_acilamadi = True
+                self.logger.warning(f"Pdfplumber belgeyi açamadı: {e}.")
+        return self._pdf
+
+    @property
+    def fitz_belgesi(self) -> Optional[Any]:
+        """PyMuPDF belgesi (ilk erişimde bir kez açılır)."""
+        if self._fitz_belgesi is None and not self._fitz_acilamadi:
+            try:
+                import fitz  # PyMuPDF
+                with FITZ_KILIDI:
+                    if self.veri is not None:
+                        tur = self.uzanti.lstrip('.') or ('pdf' if self.pdf_mi else None)
+                        self._fitz_belgesi = fitz.open(stream=self.veri, filetype=tur)
+                    else:
+                        self._fitz_belgesi = fitz.open(self.dosya_yolu)
+            except Exception as e:
+                self._fitz_acilamadi = True
+                self.logger.error(f"PDF sayfası görüntüye dönüştürülürken hata: {e}")
+        return self._fitz_belgesi
+
+    @property
+    def sayfa_sayisi(self) -> int:
+        pdf = self.pdf
+        if pdf is None:
+            return 0
+        try:
+            return len(pdf.pages)
+        except Exception as e:
+            self.logger.warning(f"Pdfplumber sayfa sayısını okuyamadı: {e}.")
+            return 0
+
+    def sayfa_kelimeleri(self, sayfa_no: int = 0) -> Tuple[KelimeDizisi, Tuple[float, float]]:
+        """Sayfadaki kelimeleri koordinatlarıyla döndürür; sonuç oturum boyunca saklanır."""
+        if sayfa_no in self._kelimeler:
+            return self._kelimeler[sayfa_no]
+        words = KelimeDizisi.sozluklerden([])
+        page_size = (0.0, 0.0)
+        try:
+            pdf = self.pdf
+            if pdf is not None and sayfa_no < len(pdf.pages):
+                page = pdf.pages[sayfa_no]
+                words = KelimeDizisi.sozluklerden(page.extract_words(x_tolerance=2))
+                page_size = (page.width, page.height)
+        except Exception as e:
+            self.logger.warning(f"Pdfplumber kelime çıkaramadı: {e}.")
+        self._kelimeler[sayfa_no] = (words, page_size)
+        return words, page_size
+
+    def render_edildi_mi(self, sayfa_no: int = 0) -> bool:
+        """Sayfanın bu oturumda herhangi bir DPI ile render edilip edilmediği."""
+        return any(s == sayfa_no for (s, _) in self._goruntuler)
+
+    @property
+    def goruntu_sayfa_sayisi(self) -> int:
+        """Render edilebilir sayfa sayısı (görüntü dosyalarında kare sayısı)."""
+        if self.goruntu_mu:
+            return self._goruntu_kare_sayisi()
+        doc = self.fitz_belgesi
+        return len(doc) if doc is not None else 0
+
+    def _tiff_mi(self) -> bool:
+        if self.uzanti:
+            return self.uzanti in ('.tif', '.tiff')
+        return self.veri is not None and self.veri[:4] in (b'II*\x00', b'MM\x00*', b'II+\x00', b'MM\x00+')
+
+    def _goruntu_kare_sayisi(self) -> int:
+        if self._kare_sayisi is None:
+            try:
+                if not self._tiff_mi():
+                    self._kare_sayisi = 1
+                elif self.veri is not None:
+                    self._kare_sayisi = tiff_sayfa_sayisi(self.veri)
+                else:
+                    import cv2
+                    self._kare_sayisi = cv2.imcount(self.dosya_yolu)
+                    if self._kare_sayisi == 0:
+                        # OpenCV bazı yolları (ör. Windows'ta ASCII dışı) açamaz; IFD zincirinden say
+                        self._kare_sayisi = tiff_sayfa_sayisi(np.memmap(self.dosya_yolu, dtype=np.uint8, mode='r'))
+            except Exception as e:
+                self.logger.error(f"Görüntü sayfa sayısı okunamadı: {e}")
+                self._kare_sayisi = 0
+        return self._kare_sayisi
+
+    def _goruntu_karesi(self, sayfa_no: int) -> Optional[np.ndarray]:
+        """Görüntü dosyasının tek bir karesini (BGR, doğal çözünürlük) çözer."""
+        import cv2
+        if self._tiff_mi():
+            if self.veri is None:
+                ok, kareler = cv2.imreadmulti(self.dosya_yolu, sayfa_no, 1, flags=cv2.IMREAD_COLOR)
+                if ok and kareler:
+                    return kareler[0]
+                # OpenCV yolu açamadı (ör. Windows'ta ASCII dışı): dosya belleğe okunmadan,
+                # yazıldığında kopyalanan bellek eşlemi üzerinden tek kare çözülür
+                return tiff_karesini_coz(np.memmap(self.dosya_yolu, dtype=np.uint8, mode='c'), sayfa_no)
+            tampon = np.frombuffer(self.veri, dtype=np.uint8)
+            try:
+                ok, kareler = cv2.imdecodemulti(tampon, cv2.IMREAD_COLOR, range=(sayfa_no, sayfa_no + 1))
+            except TypeError:
+                # `range` desteklemeyen OpenCV (< 4.10): tüm kareleri çözmek yerine başlığı değiştirilmiş kopyadan
+                return tiff_karesini_coz(tampon.copy(), sayfa_no)
+            return kareler[0] if ok and kareler else None
+        if sayfa_no != 0:
+            return None
+        # np.fromfile + imdecode: ASCII dışı yollarda da çalışır
+        tampon = np.frombuffer(self.veri, dtype=np.uint8) if self.veri is not None else np.fromfile(self.dosya_yolu, dtype=np.uint8)
+        return cv2.imdecode(tampon, cv2.IMREAD_COLOR)
+
+    def sayfa_goruntusu(self, sayfa_no: int = 0, dpi: int = 300, sakla: bool = True) -> Optional[np.ndarray]:
+        """
+        Sayfayı BGR görüntü olarak döndürür. Aynı sayfa daha yüksek DPI ile
+        zaten render edilmişse yeniden rasterleştirmek yerine o görüntü küçültülür.
+        `sakla=False` ile render oturumda tutulmaz (çok sayfalı OCR'da bellek için).
+        """
+        anahtar = (sayfa_no, dpi)
+        if anahtar in self._goruntuler:
+            return self._goruntuler[anahtar].copy()
+        ust_dpiler = sorted(d for (s, d) in self._goruntuler if s == sayfa_no and d > dpi)
+        if ust_dpiler:
+            import cv2
+            kaynak = self._goruntuler[(sayfa_no, ust_dpiler[0])]
+            oran = dpi / ust_dpiler[0]
+            yeni_boyut = (max(1, int(round(kaynak.shape[1] * oran))), max(1, int(round(kaynak.shape[0] * oran))))
+            img = cv2.resize(kaynak, yeni_boyut, interpolation=cv2.INTER_AREA)
+            if not sakla:
+                return img
+            self._goruntuler[anahtar] = img
+            return img.copy()
+        try:
+            img = self._goruntuyu_olcekle(sayfa_no, dpi) if self.goruntu_mu else self._pdf_sayfasini_render_et(sayfa_no, dpi)
+            if img is None: return None
+            if not sakla:
+                return img
+            self._goruntuler[anahtar] = img
+            return img.copy()
+        except Exception as e:
+            self.logger.error(f"PDF sayfası görüntüye dönüştürülürken hata: {e}")
+            return None
+
+    def bolge_goruntusu(self, sayfa_no: int, kutu: Tuple[float, float, float, float], dpi: int) -> Optional[np.ndarray]:
+        """
+        Sayfanın yalnızca `kutu` (pt) alanını verilen DPI ile BGR görüntü olarak
+        döndürür. PDF'lerde fitz `clip` ile sadece bu alan rasterleştirilir;
+        görüntü dosyalarında ölçeklenmiş kare bir kez çözülüp kırpılır.
+        """
+        try:
+            if not self.goruntu_mu:
+                return self._pdf_sayfasini_render_et(sayfa_no, dpi, kutu)
+            if self._son_kare is None or self._son_kare[0] != (sayfa_no, dpi):
+                self._son_kare = ((sayfa_no, dpi), self._goruntuyu_olcekle(sayfa_no, dpi))
+            kare = self._son_kare[1]
+            if kare is None: return None
+            olcek = dpi / 72.0
+            x0, y0 = max(0, int(kutu[0] * olcek)), max(0, int(kutu[1] * olcek))
+            x1, y1 = min(kare.shape[1], int(np.ceil(kutu[2] * olcek))), min(kare.shape[0], int(np.ceil(kutu[3] * olcek)))
+            if x1 <= x0 or y1 <= y0: return None
+            return kare[y0:y1, x0:x1].copy()
+        except Exception as e:
+            self.logger.error(f"Sayfa bölgesi görüntüye dönüştürülürken hata: {e}")
+            return None
+
+    def _goruntuyu_olcekle(self, sayfa_no: int, dpi: int) -> Optional[np.ndarray]:
+        """Görüntü karesini `goruntu_dpi` varsayımıyla istenen DPI'a ölçekler."""
+        img = self._goruntu_karesi(sayfa_no)
+        if img is None or dpi == self.goruntu_dpi:
+            return img
+        import cv2
+        oran = dpi / self.goruntu_dpi
+        yeni_boyut = (max(1, int(round(img.shape[1] * oran))), max(1, int(round(img.shape[0] * oran))))
+        return cv2.resize(img, yeni_boyut, interpolation=cv2.INTER_AREA if oran < 1 else cv2.INTER_CUBIC)
+
+    def _pdf_sayfasini_render_et(self, sayfa_no: int, dpi: int, kutu: Optional[Tuple[float, float, float, float]] = None) -> Optional[np.ndarray]:
+        doc = self.fitz_belgesi
+        if doc is None or sayfa_no >= len(doc): return None
+        import cv2
+        import fitz  # PyMuPDF
+        with FITZ_KILIDI:
+            page = doc.load_page(sayfa_no)
+            pix = page.get_pixmap(dpi=dpi, clip=fitz.Rect(kutu) if kutu is not None else None)
+        img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+        if pix.n == 3: # RGB
+            return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        if pix.n == 4: # RGBA
+            return cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
+        return img.copy()
@@ -0,0 +1,103 @@
+"""
+Başlangıç süresi kıyaslaması: her senaryo taze bir Python sürecinde
+çalıştırılır (fatura başına alt süreç ve kısa ömürlü konteynerlerin ödediği
+maliyet). Süreç toplam süresi, içe aktarma süresi ve yüklenen ağır modüller
+JSON olarak yazılır.
+
+    python -m benchmark.baslangic --tekrar 10 --cikti baslangic.json
+"""
+import os
+import sys
+import json
+import shutil
+import logging
+import tempfile
+import statistics
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+
+PROJE_DIZINI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJE_DIZINI not in sys.path:
+    sys.path.insert(0, PROJE_DIZINI)
+
+# Dijital PDF yolunda yüklenmemesi beklenen modüller (pdfplumber hariç)
+AGIR_MODULLER = ('cv2', 'fitz', 'pymupdf', 'pdfplumber', 'pytesseract', 'pandas', 'tqdm', 'streamlit')
+
+# Alt süreçte çalışan ölçüm gövdesi: {'ice_aktarma_ms', 'is_ms', 'moduller'} yazdırır
+_OLCUM_KODU = """
+import sys, time, json
+t0 = time.perf_counter()
+{ice_aktar}
+t1 = time.perf_counter()
+{is_}
+t2 = time.perf_counter()
+print(json.dumps({{'ice_aktarma_ms': (t1 - t0) * 1000, 'is_ms': (t2 - t1) * 1000,
+                  'moduller': [m for m in {agir!r} if m in sys.modules]}}))
+"""
+
+SENARYOLAR = {
+    'motor_ice_aktarma': ("import fatura_analiz_motoru", "pass"),
+    'cli_ice_aktarma': ("import main", "pass"),
+    'servis_ice_aktarma': ("import servis", "pass"),
+    'dijital_pdf_analizi': ("from fatura_analiz_motoru import FaturaAnalizMotoru",
+                            "FaturaAnalizMotoru(onbellek=None).analiz_et({pdf!r})"),
+}
+
+
+def senaryoyu_olc(ice_aktar: str, is_: str, tekrar: int) -> Dict[str, Any]:
+    """Senaryoyu `tekrar` kez taze süreçte çalıştırır; medyan ve en küçük süreleri döndürür."""
+    kod = _OLCUM_KODU.format(ice_aktar=ice_aktar, is_=is_, agir=AGIR_MODULLER)
+    surec, ice_aktarma, isler = [], [], []
+    moduller: List[str] = []
+    for _ in range(tekrar):
+        t = time.perf_counter()
+        cikti = subprocess.run([sys.executable, '-c', kod], cwd=PROJE_DIZINI, capture_output=True, text=True, check=True)
+        surec.append((time.perf_counter() - t) * 1000)
+        # Kütüphanelerin stdout'a yazdığı uyarılar atlanır; son satır ölçümdür
+        olcum = json.loads(cikti.stdout.strip().splitlines()[-1])
+        ice_aktarma.append(olcum['ice_aktarma_ms'])
+        isler.append(olcum['is_ms'])
+        moduller = olcum['moduller']
+    return {
+        'surec_ms': {'medyan': round(statistics.median(surec), 1), 'min': round(min(surec), 1)},
+        'ice_aktarma_ms': {'medyan': round(statistics.median(ice_aktarma), 1), 'min': round(min(ice_aktarma), 1)},
+        'is_ms': {'medyan': round(statistics.median(isler), 1), 'min': round(min(isler), 1)},
+        'agir_moduller': moduller,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Akıllı Fatura Tanıma - başlangıç süresi kıyaslaması")
+    parser.add_argument('--tekrar', type=int, default=7, help="Senaryo başına süreç sayısı")
+    parser.add_argument('--cikti', help="Sonuç JSON dosyası (verilmezse stdout)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    from benchmark.sentetik_fatura import fatura_pdf_olustur
+    klasor = tempfile.mkdtemp(prefix='fatura_baslangic_')
+    try:
+        pdf = os.path.join(klasor, 'sentetik.pdf')
+        fatura_pdf_olustur(pdf, kalem_sayisi=10)
+        # Boş süreç: yorumlayıcının kendi açılış maliyeti (karşılaştırma tabanı)
+        sonuclar = {'bos_surec': senaryoyu_olc("pass", "pass", args.tekrar)}
+        for ad, (ice_aktar, is_) in SENARYOLAR.items():
+            sonuclar[ad] = senaryoyu_olc(ice_aktar, is_.format(pdf=pdf), args.tekrar)
+            logging.info(f"{ad}: süreç {sonuclar[ad]['surec_ms']['medyan']} ms, içe aktarma "
+                         f"{sonuclar[ad]['ice_aktarma_ms']['medyan']} ms, ağır modüller: {sonuclar[ad]['agir_moduller']}")
+    finally:
+        shutil.rmtree(klasor, ignore_errors=True)
+
+    metin = json.dumps({'python': sys.version.split()[0], 'tekrar': args.tekrar, 'senaryolar': sonuclar},
+                       ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, 'w', encoding='utf-8') as f:
+            f.write(metin)
+    else:
+        print(metin)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
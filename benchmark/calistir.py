@@ -0,0 +1,203 @@
+"""
+Verim kıyaslaması: sentetik faturalar üretilir ve `FaturaAnalizMotoru.analiz_et`
+farklı işçi sayılarıyla (toplu moddaki gibi süreç havuzunda) çalıştırılır.
+Belge/sn, belge gecikmesi ve aşama süreleri (p50/p95/p99) ile tepe RSS JSON
+olarak yazılır. `--karsilastir` önceki bir çıktıyla kıyaslayıp gerilemeleri
+raporlar (gerileme varsa çıkış kodu 1).
+
+    python -m benchmark.calistir --adet 40 --kalem 20 --isciler 1,2,4 --cikti bm.json
+    python -m benchmark.calistir --taranmis-orani 0.25 --egim 1.5 --karsilastir bm.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+# Proje kökü (python -m benchmark.calistir dışında doğrudan çalıştırıldığında da)
+PROJE_DIZINI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJE_DIZINI not in sys.path:
+    sys.path.insert(0, PROJE_DIZINI)
+
+from isci_havuzu import isci_baslat, isci_motoru, desenleri_serilestir, isci_ocr_sayisi
+from metrikler import SureHistogrami
+from benchmark.sentetik_fatura import veri_seti_olustur
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Karşılaştırmada gerileme sayılan göreli değişim (%)
+VARSAYILAN_ESIK = 10.0
+
+
+def tepe_rss_mb() -> Optional[float]:
+    """Bu sürecin tepe bellek kullanımı (MB); desteklenmeyen platformda None."""
+    if resource is None:
+        return None
+    tepe = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    return round(tepe / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def belgeyi_olc(yol: str) -> Tuple[Optional[Dict[str, float]], Optional[float], Optional[str]]:
+    """İşçide çalışır: (metrics, işçinin tepe RSS'i, hata) döndürür."""
+    try:
+        sonuc = isci_motoru().analiz_et(yol)
+        return sonuc.get('metrics'), tepe_rss_mb(), None
+    except Exception as e:
+        return None, tepe_rss_mb(), str(e)
+
+
+def isci_sayisiyla_calistir(yollar: List[str], isci_sayisi: int, ayarlar: Dict[str, Any]) -> Dict[str, Any]:
+    """Tüm belgeleri `isci_sayisi` süreçle işler; ısınma turu ölçüme katılmaz."""
+    havuz_ayarlari = (desenleri_serilestir(), ayarlar, logging.CRITICAL,
+                      {'metrikler': True, 'onbellek': None, 'debug_gorsel': False,
+                       'ocr_isci_sayisi': isci_ocr_sayisi(ayarlar, isci_sayisi)})
+    histogram = SureHistogrami()
+    rss: List[float] = []
+    hatalar = 0
+    with ProcessPoolExecutor(max_workers=isci_sayisi, initializer=isci_baslat, initargs=havuz_ayarlari) as havuz:
+        # Isınma: süreçlerin başlatılması ve motor kurulumu ölçülmesin
+        list(havuz.map(belgeyi_olc, yollar[:isci_sayisi]))
+        baslangic = time.perf_counter()
+        for metrics, isci_rss, hata in havuz.map(belgeyi_olc, yollar):
+            histogram.ekle(metrics)
+            if isci_rss is not None:
+                rss.append(isci_rss)
+            hatalar += hata is not None
+        sure = time.perf_counter() - baslangic
+    ozet = histogram.ozet()
+    return {
+        'isci_sayisi': isci_sayisi,
+        'belge_sayisi': len(yollar),
+        'hata_sayisi': hatalar,
+        'sure_sn': round(sure, 3),
+        'belge_per_sn': round(len(yollar) / sure, 3) if sure > 0 else None,
+        'gecikme_ms': {k: v for k, v in ozet.pop('toplam', {}).items() if k != 'adet'},
+        'asamalar_ms': ozet,
+        'tepe_rss_mb': {'isci_maks': max(rss) if rss else None, 'ana_surec': tepe_rss_mb()},
+    }
+
+
+def ortam_bilgisi() -> Dict[str, Any]:
+    """Sonuçların hangi kod ve makinede alındığı."""
+    bilgi: Dict[str, Any] = {'python': platform.python_version(), 'platform': platform.platform(),
+                             'cpu_sayisi': os.cpu_count()}
+    try:
+        bilgi['commit'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJE_DIZINI,
+                                         capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        bilgi['commit'] = None
+    try:
+        import pytesseract
+        bilgi['tesseract'] = str(pytesseract.get_tesseract_version())
+    except Exception:
+        bilgi['tesseract'] = None
+    return bilgi
+
+
+def karsilastir(onceki: Dict[str, Any], simdiki: Dict[str, Any], esik: float = VARSAYILAN_ESIK) -> List[str]:
+    """
+    Aynı işçi sayısındaki koşuları kıyaslar; belge/sn düşüşü ya da p50
+    gecikme/aşama süresi artışı `esik` yüzdesini aşarsa gerileme sayılır.
+    """
+    gerilemeler = []
+    eski_kosular = {k['isci_sayisi']: k for k in onceki.get('sonuclar', [])}
+    for kosu in simdiki.get('sonuclar', []):
+        eski = eski_kosular.get(kosu['isci_sayisi'])
+        if not eski:
+            continue
+        n = kosu['isci_sayisi']
+        if eski.get('belge_per_sn') and kosu.get('belge_per_sn'):
+            degisim = (kosu['belge_per_sn'] - eski['belge_per_sn']) / eski['belge_per_sn'] * 100
+            logging.info(f"[{n} işçi] belge/sn: {eski['belge_per_sn']} -> {kosu['belge_per_sn']} ({degisim:+.1f}%)")
+            if degisim < -esik:
+                gerilemeler.append(f"{n} işçi: belge/sn {degisim:+.1f}%")
+        olculer = [('gecikme', eski.get('gecikme_ms', {}), kosu.get('gecikme_ms', {}))]
+        olculer += [(a, eski.get('asamalar_ms', {}).get(a, {}), s) for a, s in kosu.get('asamalar_ms', {}).items()]
+        for ad, e, s in olculer:
+            # 1 ms altındaki aşamalar ölçüm gürültüsüne fazla duyarlı
+            if not e.get('p50') or 'p50' not in s or e['p50'] < 1.0:
+                continue
+            degisim = (s['p50'] - e['p50']) / e['p50'] * 100
+            if degisim > esik:
+                gerilemeler.append(f"{n} işçi: {ad} p50 {e['p50']} -> {s['p50']} ms ({degisim:+.1f}%)")
+    return gerilemeler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Akıllı Fatura Tanıma - verim kıyaslaması")
+    parser.add_argument('--adet', type=int, default=40, help="Üretilecek fatura sayısı")
+    parser.add_argument('--kalem', type=int, default=20, help="Fatura başına kalem sayısı")
+    parser.add_argument('--sayfa', type=int, default=1, help="Fatura başına sayfa sayısı")
+    parser.add_argument('--taranmis-orani', type=float, default=0.0, help="Metin katmanı olmayan (OCR'lanacak) faturaların oranı")
+    parser.add_argument('--taranmis-bicim', choices=('pdf', 'tiff'), default='pdf')
+    parser.add_argument('--egim', type=float, default=0.0, help="Taranmış kopyalara uygulanacak eğim (derece)")
+    parser.add_argument('--isciler', default='1,2,4', help="Virgülle ayrılmış işçi sayıları")
+    parser.add_argument('--tohum', type=int, default=0)
+    parser.add_argument('--klasor', help="Üretilen faturaların klasörü (varsayılan: geçici klasör, sonunda silinir)")
+    parser.add_argument('--config', default=os.path.join(PROJE_DIZINI, 'config.json'))
+    parser.add_argument('--cikti', help="Sonuç JSON dosyası (verilmezse stdout)")
+    parser.add_argument('--karsilastir', metavar='ONCEKI_JSON', help="Önceki sonuçla kıyasla")
+    parser.add_argument('--esik', type=float, default=VARSAYILAN_ESIK, help="Gerileme eşiği (%%)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    ayarlar: Dict[str, Any] = {}
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            ayarlar = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"config okunamadı ({e}), varsayılan ayarlar kullanılacak.")
+
+    klasor = args.klasor or tempfile.mkdtemp(prefix='fatura_bm_')
+    try:
+        logging.info(f"{args.adet} sentetik fatura üretiliyor → {klasor}")
+        yollar = veri_seti_olustur(klasor, args.adet, args.kalem, args.sayfa, args.taranmis_orani,
+                                   args.egim, args.taranmis_bicim, args.tohum)
+        sonuclar = []
+        for n in (int(x) for x in args.isciler.split(',') if x.strip()):
+            kosu = isci_sayisiyla_calistir(yollar, n, ayarlar)
+            logging.info(f"[{n} işçi] {kosu['belge_per_sn']} belge/sn, p50 {kosu['gecikme_ms'].get('p50')} ms, "
+                         f"tepe RSS {kosu['tepe_rss_mb']['isci_maks']} MB, hata {kosu['hata_sayisi']}")
+            sonuclar.append(kosu)
+    finally:
+        if not args.klasor:
+            shutil.rmtree(klasor, ignore_errors=True)
+
+    cikti = {
+        'ortam': ortam_bilgisi(),
+        'parametreler': {k: v for k, v in vars(args).items() if k not in ('cikti', 'karsilastir', 'klasor', 'config')},
+        'motor_ayarlari': {k: ayarlar.get(k) for k in ('kalem_cikarim_yontemi', 'ocr_modu', 'goruntu_dpi')},
+        'sonuclar': sonuclar,
+    }
+    metin = json.dumps(cikti, ensure_ascii=False, indent=2)
+    if args.cikti:
+        with open(args.cikti, 'w', encoding='utf-8') as f:
+            f.write(metin)
+        logging.info(f"Sonuçlar '{args.cikti}' dosyasına yazıldı.")
+    else:
+        print(metin)
+
+    if args.karsilastir:
+        with open(args.karsilastir, 'r', encoding='utf-8') as f:
+            gerilemeler = karsilastir(json.load(f), cikti, args.esik)
+        for g in gerilemeler:
+            logging.warning(f"GERİLEME: {g}")
+        return 1 if gerilemeler else 0
+    return 0
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
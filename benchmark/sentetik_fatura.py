@@ -0,0 +1,189 @@
+"""
+Kıyaslama için sentetik e-Fatura üreticisi. Gerçek faturalar paylaşılamadığından
+aynı düzende (satıcı/alıcı/fatura bilgileri, çizgili kalem tablosu, toplamlar)
+PDF'ler PyMuPDF ile yerel olarak üretilir. Aynı tohumla aynı içerik üretilir;
+böylece farklı commit'lerin sonuçları karşılaştırılabilir.
+"""
+import os
+import random
+from typing import List, Optional
+
+import fitz
+import numpy as np
+import cv2
+
+SAYFA_GENISLIGI, SAYFA_YUKSEKLIGI = 595, 842
+SUTUNLAR = [40, 80, 250, 310, 380, 450, 510]
+SUTUN_SONU = 570
+BASLIKLAR = ["Sıra No", "Mal Hizmet", "Miktar", "Birim Fiyat", "KDV Oranı", "KDV Tutarı", "Tutar"]
+SATIR_YUKSEKLIGI = 18
+TABLO_SONU = 680  # toplamlar bloğunun üstü
+
+SATICILAR = ["ÖRNEK TİCARET A.Ş.", "ANADOLU GIDA SAN. VE TİC. LTD. ŞTİ.", "KARADENİZ LOJİSTİK A.Ş.", "EGE YAZILIM HİZMETLERİ LTD. ŞTİ."]
+ALICILAR = ["Alıcı Firma Ltd.", "MARMARA İNŞAAT A.Ş.", "DOĞU ENERJİ LTD. ŞTİ.", "BOĞAZİÇİ DANIŞMANLIK A.Ş."]
+SEHIRLER = ["İstanbul", "Ankara", "İzmir", "Bursa", "Trabzon"]
+URUNLER = ["Kağıt A4", "Toner Kartuşu", "Ofis Sandalyesi", "Lojistik Hizmeti", "Yazılım Lisansı", "Danışmanlık Bedeli", "Su 19L", "Kablo Cat6"]
+
+
+def tutar_bicimle(deger: float) -> str:
+    """1234.5 -> '1.234,50'"""
+    return f"{deger:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def _yaz(sayfa: fitz.Page, font: fitz.Font, satirlar: List[tuple]) -> None:
+    tw = fitz.TextWriter(sayfa.rect)
+    for x, y, metin, boyut in satirlar:
+        tw.append((x, y), metin, font=font, fontsize=boyut)
+    tw.write_text(sayfa)
+
+
+def _tablo_satiri(sayfa: fitz.Page, font: fitz.Font, y: float, hucreler: List[str]) -> float:
+    _yaz(sayfa, font, [(x + 2, y + 12, h, 8) for x, h in zip(SUTUNLAR, hucreler)])
+    sayfa.draw_rect(fitz.Rect(SUTUNLAR[0], y, SUTUN_SONU, y + SATIR_YUKSEKLIGI))
+    for x in SUTUNLAR[1:]:
+        sayfa.draw_line((x, y), (x, y + SATIR_YUKSEKLIGI))
+    return y + SATIR_YUKSEKLIGI
+
+
+def fatura_pdf_olustur(yol: str, kalem_sayisi: int = 10, sayfa_sayisi: int = 1, tohum: int = 0,
+                       ek_sayfa_sayisi: int = 0) -> dict:
+    """
+    Sentetik bir e-Fatura PDF'i yazar ve beklenen alan değerlerini döndürür.
+    Kalemler `sayfa_sayisi` sayfaya eşit dağıtılır; toplamlar son kalem
+    sayfasındadır. `ek_sayfa_sayisi` kadar kalemsiz ek sayfa (genel şartlar)
+    toplamlardan sonra eklenir.
+    """
+    rnd = random.Random(tohum)
+    satici, alici = rnd.choice(SATICILAR), rnd.choice(ALICILAR)
+    vkn = f"{rnd.randrange(10 ** 9, 10 ** 10)}"
+    fatura_no = f"ABC{2025}{rnd.randrange(10 ** 8, 10 ** 9):09d}"
+    tarih = f"{rnd.randint(1, 28):02d}-{rnd.randint(1, 12):02d}-2025"
+    ettn = "-".join(f"{rnd.getrandbits(b * 4):0{b}x}" for b in (8, 4, 4, 4, 12))
+
+    doc = fitz.open()
+    font = fitz.Font('helv')
+    sayfa = doc.new_page(width=SAYFA_GENISLIGI, height=SAYFA_YUKSEKLIGI)
+    _yaz(sayfa, font, [
+        (40, 50, satici, 10),
+        (40, 64, f"Adres: Cumhuriyet Cad. No:{rnd.randint(1, 200)} {rnd.choice(SEHIRLER)}", 9),
+        (40, 78, f"Vergi Dairesi: Kadıköy VKN: {vkn}", 9),
+        (40, 200, "SAYIN", 9),
+        (40, 214, f"{alici} Adres: {rnd.choice(SEHIRLER)}", 9),
+        (360, 150, f"Fatura No: {fatura_no}", 9),
+        (360, 164, f"Fatura Tarihi: {tarih}", 9),
+        (360, 178, f"ETTN: {ettn}", 7),
+    ])
+    y = _tablo_satiri(sayfa, font, 340, BASLIKLAR)
+    sayfa_basina = max(1, -(-kalem_sayisi // max(1, sayfa_sayisi)))
+    ara_toplam = kdv_toplam = 0.0
+    for i in range(kalem_sayisi):
+        if i and (i % sayfa_basina == 0 or y + SATIR_YUKSEKLIGI > TABLO_SONU):
+            sayfa = doc.new_page(width=SAYFA_GENISLIGI, height=SAYFA_YUKSEKLIGI)
+            y = _tablo_satiri(sayfa, font, 60, BASLIKLAR)
+        miktar = rnd.randint(1, 20)
+        birim = rnd.randint(100, 500000) / 100
+        oran = rnd.choice((1, 10, 20))
+        tutar = round(miktar * birim, 2)
+        kdv = round(tutar * oran / 100, 2)
+        ara_toplam += tutar
+        kdv_toplam += kdv
+        y = _tablo_satiri(sayfa, font, y, [str(i + 1), rnd.choice(URUNLER), f"{miktar} Adet", f"{tutar_bicimle(birim)} TL",
+                                            f"%{oran}", f"{tutar_bicimle(kdv)} TL", f"{tutar_bicimle(tutar)} TL"])
+    genel = ara_toplam + kdv_toplam
+    _yaz(sayfa, font, [
+        (350, 700, f"Mal Hizmet Toplam Tutarı {tutar_bicimle(ara_toplam)} TL", 9),
+        (350, 714, f"Hesaplanan KDV {tutar_bicimle(kdv_toplam)} TL", 9),
+        (350, 728, f"Vergiler Dahil Toplam Tutar {tutar_bicimle(genel)} TL", 9),
+        (350, 742, f"Ödenecek Tutar {tutar_bicimle(genel)} TL", 9),
+    ])
+    for i in range(ek_sayfa_sayisi):
+        sayfa = doc.new_page(width=SAYFA_GENISLIGI, height=SAYFA_YUKSEKLIGI)
+        _yaz(sayfa, font, [(40, 60, f"EK-{i + 1} GENEL ŞARTLAR", 10)] +
+             [(40, 80 + 14 * j, f"{j + 1}. Teslim edilen ürünlere ilişkin itirazlar yedi gün içinde yazılı bildirilir.", 8)
+              for j in range(40)])
+    doc.set_metadata({})  # tarih damgası olmasın; aynı tohum aynı baytları üretsin
+    doc.save(yol, garbage=3, deflate=True, no_new_id=True)
+    doc.close()
+    return {'satici_unvan': satici, 'satici_vkn': vkn, 'fatura_numarasi': fatura_no, 'fatura_tarihi': tarih,
+            'ettn': ettn, 'odenecek_tutar': f"{genel:.2f}", 'kalem_sayisi': kalem_sayisi}
+
+
+def taranmis_kopya_olustur(pdf_yolu: str, cikti_yolu: str, dpi: int = 200, egim: float = 0.0,
+                           gurultu: float = 0.0, tohum: int = 0) -> str:
+    """
+    PDF'i görüntüye çevirip (isteğe bağlı eğim ve tuz-biber gürültüsüyle)
+    metin katmanı olmayan bir kopya yazar; OCR yolunu çalıştırmak içindir.
+    Çıktı uzantısı `.tif`/`.tiff` ise çok sayfalı TIFF, değilse görüntü PDF'idir.
+    """
+    rnd = np.random.default_rng(tohum)
+    kaynak = fitz.open(pdf_yolu)
+    kareler = []
+    for sayfa in kaynak:
+        pix = sayfa.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+        goruntu = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).copy()
+        if egim:
+            h, w = goruntu.shape
+            M = cv2.getRotationMatrix2D((w / 2, h / 2), egim, 1.0)
+            goruntu = cv2.warpAffine(goruntu, M, (w, h), flags=cv2.INTER_LINEAR, borderValue=255)
+        if gurultu:
+            maske = rnd.random(goruntu.shape) < gurultu
+            goruntu[maske] = rnd.choice(np.array([0, 255], dtype=np.uint8), size=int(maske.sum()))
+        kareler.append(goruntu)
+    kaynak.close()
+
+    if os.path.splitext(cikti_yolu)[1].lower() in ('.tif', '.tiff'):
+        if not cv2.imwritemulti(cikti_yolu, kareler):
+            raise OSError(f"TIFF yazılamadı: {cikti_yolu}")
+        return cikti_yolu
+    hedef = fitz.open()
+    for goruntu in kareler:
+        ok, png = cv2.imencode('.png', goruntu)
+        h, w = goruntu.shape
+        sayfa = hedef.new_page(width=w * 72.0 / dpi, height=h * 72.0 / dpi)
+        sayfa.insert_image(sayfa.rect, stream=png.tobytes())
+    hedef.set_metadata({})
+    hedef.save(cikti_yolu, garbage=3, deflate=True, no_new_id=True)
+    hedef.close()
+    return cikti_yolu
+
+
+def veri_seti_olustur(klasor: str, adet: int, kalem_sayisi: int = 10, sayfa_sayisi: int = 1,
+                      taranmis_orani: float = 0.0, egim: float = 0.0, taranmis_bicim: str = 'pdf',
+                      tohum: int = 0, beklenenler: Optional[dict] = None) -> List[str]:
+    """
+    `klasor` altına `adet` fatura üretir; ilk `taranmis_orani` kadarı taranmış
+    kopyadır (metin katmanı yok). Dosya yolları sırayla döner. `beklenenler`
+    verilirse dosya adı -> beklenen alanlar ile doldurulur.
+    """
+    os.makedirs(klasor, exist_ok=True)
+    taranmis_adet = int(round(adet * taranmis_orani))
+    yollar = []
+    for i in range(adet):
+        yol = os.path.join(klasor, f"sentetik_{i:05d}.pdf")
+        beklenen = fatura_pdf_olustur(yol, kalem_sayisi, sayfa_sayisi, tohum + i)
+        if i < taranmis_adet:
+            taranmis = os.path.join(klasor, f"sentetik_{i:05d}_taranmis.{'tiff' if taranmis_bicim == 'tiff' else 'pdf'}")
+            taranmis_kopya_olustur(yol, taranmis, egim=egim, tohum=tohum + i)
+            os.remove(yol)
+            yol = taranmis
+        if beklenenler is not None:
+            beklenenler[os.path.basename(yol)] = beklenen
+        yollar.append(yol)
+    return yollar
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Sentetik e-Fatura üretici")
+    parser.add_argument('klasor')
+    parser.add_argument('--adet', type=int, default=10)
+    parser.add_argument('--kalem', type=int, default=10)
+    parser.add_argument('--sayfa', type=int, default=1)
+    parser.add_argument('--taranmis-orani', type=float, default=0.0)
+    parser.add_argument('--egim', type=float, default=0.0)
+    parser.add_argument('--taranmis-bicim', choices=('pdf', 'tiff'), default='pdf')
+    parser.add_argument('--tohum', type=int, default=0)
+    args = parser.parse_args()
+    for yol in veri_seti_olustur(args.klasor, args.adet, args.kalem, args.sayfa, args.taranmis_orani, args.egim,
+                                 taranmis_bicim=args.taranmis_bicim, tohum=args.tohum):
+        print(yol)
@@ -0,0 +1,40 @@
+import re
+from typing import List, Dict, Iterable, Tuple, Pattern
+
+
+class CapaEslestirici:
+    """
+    Çapa kelimeleri için derlenmiş regex eşleştirici. Her kategorinin
+    kelimeleri kaçışlanıp tek bir alternasyonda derlenir; blok metinleri
+    `re.search` ile C seviyesinde taranır ve ilk isabette durulur.
+
+    Eşleşme büyük/küçük harfe duyarsızdır (metin ve kelimeler `str.lower`
+    ile küçültülür) ve alt dizge eşleşmesidir (`kelime in metin` ile aynı).
+    """
+
+    def __init__(self, kategoriler: Dict[str, Iterable[str]]):
+        self.kategoriler: List[str] = list(kategoriler)
+        self._desenler: List[Tuple[int, Pattern[str]]] = []
+        for k, kategori in enumerate(self.kategoriler):
+            kelimeler = {str(kelime).lower() for kelime in kategoriler[kategori] or []} - {''}
+            if kelimeler:
+                # Uzundan kısaya: alternasyon ilk tutan dalı seçtiğinden sıra yalnızca hızı etkiler
+                desen = '|'.join(map(re.escape, sorted(kelimeler, key=lambda w: (-len(w), w))))
+                self._desenler.append((k, re.compile(desen)))
+
+    def __len__(self) -> int:
+        return len(self._desenler)
+
+    def tara(self, metinler: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Metinleri tarar ve her kategori için en az bir kelimesi geçen
+        metinlerin sırasını (artan) döndürür.
+        """
+        isabetler: Dict[str, List[int]] = {kategori: [] for kategori in self.kategoriler}
+        listeler = [(isabetler[self.kategoriler[k]], desen.search) for k, desen in self._desenler]
+        for i, metin in enumerate(metinler):
+            metin = metin.lower()
+            for liste, ara in listeler:
+                if ara(metin) is not None:
+                    liste.append(i)
+        return isabetler
@@ -0,0 +1,133 @@
+"""
+Toplu analiz sonuçlarını sabit şemalı tablolara akış hâlinde yazar. Şema
+patterns.json anahtarlarından bir kez çıkarılır; sonuçlar geldikçe sütun
+tamponlarına eklenir ve her `satir_grubu` belgede diske boşaltılır. Böylece
+bellek kullanımı belge sayısından bağımsızdır. Ürün kalemleri ayrı bir
+tabloya uzun biçimde (dosya, kalem_no, alan, deger) yazılır; kalem
+başlıkları faturadan faturaya değiştiğinden şema yine sabittir.
+
+Parquet için pyarrow gerekir (isteğe bağlı); yoksa CSV'ye düşülür.
+"""
+import os
+import csv
+import logging
+from typing import Any, Dict, List, Optional
+
+CIKTI_BICIMLERI = ('parquet', 'csv')
+VARSAYILAN_SATIR_GRUBU = 1000
+KALEM_SUTUNLARI = ['dosya', 'kalem_no', 'alan', 'deger']
+# Sayısal sütunlar; geri kalan her şey metindir
+_TAMSAYI_SUTUNLARI = {'kalem_sayisi', 'kalem_no'}
+
+
+def desen_alanlari(patterns: Dict) -> List[str]:
+    """Sonuç tablosunun alan sütunları: patterns.json'daki geçerli desen anahtarları (dosya sırasıyla)."""
+    return [k for k, v in (patterns or {}).items() if isinstance(v, dict) and v.get('desen')]
+
+
+def _metin(deger: Any) -> Optional[str]:
+    if deger is None or deger == '':
+        return None
+    return deger if isinstance(deger, str) else str(deger)
+
+
+class SonucYazici:
+    """
+    `<temel_yol>.<bicim>` (sonuçlar) ve `<temel_yol>_kalemler.<bicim>`
+    (ürün kalemleri) dosyalarını yazar. Sonuç sözlükleri değiştirilmez.
+
+        with SonucYazici('test_reports/toplu', desen_alanlari(desenler)) as yazici:
+            for sonuc in sonuclar:
+                yazici.ekle(sonuc)
+    """
+
+    def __init__(self, temel_yol: str, alanlar: List[str], bicim: str = 'parquet',
+                 satir_grubu: int = VARSAYILAN_SATIR_GRUBU, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        if bicim not in CIKTI_BICIMLERI:
+            raise ValueError(f"Bilinmeyen çıktı biçimi: {bicim} (geçerli: {', '.join(CIKTI_BICIMLERI)})")
+        if bicim == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                self.logger.warning("pyarrow kurulu değil, sonuçlar Parquet yerine CSV olarak yazılacak.")
+                bicim = 'csv'
+        self.bicim = bicim
+        self.alanlar = list(alanlar)
+        self.satir_grubu = max(1, satir_grubu)
+        # ortalama_guven_skoru önceki CSV raporunun ilk sütunuydu; okuyanlar için yeri korunur
+        self.sutunlar = ['ortalama_guven_skoru', 'dosya', 'hata', *self.alanlar, 'kalem_sayisi']
+        self.dosyalar = {'sonuclar': f"{temel_yol}.{bicim}", 'kalemler': f"{temel_yol}_kalemler.{bicim}"}
+        self.yazilan = 0
+        self._tamponlar = {'sonuclar': {s: [] for s in self.sutunlar},
+                           'kalemler': {s: [] for s in KALEM_SUTUNLARI}}
+        # Parquet'te ParquetWriter, CSV'de (csv.writer, dosya) ikilisi
+        self._yazicilar: Dict[str, Any] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(temel_yol)), exist_ok=True)
+
+    def ekle(self, sonuc: Dict[str, Any]) -> None:
+        """Bir analiz sonucunu (toplu modun JSONL kaydı) tamponlara ekler."""
+        veri = sonuc.get('yapilandirilmis_veri') or sonuc.get('structured') or {}
+        dosya = sonuc.get('dosya')
+        kalemler = veri.get('urun_kalemleri') or []
+        tampon = self._tamponlar['sonuclar']
+        tampon['ortalama_guven_skoru'].append(_metin((sonuc.get('ocr_istatistikleri') or {}).get('ortalama_guven_skoru')))
+        tampon['dosya'].append(dosya)
+        tampon['hata'].append(_metin(sonuc.get('hata')))
+        for alan in self.alanlar:
+            tampon[alan].append(_metin(veri.get(alan)))
+        tampon['kalem_sayisi'].append(len(kalemler))
+
+        kalem_tamponu = self._tamponlar['kalemler']
+        for kalem_no, kalem in enumerate(kalemler, 1):
+            for alan, deger in kalem.items():
+                kalem_tamponu['dosya'].append(dosya)
+                kalem_tamponu['kalem_no'].append(kalem_no)
+                kalem_tamponu['alan'].append(alan)
+                kalem_tamponu['deger'].append(_metin(deger))
+
+        self.yazilan += 1
+        if len(tampon['dosya']) >= self.satir_grubu:
+            self.bosalt()
+
+    def bosalt(self) -> None:
+        """Tamponlardaki satırları birer satır grubu olarak yazar."""
+        for ad, tampon in self._tamponlar.items():
+            if tampon[next(iter(tampon))]:
+                self._satir_grubu_yaz(ad, tampon)
+                for degerler in tampon.values():
+                    degerler.clear()
+
+    def kapat(self) -> None:
+        """Kalan satırları yazar ve dosyaları kapatır; hiç satır yoksa yalnızca şema/başlık yazılır."""
+        self.bosalt()
+        for ad, tampon in self._tamponlar.items():
+            if ad not in self._yazicilar:
+                self._satir_grubu_yaz(ad, tampon)
+        for yazici in self._yazicilar.values():
+            (yazici if self.bicim == 'parquet' else yazici[1]).close()
+        self._yazicilar.clear()
+
+    def __enter__(self) -> 'SonucYazici':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.kapat()
+
+    def _satir_grubu_yaz(self, ad: str, tampon: Dict[str, list]) -> None:
+        if self.bicim == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            yazici = self._yazicilar.get(ad)
+            if yazici is None:
+                sema = pa.schema([(s, pa.int32() if s in _TAMSAYI_SUTUNLARI else pa.string()) for s in tampon])
+                yazici = self._yazicilar[ad] = pq.ParquetWriter(self.dosyalar[ad], sema)
+            yazici.write_table(pa.Table.from_pydict(tampon, schema=yazici.schema))
+            return
+        if ad not in self._yazicilar:
+            f = open(self.dosyalar[ad], 'w', newline='', encoding='utf-8-sig')
+            self._yazicilar[ad] = (csv.writer(f), f)
+            self._yazicilar[ad][0].writerow(list(tampon))
+        yazici, f = self._yazicilar[ad]
+        yazici.writerows(zip(*tampon.values()))
+        f.flush()
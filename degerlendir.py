@@ -1,13 +1,21 @@
 import json
 import os
-from fatura_analiz_motoru import FaturaAnalizMotoru
+import time
+from isci_havuzu import isci_baslat, isci_motoru, desenleri_serilestir, isci_ocr_sayisi
+from fatura_analiz_motoru import ayarlardan_motor_olustur, MOTOR_SURUMU
+from sonuc_onbellegi import SonucOnbellegi, dosya_ozeti
 from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
-import pandas as pd
 from collections import defaultdict
 from utils import norm_amount, norm_date
+from metrikler import SureHistogrami
 import logging
 
+# Kelime çıkarımı (pdfplumber/OCR) önbelleği; desenler değişince geçersiz olmaz.
+# Paylaşılan sonuç önbelleği (onbellek bölümü) bilerek kullanılmaz: anahtarı desen
+# özetini içerdiğinden her desen denemesinde tüm faturalar yeniden açılırdı.
+CIKARIM_ONBELLEK_KLASORU = '.cache/degerlendirme'
+
 def degerlendir(analiz_sonuclari: dict, dogruluk_verisi: dict) -> dict:
     """
     Tek bir faturanın analiz sonucunu doğruluk verisiyle karşılaştırır.
@@ -43,19 +51,24 @@ def degerlendir(analiz_sonuclari: dict, dogruluk_verisi: dict) -> dict:
             
     return rapor
 
-def tek_faturayi_analiz_et(dosya_yolu: str) -> tuple[str, dict]:
-    """Bir fatura dosyasını analiz etmek için sarmalayıcı fonksiyon."""
-    # Hataları gizlemek için log seviyesini ayarla
-    logging.basicConfig(level=logging.CRITICAL)
-    analiz_sistemi = FaturaAnalizMotoru()
-    sonuc = analiz_sistemi.analiz_et(dosya_yolu)
-    return os.path.basename(dosya_yolu), sonuc
+def tek_faturayi_cikar(dosya_yolu: str) -> tuple[str, dict]:
+    """Bir faturanın desenlerden bağımsız çıkarım aşamasını (kelimeler, kalemler) çalıştırır."""
+    # Motor ve log ayarları işçi başına bir kez kurulur (bkz. isci_havuzu.isci_baslat)
+    analiz_sistemi = isci_motoru()
+    return dosya_yolu, analiz_sistemi.kelimeleri_cikar(dosya_yolu)
 
-def main():
+def main(yeniden_cikar: bool = False):
     """
     Ana değerlendirme betiği. Tüm faturaları analiz eder, golden dataset ile karşılaştırır
     ve detaylı bir başarı raporu oluşturur.
+
+    Analiz iki aşamalıdır: pahalı kelime çıkarımı (pdfplumber/OCR, kalem
+    tabloları) dosya içeriğinin özetiyle önbelleğe alınır; bölgeleme, regex
+    ve son işleme her çalıştırmada önbellekteki kelimeler üzerinde yeniden
+    yapılır. Böylece yalnızca patterns.json ya da çapalar değiştiğinde hiçbir
+    belge yeniden açılmaz. `yeniden_cikar` önbelleği yok sayar.
     """
+    import pandas as pd  # yalnızca rapor tablosu için
     logging.info("🚀 Değerlendirme süreci başlatılıyor...")
 
     # Golden dataset'i yükle
@@ -79,15 +92,61 @@ def main():
 
     # Paralel analiz
     tum_sonuclar = {}
-    with ProcessPoolExecutor() as executor:
-        futures = {executor.submit(tek_faturayi_analiz_et, dosya): dosya for dosya in islenicek_dosyalar}
-        for future in tqdm(as_completed(futures), total=len(islenicek_dosyalar), desc="Faturalar Analiz Ediliyor"):
-            try:
-                dosya_adi, sonuc = future.result()
-                tum_sonuclar[dosya_adi] = sonuc['yapilandirilmis_veri']
-            except Exception as e:
+    # Tesseract yolu, OCR ve sonuç önbelleği ayarları (varsa) config.json'dan
+    ayarlar = {}
+    try:
+        with open('config.json', 'r', encoding='utf-8') as f:
+            ayarlar = json.load(f)
+    except FileNotFoundError:
+        logging.warning("config.json bulunamadı, varsayılan ayarlar kullanılacak.")
+
+    desenler_json = desenleri_serilestir()
+    # Desen aşaması ana süreçte, güncel patterns.json ve çapalarla çalışır
+    motor = ayarlardan_motor_olustur(ayarlar, patterns=json.loads(desenler_json), onbellek=None,
+                                     debug_gorsel=False, metrikler=True)
+    onbellek = SonucOnbellegi(CIKARIM_ONBELLEK_KLASORU)
+    cikarimlar = {}
+    anahtarlar = {}
+    for dosya in islenicek_dosyalar:
+        anahtarlar[dosya] = onbellek.anahtar_olustur(dosya_ozeti(dosya), motor.cikarim_ozeti, MOTOR_SURUMU)
+        kayit = None if yeniden_cikar else onbellek.getir(anahtarlar[dosya])
+        if kayit is not None:
+            cikarimlar[dosya] = kayit
+    eksikler = [d for d in islenicek_dosyalar if d not in cikarimlar]
+    logging.info(f"🗃️ {len(cikarimlar)} fatura çıkarım önbelleğinden, {len(eksikler)} fatura yeniden çıkarılacak.")
+
+    cikarim_histogrami = SureHistogrami()
+    if eksikler:
+        # Hataları gizlemek için işçilerde log seviyesi CRITICAL
+        surec_sayisi = os.cpu_count() or 1
+        havuz_ayarlari = (desenler_json, ayarlar, logging.CRITICAL,
+                          {'debug_gorsel': False, 'ocr_isci_sayisi': isci_ocr_sayisi(ayarlar, surec_sayisi), 'metrikler': True})
+        with ProcessPoolExecutor(max_workers=surec_sayisi, initializer=isci_baslat, initargs=havuz_ayarlari) as executor:
+            futures = {executor.submit(tek_faturayi_cikar, dosya): dosya for dosya in eksikler}
+            for future in tqdm(as_completed(futures), total=len(eksikler), desc="Faturalar Çıkarılıyor"):
                 dosya = futures[future]
-                logging.error(f"❌ {os.path.basename(dosya)} analiz edilirken hata oluştu: {e}")
+                try:
+                    _, cikarim = future.result()
+                except Exception as e:
+                    logging.error(f"❌ {os.path.basename(dosya)} analiz edilirken hata oluştu: {e}")
+                    continue
+                cikarim_histogrami.ekle(cikarim.pop('metrics', None))
+                onbellek.kaydet(anahtarlar[dosya], cikarim)
+                cikarimlar[dosya] = cikarim
+
+    desen_histogrami = SureHistogrami()
+    baslangic = time.perf_counter()
+    for dosya in islenicek_dosyalar:
+        if dosya not in cikarimlar:
+            continue
+        try:
+            sonuc = motor.cikarimdan_sonuc_olustur(cikarimlar[dosya])
+        except Exception as e:
+            logging.error(f"❌ {os.path.basename(dosya)} analiz edilirken hata oluştu: {e}")
+            continue
+        tum_sonuclar[os.path.basename(dosya)] = sonuc['yapilandirilmis_veri']
+        desen_histogrami.ekle(sonuc.get('metrics'))
+    logging.info(f"⚡ Desen aşaması {len(tum_sonuclar)} faturada {time.perf_counter() - baslangic:.2f} sn sürdü.")
 
 
     logging.info("📊 Değerlendirme sonuçları hesaplanıyor...")
@@ -147,6 +206,9 @@ def main():
         
     df = pd.DataFrame(alan_raporlari)
     logging.info("\n" + df.to_string(index=False))
+    if len(cikarim_histogrami):
+        logging.info("Çıkarım Aşama Süreleri (ms):\n" + cikarim_histogrami.tablo())
+    logging.info("Desen Aşama Süreleri (ms):\n" + desen_histogrami.tablo())
 
     # Sonuçları dosyaya kaydet
     os.makedirs('test_reports', exist_ok=True)
@@ -160,6 +222,7 @@ def main():
                 "eksik": toplam_rapor["eksik"]
             },
             "alan_bazli_rapor": df.to_dict('records'),
+            "asama_sureleri_ms": {"cikarim": cikarim_histogrami.ozet(), "desen": desen_histogrami.ozet()},
             "detayli_sonuclar": detayli_sonuclar
         }, f, ensure_ascii=False, indent=4)
         
@@ -170,4 +233,8 @@ if __name__ == "__main__":
     # Windows'ta paralel işlem için gerekli
     import multiprocessing
     multiprocessing.freeze_support()
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Golden dataset ile değerlendirme")
+    parser.add_argument('--yeniden-cikar', action='store_true',
+                        help="Kelime çıkarım önbelleğini yok say (pdfplumber/OCR tüm faturalarda yeniden çalışır)")
+    main(yeniden_cikar=parser.parse_args().yeniden_cikar)
@@ -0,0 +1,137 @@
+import re
+import logging
+from typing import List, Dict, Optional, Any, Tuple
+
+DESEN_BAYRAKLARI = re.IGNORECASE | re.DOTALL
+
+# Birleştirilmiş bir desene güvenle gömülemeyecek yapılar:
+# numaralı/isimli geri referanslar, isimli gruplar ve global satır içi bayraklar
+_BIRLESTIRILEMEZ = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?<[A-Za-z_]|^\(\?[aiLmsux]+\)")
+
+
+class _DesenGrubu:
+    """
+    Aynı hedef bloğa (`blok`) bakan desenler. Uygun desenler tek bir
+    alternasyonlu tarayıcıda birleştirilir; blok metni bir kez taranır.
+    """
+
+    def __init__(self, blok: Optional[str], anahtarlar: List[str], derlenmisler: List[re.Pattern], logger: logging.Logger):
+        self.blok = blok
+        self.anahtarlar = anahtarlar
+        self.derlenmisler = derlenmisler
+        self.birlesik: Optional[re.Pattern] = None
+        self._grup_sahibi: Dict[int, int] = {}     # sarmalayıcı grup no -> desen sırası
+        self._grup_araligi: List[Tuple[int, int]] = []  # desen sırası -> (sarmalayıcı no, iç grup sayısı)
+        self._tekil: List[int] = []                # birleştirilemeyen desenlerin sırası
+
+        parcalar = []
+        grup_no = 1
+        birlesikler = []
+        for i, derlenmis in enumerate(derlenmisler):
+            if _BIRLESTIRILEMEZ.search(derlenmis.pattern):
+                self._tekil.append(i)
+                self._grup_araligi.append((0, 0))
+                continue
+            # Her desen bir lookahead içinde sarılır: eşleşme metni tüketmez,
+            # böylece desenlerin çakışan eşleşmeleri birbirini engellemez.
+            parcalar.append(f"(?=({derlenmis.pattern}))")
+            self._grup_sahibi[grup_no] = i
+            self._grup_araligi.append((grup_no, derlenmis.groups))
+            birlesikler.append(i)
+            grup_no += 1 + derlenmis.groups
+        if len(birlesikler) > 1:
+            try:
+                self.birlesik = re.compile("|".join(parcalar), DESEN_BAYRAKLARI)
+            except re.error as e:
+                logger.warning(f"'{blok}' bloğu desenleri birleştirilemedi, tek tek taranacak: {e}")
+                self.birlesik = None
+        if self.birlesik is None:
+            self._tekil = list(range(len(derlenmisler)))
+
+    def tara(self, metin: str) -> Dict[int, Tuple[Tuple[Any, ...], str]]:
+        """
+        Her desenin metindeki ilk (en soldaki) eşleşmesini döndürür:
+        desen sırası -> (iç gruplar, tüm eşleşme). Sonuç, her desen için
+        ayrı ayrı `re.search` çağrısıyla birebir aynıdır.
+        """
+        sonuc: Dict[int, Tuple[Tuple[Any, ...], str]] = {}
+        for i in self._tekil:
+            m = self.derlenmisler[i].search(metin)
+            if m:
+                sonuc[i] = (m.groups(), m.group(0))
+        if self.birlesik is None:
+            return sonuc
+
+        birlesik_sayisi = len(self._grup_sahibi)
+        bulunan_konum: Dict[int, int] = {}
+        eslesme_konumlari: List[Tuple[int, int]] = []  # (konum, kazanan desen)
+        for m in self.birlesik.finditer(metin):
+            kazanan = self._grup_sahibi[m.lastindex]
+            konum = m.start()
+            eslesme_konumlari.append((konum, kazanan))
+            if kazanan not in bulunan_konum:
+                bulunan_konum[kazanan] = konum
+                sarmalayici, grup_sayisi = self._grup_araligi[kazanan]
+                sonuc[kazanan] = (m.groups()[sarmalayici:sarmalayici + grup_sayisi], m.group(sarmalayici))
+                if len(bulunan_konum) == birlesik_sayisi:
+                    break
+
+        # Alternasyon bir konumda yalnızca ilk eşleşen deseni raporlar. Daha önce
+        # başka bir desenin kazandığı konumlarda, sonraki desenler doğrudan denenir.
+        for sarmalayici, i in self._grup_sahibi.items():
+            ilk = bulunan_konum.get(i)
+            for konum, kazanan in eslesme_konumlari:
+                if ilk is not None and konum >= ilk:
+                    break
+                if kazanan >= i:
+                    continue
+                m = self.derlenmisler[i].match(metin, konum)
+                if m:
+                    sonuc[i] = (m.groups(), m.group(0))
+                    break
+        return sonuc
+
+
+class DesenKayitDefteri:
+    """
+    patterns.json desenlerini yükleme anında bir kez derler ve hedef bloğa
+    göre gruplar. Her bloğun metni, o bloğa ait tüm desenler için tek
+    geçişte taranır.
+    """
+
+    def __init__(self, patterns: Dict, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self.anahtarlar: List[str] = []
+        gruplar: Dict[Optional[str], Tuple[List[str], List[re.Pattern]]] = {}
+        for key, pattern_info in (patterns or {}).items():
+            if not isinstance(pattern_info, dict): continue
+            desen = pattern_info.get('desen')
+            if not desen: continue
+            try:
+                derlenmis = re.compile(desen, DESEN_BAYRAKLARI)
+            except re.error as e:
+                self.logger.error(f"Pattern '{key}' derlenemedi, atlanacak: {e}")
+                continue
+            self.anahtarlar.append(key)
+            anahtarlar, derlenmisler = gruplar.setdefault(pattern_info.get('blok'), ([], []))
+            anahtarlar.append(key)
+            derlenmisler.append(derlenmis)
+        self.gruplar = [_DesenGrubu(blok, anahtarlar, derlenmisler, self.logger)
+                        for blok, (anahtarlar, derlenmisler) in gruplar.items()]
+
+    def __len__(self) -> int:
+        return len(self.anahtarlar)
+
+    def eslestir(self, blocks: Dict[str, str], full_text: str) -> Dict[str, str]:
+        """
+        Blok metinlerinde desenleri çalıştırır. `blok` tanımsız ya da bilinmeyen
+        desenler tam metinde aranır. Sonuç patterns.json sırasını korur.
+        """
+        bulunanlar: Dict[str, str] = {}
+        for grup in self.gruplar:
+            target_text = blocks.get(grup.blok, full_text)
+            if not target_text: continue
+            for i, (gruplar, tum_eslesme) in grup.tara(target_text).items():
+                value = next((g for g in gruplar if g is not None), tum_eslesme)
+                bulunanlar[grup.anahtarlar[i]] = " ".join(value.strip().split())
+        return {key: bulunanlar[key] for key in self.anahtarlar if key in bulunanlar}
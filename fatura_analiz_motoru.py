@@ -1,123 +1,356 @@
-import re
 import os
 import json
 import logging
-from typing import List, Dict, Optional, Any, Tuple
-from collections import defaultdict
+from typing import List, Dict, Optional, Any, Tuple, Iterator, Iterable, Callable, Union
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import cv2
-import pytesseract
-import fitz  # PyMuPDF
-import pdfplumber
-import pandas as pd
 from utils import validate_patterns_structure, preprocess_image, guardian_postprocess
+from belge_oturumu import BelgeOturumu, BelgeKaynagi, VARSAYILAN_GORUNTU_DPI
+from desen_kayit_defteri import DesenKayitDefteri
+from capa_eslestirici import CapaEslestirici
+from kelime_dizisi import KelimeDizisi, blok_merkezleri
+from kelime_tablosu import kalem_tablosunu_cikar
+from uyarlamali_ocr import metin_bolgelerini_bul, bolge_kirpimlari, ONIZLEME_DPI, BOLGE_PSM, BOLGE_KENAR_PAYI
+from sonuc_onbellegi import SonucOnbellegi, desen_ozeti, onbellek_olustur
+from hata_ayiklama import hata_ayiklama_yazicisi, DEBUG_DPI
+from metrikler import AsamaSureleri, OLCUM_YOK, profille
+
+PATTERNS_YOLU = 'config/patterns.json'
+CAPALAR_YOLU = 'config/anchors.json'
+# Çıkarım mantığı sonuçları etkileyecek şekilde değiştiğinde artırılmalı (önbellek anahtarının parçası)
+MOTOR_SURUMU = '1.3.0'
+BLOK_ADLARI = ('satici', 'alici', 'fatura_bilgileri', 'toplamlar')
+OCR_DPI = 300
+# Üst bilgi bölgeleri yalnızca ilk sayfada aranır; sonraki sayfalarda yalnızca toplamlar ve tam metin
+UST_BILGI_BLOKLARI = ('satici', 'alici', 'fatura_bilgileri')
+# Ürün kalemi tablosunun başlığında bulunması gereken sütunlar
+KALEM_BASLIKLARI = ('mal hizmet', 'miktar')
+# Varsayılan erken durdurma alanları: her e-Faturanın toplamlar bölümünde bulunan tutarlar
+VARSAYILAN_ERKEN_DURDURMA_ALANLARI = ('mal_hizmet_toplam_tutari', 'vergiler_dahil_toplam_tutar', 'odenecek_tutar')
+# e-Fatura kalem tabloları çizgilerle çizilir; kısa çizgi parçaları (alt çizgi,
+# logo, karakter süsleri) kesişim aramasına katılmasın diye elenir
+KALEM_TABLO_AYARLARI = {
+    'vertical_strategy': 'lines',
+    'horizontal_strategy': 'lines',
+    'snap_tolerance': 3,
+    'join_tolerance': 3,
+    'intersection_tolerance': 3,
+    'edge_min_length': 8,
+}
+# 'pdfplumber': çizgi/kesişim tabanlı tablo bulma; 'kelime': başlık kelimelerinin
+# koordinatlarından sütun çıkarımı (bulunamazsa sayfa için pdfplumber'a düşülür)
+KALEM_CIKARIM_YONTEMLERI = ('pdfplumber', 'kelime')
+# 'tam_sayfa': her sayfa OCR_DPI ile tümüyle OCR'lanır; 'uyarlamali': düşük DPI
+# önizlemede bulunan metin bölgeleri yüksek DPI ile kırpılıp bölge bölge OCR'lanır
+OCR_MODLARI = ('tam_sayfa', 'uyarlamali')
+
+
+def desenleri_yukle(config_path: str = PATTERNS_YOLU, logger: Optional[logging.Logger] = None) -> Dict:
+    """patterns.json dosyasını proje köküne göre okur; hata durumunda boş dict döner."""
+    logger = logger or logging.getLogger(__name__)
+    try:
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        absolute_path = os.path.join(project_root, config_path)
+        with open(absolute_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.error(f"Patterns dosyası bulunamadı: {config_path}")
+        return {}
+    except json.JSONDecodeError as e:
+        logger.error(f"Patterns JSON format hatası: satır/sütun bilinmiyor, detay: {e}")
+        return {}
+    except Exception:
+        logger.exception(f"Patterns yüklenirken beklenmeyen hata: {config_path}")
+        return {}
+
+
+def capalari_yukle(config_path: str = CAPALAR_YOLU, ek_capalar: Optional[Dict[str, List[str]]] = None,
+                   logger: Optional[logging.Logger] = None) -> Dict[str, List[str]]:
+    """
+    Bölge sınırı tahmininde kullanılan çapa kelimelerini (kategori -> kelimeler)
+    okur. `ek_capalar` (ör. tedarikçiye özel kelimeler) aynı kategorilere eklenir.
+    """
+    logger = logger or logging.getLogger(__name__)
+    capalar: Dict[str, List[str]] = {}
+    try:
+        project_root = os.path.dirname(os.path.abspath(__file__))
+        with open(os.path.join(project_root, config_path), 'r', encoding='utf-8') as f:
+            capalar = {k: list(v) for k, v in json.load(f).items()}
+    except FileNotFoundError:
+        logger.error(f"Çapa dosyası bulunamadı: {config_path}")
+    except Exception:
+        logger.exception(f"Çapa kelimeleri yüklenirken hata: {config_path}")
+    for kategori, kelimeler in (ek_capalar or {}).items():
+        mevcut = capalar.setdefault(kategori, [])
+        mevcut.extend(k for k in kelimeler if k not in mevcut)
+    return capalar
+
+
+def ayarlardan_motor_olustur(ayarlar: Optional[Dict] = None, patterns: Optional[Dict] = None, **degisiklikler) -> 'FaturaAnalizMotoru':
+    """
+    config.json ayarlarından analiz motorunu kurar. `degisiklikler` ile verilen
+    yapıcı argümanları ayarların üzerine yazılır.
+    """
+    ayarlar = ayarlar or {}
+    secenekler = {
+        'tesseract_cmd_path': ayarlar.get('tesseract_cmd_path'),
+        'debug_gorsel': ayarlar.get('debug_gorsel', False),
+        'ocr_isci_sayisi': ayarlar.get('ocr_isci_sayisi', 0),
+        'kalem_cikarim_yontemi': ayarlar.get('kalem_cikarim_yontemi', 'pdfplumber'),
+        'goruntu_dpi': ayarlar.get('goruntu_dpi', VARSAYILAN_GORUNTU_DPI),
+        'ocr_modu': ayarlar.get('ocr_modu', 'tam_sayfa'),
+        'metrikler': ayarlar.get('metrikler', False),
+        'profil_klasoru': ayarlar.get('profil_klasoru') or None,
+        'patterns': patterns,
+    }
+    if 'capalar' not in degisiklikler and ayarlar.get('ek_capalar'):
+        secenekler['capalar'] = capalari_yukle(ek_capalar=ayarlar['ek_capalar'])
+    if 'onbellek' not in degisiklikler:
+        secenekler['onbellek'] = onbellek_olustur(ayarlar)
+    secenekler.update(degisiklikler)
+    return FaturaAnalizMotoru(**secenekler)
+
 
 class FaturaAnalizMotoru:
     """
     Akıllı Fatura Tanıma Sistemi (Blok & Koordinat Tabanlı).
     """
 
-    def __init__(self, tesseract_cmd_path: Optional[str] = None):
-        if tesseract_cmd_path and os.path.exists(tesseract_cmd_path):
-            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd_path
+    def __init__(self, tesseract_cmd_path: Optional[str] = None, debug_gorsel: bool = False,
+                 patterns: Optional[Dict] = None, onbellek: Optional[SonucOnbellegi] = None,
+                 erken_durdurma_alanlari: Optional[List[str]] = None, ocr_isci_sayisi: int = 0,
+                 capalar: Optional[Dict[str, List[str]]] = None, kalem_cikarim_yontemi: str = 'pdfplumber',
+                 goruntu_dpi: int = VARSAYILAN_GORUNTU_DPI, ocr_modu: str = 'tam_sayfa',
+                 metrikler: bool = False, profil_klasoru: Optional[str] = None):
+        # pytesseract (ve onun yüklediği pandas) yalnızca OCR gerektiğinde içe aktarılır
+        self.tesseract_cmd_path = tesseract_cmd_path if tesseract_cmd_path and os.path.exists(tesseract_cmd_path) else None
         self.logger = logging.getLogger(__name__)
-        self.patterns = self._load_patterns_from_config('config/patterns.json')
-        validate_patterns_structure(self.patterns, self.logger)
+        # Bölge işaretli debug görselleri yalnızca istenirse, arka planda üretilir
+        self.debug_gorsel = debug_gorsel
+        if patterns is None:
+            self.patterns = self._load_patterns_from_config(PATTERNS_YOLU)
+            validate_patterns_structure(self.patterns, self.logger)
+        else:
+            # Önceden yüklenip doğrulanmış desenler (ör. süreç havuzu işçileri için)
+            self.patterns = patterns
+        # Desenler bir kez derlenir ve hedef bloğa göre gruplanır
+        self.desen_defteri = DesenKayitDefteri(self.patterns, self.logger)
+        # Bölge sınırlarını ayarlayan çapa kelimeleri tek bir otomatta toplanır
+        self.capalar = capalar if capalar is not None else capalari_yukle(logger=self.logger)
+        self.capa_eslestirici = CapaEslestirici(self.capalar)
+        if kalem_cikarim_yontemi not in KALEM_CIKARIM_YONTEMLERI:
+            self.logger.warning(f"Bilinmeyen kalem çıkarım yöntemi '{kalem_cikarim_yontemi}', 'pdfplumber' kullanılacak.")
+            kalem_cikarim_yontemi = 'pdfplumber'
+        self.kalem_cikarim_yontemi = kalem_cikarim_yontemi
+        # Görüntü dosyalarında (PNG/JPG/TIFF) piksellerin sayfa birimine çevrildiği varsayılan çözünürlük
+        self.goruntu_dpi = goruntu_dpi
+        if ocr_modu not in OCR_MODLARI:
+            self.logger.warning(f"Bilinmeyen OCR modu '{ocr_modu}', 'tam_sayfa' kullanılacak.")
+            ocr_modu = 'tam_sayfa'
+        self.ocr_modu = ocr_modu
+        # İçerik özetine dayalı sonuç önbelleği (isteğe bağlı)
+        self.onbellek = onbellek
+        # Kelime/kalem çıkarımını etkileyen ayarlar; desen ve çapalar ayrıca sonuç anahtarına girer
+        self.cikarim_ozeti = desen_ozeti({'kalem_cikarim_yontemi': self.kalem_cikarim_yontemi,
+                                          'goruntu_dpi': self.goruntu_dpi, 'ocr_modu': self.ocr_modu})
+        # Çok sayfalı belgelerde bu alanların hepsi bulununca kalan sayfalar okunmaz.
+        # İsteğe bağlı alanlar (iskonto, yazı ile tutar) burada olmamalı; yoksa durdurma hiç tetiklenmez.
+        if erken_durdurma_alanlari is None:
+            erken_durdurma_alanlari = list(VARSAYILAN_ERKEN_DURDURMA_ALANLARI)
+        self.erken_durdurma_alanlari = [k for k in erken_durdurma_alanlari if k in self.desen_defteri.anahtarlar]
+        # Sonuç önbelleği anahtarı: sonucu değiştiren her ayar (erken durdurma ham metni ve okunan sayfaları belirler)
+        self._ayar_ozeti = desen_ozeti({'desenler': self.patterns, 'capalar': self.capalar, 'cikarim': self.cikarim_ozeti,
+                                        'kalem_cikarim_yontemi': self.kalem_cikarim_yontemi,
+                                        'erken_durdurma_alanlari': sorted(self.erken_durdurma_alanlari)})
+        # OCR fallback'te sayfaları paralel işleyen Tesseract işçi sayısı (0 = CPU sayısı)
+        self.ocr_isci_sayisi = ocr_isci_sayisi or os.cpu_count() or 1
+        self._ocr_executor: Optional[ThreadPoolExecutor] = None
+        # Aşama süreleri sonuca `metrics` anahtarıyla eklenir; profil klasörü
+        # verilirse her belge için bir cProfile dökümü yazılır
+        self.metrikler = metrikler
+        self.profil_klasoru = profil_klasoru
+        # Yalnızca analiz sırasında geçerli; motor aynı anda tek belge işler
+        self._olcum = OLCUM_YOK
+
+    def kapat(self) -> None:
+        """Motorun arka plan kaynaklarını (OCR iş parçacıkları) kapatır."""
+        if self._ocr_executor is not None:
+            self._ocr_executor.shutdown(wait=True)
+            self._ocr_executor = None
 
     def _load_patterns_from_config(self, config_path: str) -> Dict:
+        return desenleri_yukle(config_path, self.logger)
+
+    def _pdf_sayfasini_goruntuye_cevir(self, oturum: BelgeOturumu, page_num: int = 0, dpi: int = 300, sakla: bool = True) -> Optional[np.ndarray]:
+        return oturum.sayfa_goruntusu(page_num, dpi, sakla)
+
+    def _get_words_with_coords(self, oturum: BelgeOturumu, sayfa_no: int = 0) -> Tuple[KelimeDizisi, Tuple[float, float]]:
+        if not oturum.pdf_mi:
+            return KelimeDizisi.sozluklerden([]), (0.0, 0.0)
+        return oturum.sayfa_kelimeleri(sayfa_no)
+
+    @staticmethod
+    def _sayfa_sirasi(sayfa_sayisi: int) -> Iterator[int]:
+        """Önce ilk sayfa (üst bilgiler), sonra son sayfa (toplamlar), sonra aradakiler."""
+        if sayfa_sayisi <= 0:
+            return
+        yield 0
+        if sayfa_sayisi > 1:
+            yield sayfa_sayisi - 1
+        yield from range(1, sayfa_sayisi - 1)
+
+    def _sayfalari_uret(self, oturum: BelgeOturumu) -> Iterator[Tuple[int, KelimeDizisi, Tuple[float, float]]]:
+        """Sayfa kelimelerini tembel olarak üretir; tüketilmeyen sayfalar hiç ayrıştırılmaz."""
+        sayfa_sayisi = oturum.sayfa_sayisi if oturum.pdf_mi else 0
+        for sayfa_no in self._sayfa_sirasi(max(sayfa_sayisi, 1)):
+            with self._olcum.olc('kelime_cikarimi'):
+                words, page_size = self._get_words_with_coords(oturum, sayfa_no)
+            yield sayfa_no, words, page_size
+
+    def _erken_durdurulabilir_mi(self, data: Dict[str, Any]) -> bool:
+        return bool(self.erken_durdurma_alanlari) and all(k in data for k in self.erken_durdurma_alanlari)
+
+    def _ocr_havuzu(self) -> ThreadPoolExecutor:
+        """
+        Sayfa OCR'ı için iş parçacığı havuzu. Asıl iş her çağrıda başlatılan
+        Tesseract alt sürecinde yapıldığından iş parçacıkları gerçek paralellik sağlar.
+        """
+        if self._ocr_executor is None:
+            if self.ocr_isci_sayisi > 1:
+                # Her Tesseract süreci tek çekirdek kullansın; aksi halde çekirdekler aşırı paylaşılır
+                os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+            self._ocr_executor = ThreadPoolExecutor(max_workers=self.ocr_isci_sayisi, thread_name_prefix='ocr')
+        return self._ocr_executor
+
+    def _sirali_paralel_isle(self, girdiler: Iterable[Any], islev: Callable[[Any], Any]) -> List[Any]:
+        """
+        Girdileri OCR havuzunda işler ve sonuçları girdi sırasıyla döndürür.
+        Aynı anda bekleyen iş sayısı sınırlıdır; girdiler (render edilmiş sayfalar)
+        üretildikçe tüketilir, hepsi birden bellekte tutulmaz.
+        """
+        havuz = self._ocr_havuzu()
+        sinir = self.ocr_isci_sayisi * 2
+        bekleyenler = deque()
+        sonuclar = []
+        for girdi in girdiler:
+            bekleyenler.append(havuz.submit(islev, girdi))
+            if len(bekleyenler) >= sinir:
+                sonuclar.append(bekleyenler.popleft().result())
+        while bekleyenler:
+            sonuclar.append(bekleyenler.popleft().result())
+        return sonuclar
+
+    def _pytesseract(self) -> Any:
+        """pytesseract modülünü ilk OCR'da içe aktarır ve Tesseract yolunu ayarlar."""
+        import pytesseract
+        if self.tesseract_cmd_path:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd_path
+        return pytesseract
+
+    def _sayfa_kelimelerini_ocr_et(self, image: Optional[np.ndarray], dpi: int = OCR_DPI, psm: int = 6,
+                                   konum: Tuple[float, float] = (0.0, 0.0)) -> Tuple[KelimeDizisi, Tuple[float, float]]:
+        """
+        Sayfa (ya da `konum`dan başlayan sayfa bölgesi) görüntüsünü kelime
+        düzeyinde OCR'lar (image_to_data) ve kutuları pdfplumber kelimeleriyle
+        aynı biçime ve sayfa birimine (pt) ölçekler; böylece bölgeleme aynen
+        uygulanabilir.
+        """
+        if image is None:
+            return KelimeDizisi.sozluklerden([]), (0.0, 0.0)
+        olcek = 72.0 / dpi
+        page_size = (image.shape[1] * olcek, image.shape[0] * olcek)
         try:
-            project_root = os.path.dirname(os.path.abspath(__file__))
-            absolute_path = os.path.join(project_root, config_path)
-            with open(absolute_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            self.logger.error(f"Patterns dosyası bulunamadı: {config_path}")
-            return {}
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Patterns JSON format hatası: satır/sütun bilinmiyor, detay: {e}")
-            return {}
+            with self._olcum.olc('ocr_on_isleme'):
+                processed = preprocess_image(image, 'auto', sureler=self._olcum)
+            config = f'--oem 3 --psm {psm}'
+            pytesseract = self._pytesseract()
+            with self._olcum.olc('tesseract'):
+                veri = pytesseract.image_to_data(processed, lang='tur', config=config, output_type=pytesseract.Output.DICT)
         except Exception:
-            self.logger.exception(f"Patterns yüklenirken beklenmeyen hata: {config_path}")
-            return {}
+            self.logger.exception("OCR fallback sırasında hata")
+            return KelimeDizisi.sozluklerden([]), page_size
+        return self._ocr_verisini_diziye_cevir(veri, olcek, konum), page_size
 
-    def _pdf_sayfasini_goruntuye_cevir(self, pdf_path: str, page_num: int = 0, dpi: int = 300) -> Optional[np.ndarray]:
-        try:
-            doc = fitz.open(pdf_path)
-            if page_num >= len(doc): return None
-            page = doc.load_page(page_num)
-            pix = page.get_pixmap(dpi=dpi)
-            img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
-            if pix.n == 3: # RGB
-                img = cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
-            elif pix.n == 4: # RGBA
-                img = cv2.cvtColor(img, cv2.COLOR_RGBA2BGR)
-            return img
-        except Exception as e:
-            self.logger.error(f"PDF sayfası görüntüye dönüştürülürken hata: {e}")
-            return None
+    @staticmethod
+    def _ocr_verisini_diziye_cevir(veri: Dict[str, List], olcek: float, konum: Tuple[float, float] = (0.0, 0.0)) -> KelimeDizisi:
+        """image_to_data çıktısını (piksel) kelime dizisine (pt) çevirir; boş ve kelime olmayan satırlar atılır."""
+        texts = np.array([(t or '').strip() for t in veri['text']], dtype=object)
+        conf = np.asarray(veri['conf'], dtype=np.float64)
+        maske = (conf >= 0) & (texts != '')
+        left = np.asarray(veri['left'], dtype=np.float64)[maske] * olcek + konum[0]
+        top = np.asarray(veri['top'], dtype=np.float64)[maske] * olcek + konum[1]
+        width = np.asarray(veri['width'], dtype=np.float64)[maske] * olcek
+        height = np.asarray(veri['height'], dtype=np.float64)[maske] * olcek
+        return KelimeDizisi(texts[maske], left, top, left + width, top + height)
 
-    def _get_words_with_coords(self, file_path: str) -> Tuple[List[Dict], Tuple[float, float]]:
-        words = []
-        page_size = (0.0, 0.0)
-        if file_path.lower().endswith('.pdf'):
-            try:
-                with pdfplumber.open(file_path) as pdf:
-                    if pdf.pages:
-                        page = pdf.pages[0]
-                        words = [{'text': w['text'], 'x0': w['x0'], 'top': w['top'], 'x1': w['x1'], 'bottom': w['bottom']} for w in page.extract_words(x_tolerance=2)]
-                        page_size = (page.width, page.height)
-            except Exception as e:
-                self.logger.warning(f"Pdfplumber kelime çıkaramadı: {e}.")
-        return words, page_size
-
-    def _ocr_fulltext_fallback(self, file_path: str) -> str:
+    def _ocr_kelime_fallback(self, oturum: BelgeOturumu) -> List[Tuple[KelimeDizisi, Tuple[float, float]]]:
+        """Tüm sayfaları paralel OCR'lar; sayfa sırasıyla (kelimeler, sayfa boyutu) döndürür."""
+        if self.ocr_modu == 'uyarlamali':
+            return self._uyarlamali_ocr(oturum)
         try:
-            image = self._pdf_sayfasini_goruntuye_cevir(file_path, dpi=300)
-            if image is None:
-                return ''
-            processed = preprocess_image(image, 'auto')
-            config = '--oem 3 --psm 6'
-            text = pytesseract.image_to_string(processed, lang='tur', config=config)
-            return text or ''
+            sayfa_sayisi = oturum.goruntu_sayfa_sayisi
+            # Yalnızca ilk sayfa oturumda saklanır (debug görseli yeniden kullanır)
+            goruntuler = (self._pdf_sayfasini_goruntuye_cevir(oturum, i, dpi=OCR_DPI, sakla=(i == 0)) for i in range(sayfa_sayisi))
+            return self._sirali_paralel_isle(goruntuler, self._sayfa_kelimelerini_ocr_et)
         except Exception:
             self.logger.exception("OCR fallback sırasında hata")
-            return ''
-
-    def _group_words_into_blocks(self, words: List[Dict], line_tolerance: int = 10, block_tolerance_multiplier: float = 2.5) -> List[Dict]:
-        if not words: return []
-        words.sort(key=lambda w: (w['top'], w['x0']))
-        lines = []
-        if words:
-            current_line = [words[0]]
-            for word in words[1:]:
-                if abs(word['top'] - current_line[-1]['top']) < line_tolerance:
-                    current_line.append(word)
-                else:
-                    lines.append(current_line)
-                    current_line = [word]
-            lines.append(current_line)
-        blocks = []
-        if not lines: return []
-        current_block_words = lines[0]
-        avg_heights = [w['bottom'] - w['top'] for w in words if w['bottom'] > w['top']]
-        avg_height = sum(avg_heights) / len(avg_heights) if avg_heights else 10
-        block_tolerance = avg_height * block_tolerance_multiplier
-        for line in lines[1:]:
-            if (line[0]['top'] - current_block_words[-1]['bottom']) < block_tolerance:
-                current_block_words.extend(line)
-            else:
-                blocks.append(current_block_words)
-                current_block_words = line
-        blocks.append(current_block_words)
-        formatted_blocks = []
-        for block_words in blocks:
-            text = " ".join(w['text'] for w in block_words)
-            x0 = min(w['x0'] for w in block_words)
-            top = min(w['top'] for w in block_words)
-            x1 = max(w['x1'] for w in block_words)
-            bottom = max(w['bottom'] for w in block_words)
-            formatted_blocks.append({'text': text, 'coords': (x0, top, x1, bottom)})
-        return formatted_blocks
+            return []
+
+    def _uyarlamali_ocr(self, oturum: BelgeOturumu) -> List[Tuple[KelimeDizisi, Tuple[float, float]]]:
+        """
+        Uyarlamalı OCR: her sayfa önce ONIZLEME_DPI ile render edilip metin
+        bölgeleri bulunur; bölgeler varsayılan bölge sınırlarına göre
+        (satıcı/alıcı/fatura bilgileri/toplamlar/gövde) gruplanır. Her grubun
+        kırpımı OCR_DPI ile yeniden render edilir ve bölgeye uygun PSM ile
+        OCR'lanır. Boş kenarlar ve logolar yüksek çözünürlükte hiç işlenmez.
+        """
+        sayfa_boyutlari: Dict[int, Tuple[float, float]] = {}
+
+        def isler() -> Iterator[Tuple[int, np.ndarray, int, Tuple[float, float], np.ndarray]]:
+            for sayfa_no in range(oturum.goruntu_sayfa_sayisi):
+                onizleme = oturum.sayfa_goruntusu(sayfa_no, ONIZLEME_DPI, sakla=False)
+                if onizleme is None:
+                    continue
+                page_size = (onizleme.shape[1] * 72.0 / ONIZLEME_DPI, onizleme.shape[0] * 72.0 / ONIZLEME_DPI)
+                sayfa_boyutlari[sayfa_no] = page_size
+                varsayilan_sinirlar = self._compute_boundaries([], page_size)
+                kutular = metin_bolgelerini_bul(onizleme, ONIZLEME_DPI)
+                for bolge, kirpim, bolge_kutulari in bolge_kirpimlari(kutular, varsayilan_sinirlar, page_size):
+                    goruntu = oturum.bolge_goruntusu(sayfa_no, kirpim, OCR_DPI)
+                    if goruntu is not None:
+                        yield sayfa_no, goruntu, BOLGE_PSM[bolge], kirpim[:2], bolge_kutulari
+
+        def bolgeyi_ocr_et(is_: Tuple[int, np.ndarray, int, Tuple[float, float], np.ndarray]) -> Tuple[int, KelimeDizisi]:
+            sayfa_no, goruntu, psm, konum, bolge_kutulari = is_
+            kelimeler, _ = self._sayfa_kelimelerini_ocr_et(goruntu, OCR_DPI, psm, konum)
+            if not len(kelimeler):
+                return sayfa_no, kelimeler
+            # Kırpımlar çakışabilir; yalnızca merkezi bu bölgenin metin kutularında olan kelimeler tutulur
+            cx = ((kelimeler.x0 + kelimeler.x1) / 2)[:, None]
+            cy = ((kelimeler.top + kelimeler.bottom) / 2)[:, None]
+            p = BOLGE_KENAR_PAYI
+            icinde = ((bolge_kutulari[:, 0] - p <= cx) & (cx <= bolge_kutulari[:, 2] + p) &
+                      (bolge_kutulari[:, 1] - p <= cy) & (cy <= bolge_kutulari[:, 3] + p)).any(axis=1)
+            return sayfa_no, kelimeler.sec(icinde)
+
+        try:
+            sonuclar = self._sirali_paralel_isle(isler(), bolgeyi_ocr_et)
+        except Exception:
+            self.logger.exception("Uyarlamalı OCR sırasında hata")
+            return []
+        sayfa_kelimeleri: Dict[int, List[KelimeDizisi]] = defaultdict(list)
+        for sayfa_no, kelimeler in sonuclar:
+            sayfa_kelimeleri[sayfa_no].append(kelimeler)
+        sayfa_sayisi = max(sayfa_boyutlari, default=-1) + 1
+        return [(KelimeDizisi.birlestir(sayfa_kelimeleri.get(i, [])), sayfa_boyutlari.get(i, (0.0, 0.0)))
+                for i in range(sayfa_sayisi)]
+
+    def _group_words_into_blocks(self, words: Union[List[Dict], KelimeDizisi], line_tolerance: int = 10, block_tolerance_multiplier: float = 2.5) -> List[Dict]:
+        if not len(words): return []
+        dizi = words if isinstance(words, KelimeDizisi) else KelimeDizisi.sozluklerden(words)
+        return dizi.bloklara_ayir(line_tolerance, block_tolerance_multiplier)
 
     def _compute_boundaries(self, blocks: List[Dict], page_size: Tuple[float, float]) -> Dict[str, float]:
         page_width, page_height = page_size
@@ -128,38 +361,24 @@ class FaturaAnalizMotoru:
         y_totals_start = page_height * 0.48
 
         try:
-            # Dinamik ayarlama: toplamlar için çapa kelimeler
-            total_anchors = [
-                'ödenecek', 'vergiler dahil', 'mal hizmet toplam', 'toplam iskonto',
-                'hesaplanan kdv', 'genel toplam', 'ödenecek tutar'
-            ]
-            y_candidates = []
-            for b in blocks:
-                t = b['text'].lower()
-                if any(a in t for a in total_anchors):
-                    # Toplamlar genelde bu bloğun merkezinin biraz üstünden başlar
-                    _, y0, _, y1 = b['coords']
-                    y_candidates.append((y0 + y1) / 2)
-            if y_candidates:
-                est = min(y_candidates)  # en yukarıdaki toplam-ilişkili blok
+            merkezler = blok_merkezleri(blocks)
+            # Dinamik ayarlama: çapa kelimeleri içeren bloklar tek geçişte bulunur
+            isabetler = self.capa_eslestirici.tara(b['text'] for b in blocks)
+
+            toplam_bloklari = isabetler.get('toplamlar')
+            if toplam_bloklari:
+                # Toplamlar genelde bu bloğun merkezinin biraz üstünden başlar
+                est = float(merkezler[toplam_bloklari, 1].min())  # en yukarıdaki toplam-ilişkili blok
                 # Bir miktar yukarı tolerans (satır başlarına denk getirmek için)
                 y_totals_start = max(page_height * 0.35, est - page_height * 0.03)
 
             # Fatura bilgileri (sağ üst) için çapa: Fatura No, ETTN, Fatura Tarihi
-            info_anchors = ['fatura no', 'ettn', 'fatura tarihi', 'düzenleme']
-            info_y = []
-            info_x = []
-            for b in blocks:
-                t = b['text'].lower()
-                if any(a in t for a in info_anchors):
-                    x0, y0, x1, y1 = b['coords']
-                    info_y.append((y0 + y1) / 2)
-                    info_x.append((x0 + x1) / 2)
-            if info_y:
-                y_buyer_info_end = max(y_buyer_info_end, max(info_y) + page_height * 0.02)
-            if info_x:
+            bilgi_bloklari = isabetler.get('fatura_bilgileri')
+            if bilgi_bloklari:
+                info_x = np.sort(merkezler[bilgi_bloklari, 0])
+                y_buyer_info_end = max(y_buyer_info_end, float(merkezler[bilgi_bloklari, 1].max()) + page_height * 0.02)
                 # Sağ ağırlıklı ise x_divider biraz sağa alınır
-                median_x = sorted(info_x)[len(info_x)//2]
+                median_x = float(info_x[len(info_x)//2])
                 x_divider = max(x_divider, median_x - page_width * 0.02)
         except Exception:
             self.logger.warning('Dinamik sınır tahmini başarısız, varsayılanlar kullanılacak')
@@ -172,9 +391,6 @@ class FaturaAnalizMotoru:
         }
 
     def _identify_blocks(self, blocks: List[Dict], page_size: Tuple[float, float], boundaries: Optional[Dict[str, float]] = None) -> Dict[str, str]:
-        page_width, page_height = page_size
-        identified_block_texts = {'satici': [], 'alici': [], 'fatura_bilgileri': [], 'toplamlar': []}
-
         if boundaries is None:
             boundaries = self._compute_boundaries(blocks, page_size)
         x_divider = boundaries['x_divider']
@@ -182,114 +398,261 @@ class FaturaAnalizMotoru:
         y_buyer_info_end = boundaries['y_buyer_info_end']
         y_totals_start = boundaries['y_totals_start']
 
-        for block in blocks:
-            x0, y0, x1, y1 = block['coords']
-            block_center_x = (x0 + x1) / 2
-            block_center_y = (y0 + y1) / 2
-            if block_center_y < y_seller_end and block_center_x < x_divider:
-                identified_block_texts['satici'].append(block['text'])
-            elif y_seller_end <= block_center_y < y_buyer_info_end and block_center_x < x_divider:
-                identified_block_texts['alici'].append(block['text'])
-            elif block_center_y < y_buyer_info_end and block_center_x >= x_divider:
-                identified_block_texts['fatura_bilgileri'].append(block['text'])
-            elif block_center_y > y_totals_start:
-                identified_block_texts['toplamlar'].append(block['text'])
-        return {key: "\n".join(texts) for key, texts in identified_block_texts.items()}
+        merkezler = blok_merkezleri(blocks)
+        cx, cy = merkezler[:, 0], merkezler[:, 1]
+        solda = cx < x_divider
+        # Bölgeler öncelik sırasıyla atanır (bir blok yalnızca ilk uyan bölgeye girer)
+        satici = (cy < y_seller_end) & solda
+        alici = ~satici & (y_seller_end <= cy) & (cy < y_buyer_info_end) & solda
+        fatura_bilgileri = ~satici & ~alici & (cy < y_buyer_info_end) & ~solda
+        toplamlar = ~(satici | alici | fatura_bilgileri) & (cy > y_totals_start)
+        maskeler = {'satici': satici, 'alici': alici, 'fatura_bilgileri': fatura_bilgileri, 'toplamlar': toplamlar}
+        return {key: "\n".join(blocks[i]['text'] for i in np.flatnonzero(maske)) for key, maske in maskeler.items()}
 
     def _extract_data_from_blocks(self, blocks: Dict[str, str], full_text: str) -> Dict[str, Any]:
-        data = {}
         if not self.patterns:
              self.logger.warning("Desenler (patterns) yüklenemediği için Regex ile veri çıkarılamıyor.")
-             return data
-        for key, pattern_info in self.patterns.items():
-            if not isinstance(pattern_info, dict): continue
-            desen = pattern_info.get('desen')
-            target_text = blocks.get(pattern_info.get('blok'), full_text)
-            if desen and target_text:
-                match = re.search(desen, target_text, re.IGNORECASE | re.DOTALL)
-                if match:
-                    value = next((g for g in match.groups() if g is not None), match.group(0))
-                    data[key] = " ".join(value.strip().split())
-        return data
+             return {}
+        return self.desen_defteri.eslestir(blocks, full_text)
     
-    def _gorsel_hata_ayiklama_ciz(self, file_path: str, page_size: Tuple[float, float], boundaries: Optional[Dict[str, float]] = None):
+    def _gorsel_hata_ayiklama_ciz(self, oturum: BelgeOturumu, page_size: Tuple[float, float],
+                                  boundaries: Optional[Dict[str, float]] = None) -> Optional[str]:
+        """Debug görselini kuyruğa ekler; görselin yazılacağı yolu döndürür."""
         try:
-            image = self._pdf_sayfasini_goruntuye_cevir(file_path, dpi=150)
-            if image is None: return
-            page_height, page_width, _ = image.shape
-            
-            if boundaries is None:
-                # Görüntü boyutundan tahmin (sayfa_size ile yakın)
-                x_divider = int(page_width * 0.52)
-                y_seller_end = int(page_height * 0.18)
-                y_buyer_info_end = int(page_height * 0.38)
-                y_totals_start = int(page_height * 0.48)
-            else:
-                x_divider = int(boundaries['x_divider'] / page_size[0] * page_width)
-                y_seller_end = int(boundaries['y_seller_end'] / page_size[1] * page_height)
-                y_buyer_info_end = int(boundaries['y_buyer_info_end'] / page_size[1] * page_height)
-                y_totals_start = int(boundaries['y_totals_start'] / page_size[1] * page_height)
-
-            areas = {
-                "satici (mavi)": (0, 0, x_divider, y_seller_end),
-                "alici (yesil)": (0, y_seller_end, x_divider, y_buyer_info_end),
-                "fatura_bilgileri (sari)": (x_divider, 0, page_width, y_buyer_info_end),
-                "toplamlar (kirmizi)": (0, y_totals_start, page_width, page_height)
-            }
-            colors = {"satici (mavi)": (255, 0, 0),"alici (yesil)": (0, 255, 0),"fatura_bilgileri (sari)": (0, 255, 255),"toplamlar (kirmizi)": (0, 0, 255)}
-            for name, (x0, y0, x1, y1) in areas.items():
-                cv2.rectangle(image, (x0, y0), (x1, y1), colors[name], 3)
-                cv2.putText(image, name.split(' ')[0], (x0 + 10, y0 + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.2, colors[name], 4)
-            output_folder = "test_reports/debug_images"
-            os.makedirs(output_folder, exist_ok=True)
-            base_name = os.path.splitext(os.path.basename(file_path))[0]
-            output_path = os.path.join(output_folder, f"debug_{base_name}.png")
-            cv2.imwrite(output_path, image)
+            # OCR için render edilmiş bir sayfa varsa tekrar rasterleştirmeye gerek yok
+            image = oturum.sayfa_goruntusu(0, DEBUG_DPI) if oturum.render_edildi_mi(0) else None
+            # Görsel adı içerik özetini taşır: aynı adlı farklı yüklemeler çakışmaz
+            return hata_ayiklama_yazicisi().ekle(oturum.kaynak, page_size, boundaries, image,
+                                                 oturum.dosya_adi or 'bellek', oturum.icerik_ozeti(), oturum.goruntu_dpi)
         except Exception as e:
             self.logger.error(f"Görsel hata ayıklama çıktısı oluşturulurken hata: {e}")
+            return None
 
-    def analiz_et(self, dosya_yolu: str) -> Dict[str, Any]:
-        words, page_size = self._get_words_with_coords(dosya_yolu)
-        full_text = ''
-        if words:
-            blocks_with_coords = self._group_words_into_blocks(words)
-            boundaries = self._compute_boundaries(blocks_with_coords, page_size)
-            identified_blocks = self._identify_blocks(blocks_with_coords, page_size, boundaries)
-            full_text = "\n".join([block['text'] for block in blocks_with_coords])
-        else:
-            # pdfplumber başarısızsa OCR fallback
-            self.logger.warning("pdfplumber kelime çıkaramadı, OCR fallback devrede")
-            ocr_text = self._ocr_fulltext_fallback(dosya_yolu)
-            full_text = ocr_text
-            identified_blocks = {k: '' for k in ['satici', 'alici', 'fatura_bilgileri', 'toplamlar']}
-            boundaries = None
-
-        # Debug görseli çiz (mümkünse)
+    def hata_ayiklama_bekle(self) -> None:
+        """Kuyruktaki debug görselleri diske yazılana kadar bekler."""
+        if self.debug_gorsel:
+            hata_ayiklama_yazicisi().bekle()
+
+    def analiz_et(self, kaynak: BelgeKaynagi, dosya_adi: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Faturayı analiz eder. `kaynak` dosya yolu, bayt dizisi ya da dosya
+        nesnesi olabilir; bellekteki içerik için `dosya_adi` türü (uzantı)
+        belirtir, verilmezse PDF imzasına bakılır.
+        """
+        with self._olcum_oturumu() as olcum, BelgeOturumu(kaynak, self.logger, dosya_adi, self.goruntu_dpi) as oturum:
+            anahtar = self._onbellek_anahtari(oturum)
+            # Debug görseli istendiğinde önbelleğe bakılmaz; aksi halde isabet görselsiz döner
+            if anahtar is not None and not self.debug_gorsel:
+                with olcum.olc('onbellek'):
+                    kayit = self.onbellek.getir(anahtar)
+                if kayit is not None:
+                    self.logger.debug(f"Önbellekten döndürüldü: {oturum.dosya_adi}")
+                    return self._metrikleri_ekle(kayit, olcum)
+            with profille(self.profil_klasoru, oturum.dosya_adi or f"bellek_{oturum.icerik_ozeti()[:12]}"):
+                sonuc = self._oturumu_analiz_et(oturum)
+            if anahtar is not None:
+                with olcum.olc('onbellek'):
+                    # Debug görseli yolu bu çalıştırmaya özgüdür, önbelleğe yazılmaz
+                    self.onbellek.kaydet(anahtar, {k: v for k, v in sonuc.items() if k != 'debug_gorsel_yolu'})
+            return self._metrikleri_ekle(sonuc, olcum)
+
+    def kelimeleri_cikar(self, kaynak: BelgeKaynagi, dosya_adi: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analizin desen ve çapalardan bağımsız, pahalı aşaması: sayfa kelimeleri
+        (pdfplumber ya da OCR) ve ürün kalemleri. Erken durdurma desen
+        sonuçlarına bağlı olduğundan tüm sayfalar işlenme sırasıyla çıkarılır.
+        Sonuç JSON'a yazılabilir; `cikarimdan_sonuc_olustur` ile desenler
+        değiştikçe belge yeniden açılmadan analiz tamamlanır.
+        """
+        with self._olcum_oturumu() as olcum, BelgeOturumu(kaynak, self.logger, dosya_adi, self.goruntu_dpi) as oturum:
+            sayfalar = [] if oturum.goruntu_mu else list(self._sayfalari_uret(oturum))
+            # `_oturumu_analiz_et` ile aynı ölçüt: ilk sayfada kelime yoksa OCR
+            ocr = not sayfalar or not len(sayfalar[0][1])
+            if ocr:
+                if not oturum.goruntu_mu:
+                    self.logger.warning("pdfplumber kelime çıkaramadı, OCR fallback devrede")
+                with olcum.olc('ocr'):
+                    ocr_sayfalari = self._ocr_kelime_fallback(oturum)
+                sayfalar = [(i, *ocr_sayfalari[i]) for i in self._sayfa_sirasi(len(ocr_sayfalari))]
+            with olcum.olc('kalem_tablosu'):
+                kalemler = self._urun_kalemlerini_cikar_pdfplumber(oturum) or []
+            cikarim = {
+                'ocr': ocr,
+                'sayfalar': [{'sayfa_no': n, 'boyut': list(boyut), 'kelimeler': kelimeler.sutunlara()}
+                             for n, kelimeler, boyut in sayfalar],
+                'urun_kalemleri': kalemler,
+            }
+            return self._metrikleri_ekle(cikarim, olcum)
+
+    def cikarimdan_sonuc_olustur(self, cikarim: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        `kelimeleri_cikar` çıktısından bölgeleme, desenler ve son işlemeyi
+        çalıştırır; sonuç aynı belge için `analiz_et` ile aynıdır.
+        """
+        with self._olcum_oturumu() as olcum:
+            sayfalar = ((s['sayfa_no'], KelimeDizisi.sutunlardan(s['kelimeler']), tuple(s['boyut'])) for s in cikarim['sayfalar'])
+            data, sayfa_metinleri, _, _ = self._sayfalari_isle(sayfalar, ilk_sayfa_bossa_dur=not cikarim['ocr'])
+            return self._metrikleri_ekle(self._sonucu_olustur(data, sayfa_metinleri, cikarim['urun_kalemleri']), olcum)
+
+    @contextmanager
+    def _olcum_oturumu(self) -> Iterator[Any]:
+        """Bir belgenin aşama sürelerini toplayan ölçümü etkinleştirir (metrikler kapalıysa boş ölçüm)."""
+        olcum = AsamaSureleri() if self.metrikler else OLCUM_YOK
+        self._olcum = olcum
         try:
-            self._gorsel_hata_ayiklama_ciz(dosya_yolu, page_size, boundaries)
-        except Exception:
-            self.logger.warning("Debug görseli oluşturulamadı")
+            yield olcum
+        finally:
+            self._olcum = OLCUM_YOK
+
+    def _metrikleri_ekle(self, sonuc: Dict[str, Any], olcum: Any) -> Dict[str, Any]:
+        """Metrikler açıksa aşama sürelerini `metrics` anahtarıyla ekler (önbellek kaydı değiştirilmez)."""
+        if not self.metrikler:
+            return sonuc
+        return {**sonuc, 'metrics': olcum.sozluk()}
 
-        data = self._extract_data_from_blocks(identified_blocks, full_text)
+    def _onbellek_anahtari(self, oturum: BelgeOturumu) -> Optional[str]:
+        if self.onbellek is None:
+            return None
+        try:
+            return self.onbellek.anahtar_olustur(oturum.icerik_ozeti(), self._ayar_ozeti, MOTOR_SURUMU)
+        except OSError as e:
+            self.logger.warning(f"Önbellek anahtarı hesaplanamadı: {e}")
+            return None
+
+    def _sayfalari_isle(self, sayfalar: Iterable[Tuple[int, KelimeDizisi, Tuple[float, float]]],
+                        ilk_sayfa_bossa_dur: bool = True) -> Tuple[Dict[str, Any], Dict[int, str], Tuple[float, float], Optional[Dict[str, float]]]:
+        """
+        Sayfaları sırayla bölgeler ve desenleri çalıştırır; erken durdurma
+        alanları bulununca kalan sayfaları tüketmez. Kelime kaynağından
+        (pdfplumber ya da OCR) bağımsızdır.
+        """
+        data: Dict[str, Any] = {}
+        sayfa_metinleri: Dict[int, str] = {}
+        page_size = (0.0, 0.0)
+        boundaries = None
+        for sayfa_no, words, sayfa_boyutu in sayfalar:
+            if not len(words):
+                if sayfa_no == 0 and ilk_sayfa_bossa_dur:
+                    break
+                continue
+            with self._olcum.olc('bloklama'):
+                blocks_with_coords = self._group_words_into_blocks(words)
+            with self._olcum.olc('sinirlar'):
+                sayfa_sinirlari = self._compute_boundaries(blocks_with_coords, sayfa_boyutu)
+                identified_blocks = self._identify_blocks(blocks_with_coords, sayfa_boyutu, sayfa_sinirlari)
+            if sayfa_no == 0:
+                page_size, boundaries = sayfa_boyutu, sayfa_sinirlari
+            else:
+                identified_blocks = {k: ('' if k in UST_BILGI_BLOKLARI else v) for k, v in identified_blocks.items()}
+            sayfa_metni = "\n".join([block['text'] for block in blocks_with_coords])
+            sayfa_metinleri[sayfa_no] = sayfa_metni
+            with self._olcum.olc('regex'):
+                bulunanlar = self._extract_data_from_blocks(identified_blocks, sayfa_metni)
+            for key, value in bulunanlar.items():
+                data.setdefault(key, value)
+            if self._erken_durdurulabilir_mi(data):
+                break
+        data = {key: data[key] for key in self.desen_defteri.anahtarlar if key in data}
+        return data, sayfa_metinleri, page_size, boundaries
+
+    def _oturumu_analiz_et(self, oturum: BelgeOturumu) -> Dict[str, Any]:
+        sayfa_metinleri: Dict[int, str] = {}
+        if not oturum.goruntu_mu:
+            data, sayfa_metinleri, page_size, boundaries = self._sayfalari_isle(self._sayfalari_uret(oturum))
+        if not sayfa_metinleri:
+            # Görüntü dosyaları ve metin katmanı olmayan PDF'ler OCR'lanır: kelime kutularıyla aynı bölgeleme
+            if not oturum.goruntu_mu:
+                self.logger.warning("pdfplumber kelime çıkaramadı, OCR fallback devrede")
+            with self._olcum.olc('ocr'):
+                ocr_sayfalari = self._ocr_kelime_fallback(oturum)
+            sira = ((i, *ocr_sayfalari[i]) for i in self._sayfa_sirasi(len(ocr_sayfalari)))
+            data, sayfa_metinleri, page_size, boundaries = self._sayfalari_isle(sira, ilk_sayfa_bossa_dur=False)
+
+        # Debug görseli (yalnızca debug modunda, arka planda)
+        debug_yolu = None
+        if self.debug_gorsel:
+            with self._olcum.olc('hata_ayiklama'):
+                debug_yolu = self._gorsel_hata_ayiklama_ciz(oturum, page_size, boundaries)
+
+        with self._olcum.olc('kalem_tablosu'):
+            kalemler = self._urun_kalemlerini_cikar_pdfplumber(oturum) or []
+        sonuc = self._sonucu_olustur(data, sayfa_metinleri, kalemler)
+        if debug_yolu:
+            sonuc['debug_gorsel_yolu'] = debug_yolu
+        return sonuc
+
+    @staticmethod
+    def _sonucu_olustur(data: Dict[str, Any], sayfa_metinleri: Dict[int, str], kalemler: List[Dict]) -> Dict[str, Any]:
+        full_text = "\n".join(sayfa_metinleri[i] for i in sorted(sayfa_metinleri))
         data = guardian_postprocess(data)
-        data['urun_kalemleri'] = self._urun_kalemlerini_cikar_pdfplumber(dosya_yolu) or []
+        data['urun_kalemleri'] = kalemler
         return {"yapilandirilmis_veri": data, "ham_metin": full_text}
 
-    def _urun_kalemlerini_cikar_pdfplumber(self, dosya_yolu: str) -> Optional[List[Dict]]:
-        if not dosya_yolu.lower().endswith('.pdf'): return None
+    def _urun_kalemlerini_cikar_pdfplumber(self, oturum: BelgeOturumu) -> Optional[List[Dict]]:
+        if not oturum.pdf_mi: return None
         try:
-            with pdfplumber.open(dosya_yolu) as pdf:
-                all_items = []
-                for page in pdf.pages:
-                    tables = page.extract_tables()
-                    if not tables: continue
-                    for table in tables:
-                        if not table or len(table) < 2: continue
-                        header = [str(cell).lower().replace('\n', ' ').strip() for cell in table[0] if cell]
-                        if 'mal hizmet' in header and 'miktar' in header:
-                            df = pd.DataFrame(table[1:], columns=header)
-                            all_items.extend(df.to_dict('records'))
-                return all_items
+            return list(self._urun_kalemlerini_uret(oturum))
         except Exception as e:
             self.logger.error(f"pdfplumber ile tablo çıkarılırken hata: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def _urun_kalemlerini_uret(self, oturum: BelgeOturumu) -> Iterator[Dict]:
+        """
+        Kalem tablosu satırlarını sırayla üretir. Başlık sözcükleri geçmeyen
+        sayfalarda tablo araması hiç yapılmaz; bulunan tablolardan yalnızca
+        başlık sözcüklerini kapsayanların hücreleri okunur.
+
+        Tablo, başlığın geçtiği ardışık sayfalardır: toplamlar çapasının
+        geçtiği sayfada ya da tablodan sonraki ilk başlıksız sayfada durulur.
+        Böylece alan geçişi erken durduysa tablodan sonraki sayfalar (ekler,
+        şartlar) burada da hiç ayrıştırılmaz.
+        """
+        pdf = oturum.pdf
+        if pdf is None: return
+        tablo_basladi = False
+        for sayfa_no, page in enumerate(pdf.pages):
+            words, _ = oturum.sayfa_kelimeleri(sayfa_no)
+            kucuk = [t.lower() for t in words.text.tolist()]
+            metin = " ".join(kucuk)
+            if not all(k in metin for b in KALEM_BASLIKLARI for k in b.split()):
+                if tablo_basladi or self._toplam_satiri_mi(metin):
+                    return
+                continue
+            tablo_basladi = True
+            yield from self._sayfa_kalemlerini_uret(page, sayfa_no, words, kucuk)
+            if self._toplam_satiri_mi(metin):
+                return
+
+    def _sayfa_kalemlerini_uret(self, page: Any, sayfa_no: int, words: KelimeDizisi, kucuk: List[str]) -> Iterator[Dict]:
+        """Kalem başlığı geçen bir sayfanın tablo satırları."""
+        if self.kalem_cikarim_yontemi == 'kelime':
+            kalemler = kalem_tablosunu_cikar(words, KALEM_BASLIKLARI, self._toplam_satiri_mi)
+            if kalemler:
+                yield from kalemler
+                return
+            self.logger.debug(f"Sayfa {sayfa_no + 1}: kelime tabanlı kalem tablosu bulunamadı, pdfplumber denenecek")
+        # Tablo, başlıktaki 'miktar' sözcüğünü kapsıyorsa kalem tablosu adayıdır
+        baslik_kelimeleri = np.array(['miktar' in t for t in kucuk], dtype=bool)
+        bx = (words.x0[baslik_kelimeleri] + words.x1[baslik_kelimeleri]) / 2
+        by = (words.top[baslik_kelimeleri] + words.bottom[baslik_kelimeleri]) / 2
+        for tablo in page.find_tables(KALEM_TABLO_AYARLARI):
+            x0, top, x1, bottom = tablo.bbox
+            if not np.any((x0 <= bx) & (bx <= x1) & (top <= by) & (by <= bottom)):
+                continue
+            yield from self._tablo_satirlarini_uret(tablo.extract())
+
+    def _toplam_satiri_mi(self, metin: str) -> bool:
+        """Satır bir toplam çapası içeriyorsa kalem tablosu bitmiştir."""
+        return bool(self.capa_eslestirici.tara((metin,)).get('toplamlar'))
+
+    @staticmethod
+    def _tablo_satirlarini_uret(table: List[List[Optional[str]]]) -> Iterator[Dict]:
+        """Başlığı kalem tablosu olan tablonun satırlarını başlıkla eşleyerek üretir."""
+        if not table or len(table) < 2: return
+        # Boş başlık hücreleri (birleştirilmiş sütunlar) atlanır; satır hücreleri aynı sütun konumlarından alınır
+        sutunlar = [(i, str(cell).lower().replace('\n', ' ').strip()) for i, cell in enumerate(table[0]) if cell]
+        header = [ad for _, ad in sutunlar]
+        if not all(b in header for b in KALEM_BASLIKLARI): return
+        konumlar = [i for i, _ in sutunlar]
+        for row in table[1:]:
+            yield dict(zip(header, (row[i] if i < len(row) else None for i in konumlar)))
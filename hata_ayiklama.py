@@ -0,0 +1,125 @@
+import os
+import queue
+import logging
+import threading
+from multiprocessing import util as mp_util
+from typing import Dict, Optional, Tuple, Union
+import numpy as np
+from belge_oturumu import BelgeOturumu, VARSAYILAN_GORUNTU_DPI
+
+DEBUG_KLASORU = "test_reports/debug_images"
+DEBUG_DPI = 150
+
+
+def bolge_cizimi_yap(image: np.ndarray, page_size: Tuple[float, float], boundaries: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """Satıcı/alıcı/fatura bilgileri/toplamlar bölgelerini görüntü üzerine çizer."""
+    page_height, page_width = image.shape[:2]
+
+    if boundaries is None:
+        # Görüntü boyutundan tahmin (sayfa_size ile yakın)
+        x_divider = int(page_width * 0.52)
+        y_seller_end = int(page_height * 0.18)
+        y_buyer_info_end = int(page_height * 0.38)
+        y_totals_start = int(page_height * 0.48)
+    else:
+        x_divider = int(boundaries['x_divider'] / page_size[0] * page_width)
+        y_seller_end = int(boundaries['y_seller_end'] / page_size[1] * page_height)
+        y_buyer_info_end = int(boundaries['y_buyer_info_end'] / page_size[1] * page_height)
+        y_totals_start = int(boundaries['y_totals_start'] / page_size[1] * page_height)
+
+    areas = {
+        "satici (mavi)": (0, 0, x_divider, y_seller_end),
+        "alici (yesil)": (0, y_seller_end, x_divider, y_buyer_info_end),
+        "fatura_bilgileri (sari)": (x_divider, 0, page_width, y_buyer_info_end),
+        "toplamlar (kirmizi)": (0, y_totals_start, page_width, page_height)
+    }
+    import cv2
+    colors = {"satici (mavi)": (255, 0, 0),"alici (yesil)": (0, 255, 0),"fatura_bilgileri (sari)": (0, 255, 255),"toplamlar (kirmizi)": (0, 0, 255)}
+    for name, (x0, y0, x1, y1) in areas.items():
+        cv2.rectangle(image, (x0, y0), (x1, y1), colors[name], 3)
+        cv2.putText(image, name.split(' ')[0], (x0 + 10, y0 + 30), cv2.FONT_HERSHEY_SIMPLEX, 1.2, colors[name], 4)
+    return image
+
+
+def debug_gorsel_yolu(dosya_yolu: str, icerik_ozeti: Optional[str] = None) -> str:
+    """
+    Debug görselinin yolu. İçerik özeti verilirse ada eklenir; aynı adla
+    eşzamanlı yüklenen farklı dosyaların görselleri birbirini ezmez.
+    """
+    base_name = os.path.splitext(os.path.basename(dosya_yolu))[0]
+    if icerik_ozeti:
+        base_name = f"{base_name}_{icerik_ozeti[:12]}"
+    return os.path.join(DEBUG_KLASORU, f"debug_{base_name}.png")
+
+
+class HataAyiklamaYazici:
+    """
+    Debug görsellerini arka planda üreten yazıcı. İşler sınırlı bir kuyruğa
+    alınır; sayfanın rasterleştirilmesi, bölge çizimi ve PNG kodlaması
+    analiz sonucunu bekletmeden ayrı bir iş parçacığında yapılır.
+    """
+
+    def __init__(self, kuyruk_boyutu: int = 32):
+        self.logger = logging.getLogger(__name__)
+        self._kuyruk: "queue.Queue" = queue.Queue(maxsize=kuyruk_boyutu)
+        self._is_parcacigi = threading.Thread(target=self._calis, name="hata-ayiklama-yazici", daemon=True)
+        self._is_parcacigi.start()
+
+    def ekle(self, kaynak: Union[str, bytes], page_size: Tuple[float, float], boundaries: Optional[Dict[str, float]] = None,
+             goruntu: Optional[np.ndarray] = None, dosya_adi: Optional[str] = None,
+             icerik_ozeti: Optional[str] = None, goruntu_dpi: int = VARSAYILAN_GORUNTU_DPI) -> str:
+        """
+        Debug görseli işini kuyruğa ekler ve görselin yazılacağı yolu döndürür.
+        Oturumda hazır bir sayfa görüntüsü varsa `goruntu` ile verilir; yoksa
+        sayfa arka planda `kaynak`tan (yol ya da baytlar) render edilir. Görsel
+        adı `dosya_adi`ndan (yoksa yoldan) ve `icerik_ozeti`nden gelir.
+        `goruntu_dpi`, görüntü girdilerinde motorun varsaydığı DPI'dır; bölge
+        kutuları sayfa boyutuna göre çizildiğinden render aynı varsayımla yapılır.
+        """
+        dosya_adi = dosya_adi or (kaynak if isinstance(kaynak, str) else 'bellek')
+        yol = debug_gorsel_yolu(dosya_adi, icerik_ozeti)
+        self._kuyruk.put((kaynak, dosya_adi, yol, page_size, dict(boundaries) if boundaries else None, goruntu, goruntu_dpi))
+        return yol
+
+    def bekle(self) -> None:
+        """Kuyruktaki tüm görseller diske yazılana kadar bekler."""
+        self._kuyruk.join()
+
+    def _calis(self) -> None:
+        while True:
+            kaynak, dosya_adi, yol, page_size, boundaries, goruntu, goruntu_dpi = self._kuyruk.get()
+            try:
+                self._yaz(kaynak, dosya_adi, yol, page_size, boundaries, goruntu, goruntu_dpi)
+            except Exception as e:
+                self.logger.error(f"Görsel hata ayıklama çıktısı oluşturulurken hata: {e}")
+            finally:
+                self._kuyruk.task_done()
+
+    def _yaz(self, kaynak: Union[str, bytes], dosya_adi: str, yol: str, page_size: Tuple[float, float],
+             boundaries: Optional[Dict[str, float]], goruntu: Optional[np.ndarray],
+             goruntu_dpi: int = VARSAYILAN_GORUNTU_DPI) -> None:
+        if goruntu is None:
+            with BelgeOturumu(kaynak, self.logger, dosya_adi, goruntu_dpi) as oturum:
+                goruntu = oturum.sayfa_goruntusu(0, DEBUG_DPI)
+        if goruntu is None: return
+        image = bolge_cizimi_yap(goruntu, page_size, boundaries)
+        os.makedirs(DEBUG_KLASORU, exist_ok=True)
+        import cv2
+        cv2.imwrite(yol, image)
+
+
+_yazici: Optional[HataAyiklamaYazici] = None
+_yazici_kilidi = threading.Lock()
+
+
+def hata_ayiklama_yazicisi() -> HataAyiklamaYazici:
+    """Süreç başına tek bir arka plan yazıcısı döndürür (ilk çağrıda başlatılır)."""
+    global _yazici
+    with _yazici_kilidi:
+        if _yazici is None:
+            _yazici = HataAyiklamaYazici()
+            # atexit havuz işçilerinde çalışmaz ve yazıcı daemon olduğundan kuyruk
+            # kaybolurdu; Finalize hem ana süreçte (çıkışta) hem işçi süreç
+            # kapanırken çalışır
+            mp_util.Finalize(None, _yazici.bekle, exitpriority=10)
+        return _yazici
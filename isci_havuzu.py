@@ -0,0 +1,51 @@
+import os
+import json
+import logging
+from typing import Dict, Optional
+from fatura_analiz_motoru import FaturaAnalizMotoru, desenleri_yukle, ayarlardan_motor_olustur
+from utils import validate_patterns_structure
+
+# Her işçi sürecinde bir kez kurulan ve tüm görevlerde yeniden kullanılan motor
+_isci_motoru: Optional[FaturaAnalizMotoru] = None
+
+
+def desenleri_serilestir() -> str:
+    """
+    patterns.json'u ana süreçte bir kez okuyup doğrular ve işçilere
+    gönderilmek üzere JSON metni olarak döndürür.
+    """
+    logger = logging.getLogger(__name__)
+    desenler = desenleri_yukle(logger=logger)
+    validate_patterns_structure(desenler, logger)
+    return json.dumps(desenler, ensure_ascii=False)
+
+
+def isci_baslat(desenler_json: str, ayarlar: Optional[Dict] = None, log_seviyesi: Optional[int] = None,
+                degisiklikler: Optional[Dict] = None) -> None:
+    """
+    ProcessPoolExecutor `initializer`'ı. Loglamayı ve analiz motorunu işçi
+    süreci başına bir kez yapılandırır. `ayarlar` config.json içeriğidir
+    (Tesseract yolu, debug, OCR işçi sayısı, önbellek); tüm işçiler aynı
+    önbellek klasörünü paylaşır. `degisiklikler` motor argümanlarını ezer.
+    """
+    global _isci_motoru
+    if log_seviyesi is not None:
+        logging.basicConfig(level=log_seviyesi)
+        logging.getLogger().setLevel(log_seviyesi)
+    _isci_motoru = ayarlardan_motor_olustur(ayarlar, patterns=json.loads(desenler_json), **(degisiklikler or {}))
+
+
+def isci_ocr_sayisi(ayarlar: Optional[Dict], surec_sayisi: int) -> int:
+    """
+    Süreç havuzunda her işçinin OCR iş parçacığı sayısı. `ocr_isci_sayisi`
+    0 (otomatik) ise çekirdekler süreçler arasında paylaştırılır.
+    """
+    return (ayarlar or {}).get('ocr_isci_sayisi', 0) or max(1, (os.cpu_count() or 1) // max(1, surec_sayisi))
+
+
+def isci_motoru() -> FaturaAnalizMotoru:
+    """İşçinin motorunu döndürür; havuz initializer'sız kurulduysa bir kez oluşturur."""
+    global _isci_motoru
+    if _isci_motoru is None:
+        _isci_motoru = FaturaAnalizMotoru()
+    return _isci_motoru
@@ -0,0 +1,112 @@
+from typing import List, Dict, Sequence
+import numpy as np
+
+
+class KelimeDizisi:
+    """
+    Sayfa kelimelerinin dizi-yapısı (struct-of-arrays) gösterimi: koordinatlar
+    NumPy dizilerinde, metinler ayrı bir dizide tutulur. Satır/blok
+    gruplama, sıralı farklar + kümülatif toplam ile tek geçişte yapılır.
+    """
+
+    __slots__ = ('text', 'x0', 'top', 'x1', 'bottom')
+
+    def __init__(self, text: Sequence[str], x0: np.ndarray, top: np.ndarray, x1: np.ndarray, bottom: np.ndarray):
+        self.text = np.asarray(text, dtype=object)
+        self.x0 = np.asarray(x0, dtype=np.float64)
+        self.top = np.asarray(top, dtype=np.float64)
+        self.x1 = np.asarray(x1, dtype=np.float64)
+        self.bottom = np.asarray(bottom, dtype=np.float64)
+
+    @classmethod
+    def sozluklerden(cls, words: List[Dict]) -> 'KelimeDizisi':
+        """{'text','x0','top','x1','bottom'} sözlük listesinden dizi oluşturur."""
+        if not words:
+            bos = np.empty(0, dtype=np.float64)
+            return cls([], bos, bos, bos, bos)
+        koordinatlar = np.array([(w['x0'], w['top'], w['x1'], w['bottom']) for w in words], dtype=np.float64)
+        return cls([w['text'] for w in words], koordinatlar[:, 0], koordinatlar[:, 1], koordinatlar[:, 2], koordinatlar[:, 3])
+
+    @classmethod
+    def birlestir(cls, diziler: List['KelimeDizisi']) -> 'KelimeDizisi':
+        """Birden çok diziyi (ör. bölge bölge OCR sonuçları) tek diziye ekler."""
+        if not diziler:
+            return cls.sozluklerden([])
+        return cls(np.concatenate([d.text for d in diziler]), np.concatenate([d.x0 for d in diziler]),
+                   np.concatenate([d.top for d in diziler]), np.concatenate([d.x1 for d in diziler]),
+                   np.concatenate([d.bottom for d in diziler]))
+
+    def sec(self, maske: np.ndarray) -> 'KelimeDizisi':
+        """Maskedeki (ya da indeksteki) kelimelerden yeni dizi."""
+        return KelimeDizisi(self.text[maske], self.x0[maske], self.top[maske], self.x1[maske], self.bottom[maske])
+
+    def __len__(self) -> int:
+        return len(self.top)
+
+    def sozluklere(self) -> List[Dict]:
+        """Diziyi {'text','x0','top','x1','bottom'} sözlük listesine çevirir."""
+        return [{'text': t, 'x0': a, 'top': b, 'x1': c, 'bottom': d}
+                for t, a, b, c, d in zip(self.text.tolist(), self.x0.tolist(), self.top.tolist(), self.x1.tolist(), self.bottom.tolist())]
+
+    def sutunlara(self) -> Dict[str, List]:
+        """JSON'a yazmak için sütun sözlüğü ({'text': [...], 'x0': [...], ...})."""
+        return {ad: getattr(self, ad).tolist() for ad in self.__slots__}
+
+    @classmethod
+    def sutunlardan(cls, sutunlar: Dict[str, List]) -> 'KelimeDizisi':
+        """`sutunlara` çıktısından diziyi geri kurar."""
+        return cls(*(sutunlar[ad] for ad in cls.__slots__))
+
+    def satirlara_ayir(self, line_tolerance: float = 10) -> List[np.ndarray]:
+        """
+        Kelimeleri `bloklara_ayir` ile aynı ölçütle satırlara böler; her satır,
+        x0 sırasına dizilmiş kelime sıralarının (indeks) dizisidir.
+        """
+        if len(self) == 0:
+            return []
+        sira = np.lexsort((self.x0, self.top))
+        yeni_satir = np.flatnonzero(np.diff(self.top[sira]) >= line_tolerance) + 1
+        return np.split(sira, yeni_satir)
+
+    def bloklara_ayir(self, line_tolerance: float = 10, block_tolerance_multiplier: float = 2.5) -> List[Dict]:
+        """
+        Kelimeleri (top, x0) sırasına dizer; ardışık kelimeler arasındaki `top`
+        farkı toleransı aşınca yeni satır, satır başı ile önceki kelimenin alt
+        kenarı arasındaki boşluk blok toleransını aşınca yeni blok başlar.
+        Blok kutuları `reduceat` ile hesaplanır.
+        """
+        n = len(self)
+        if n == 0:
+            return []
+        sira = np.lexsort((self.x0, self.top))  # kararlı sıralama: önce top, sonra x0
+        top, bottom = self.top[sira], self.bottom[sira]
+        x0, x1 = self.x0[sira], self.x1[sira]
+        texts = self.text[sira].tolist()
+
+        yeni_satir = np.ones(n, dtype=bool)
+        yeni_satir[1:] = np.diff(top) >= line_tolerance
+
+        yukseklikler = bottom - top
+        pozitif = yukseklikler[yukseklikler > 0].tolist()
+        avg_height = sum(pozitif) / len(pozitif) if pozitif else 10
+        block_tolerance = avg_height * block_tolerance_multiplier
+
+        yeni_blok = yeni_satir.copy()
+        yeni_blok[1:] &= (top[1:] - bottom[:-1]) >= block_tolerance
+        baslangiclar = np.flatnonzero(yeni_blok)
+        bitisler = np.append(baslangiclar[1:], n).tolist()
+
+        bx0 = np.minimum.reduceat(x0, baslangiclar).tolist()
+        btop = np.minimum.reduceat(top, baslangiclar).tolist()
+        bx1 = np.maximum.reduceat(x1, baslangiclar).tolist()
+        bbottom = np.maximum.reduceat(bottom, baslangiclar).tolist()
+        return [{'text': " ".join(texts[s:e]), 'coords': (bx0[i], btop[i], bx1[i], bbottom[i])}
+                for i, (s, e) in enumerate(zip(baslangiclar.tolist(), bitisler))]
+
+
+def blok_merkezleri(blocks: List[Dict]) -> np.ndarray:
+    """Blokların (merkez_x, merkez_y) dizisi; şekil (n, 2)."""
+    if not blocks:
+        return np.empty((0, 2), dtype=np.float64)
+    koordinatlar = np.array([b['coords'] for b in blocks], dtype=np.float64)
+    return np.column_stack(((koordinatlar[:, 0] + koordinatlar[:, 2]) / 2, (koordinatlar[:, 1] + koordinatlar[:, 3]) / 2))
@@ -0,0 +1,78 @@
+from typing import List, Dict, Optional, Callable, Sequence, Tuple
+import numpy as np
+from kelime_dizisi import KelimeDizisi
+
+
+def _baslik_sutunlari(words: KelimeDizisi, kucuk: List[str], satir: np.ndarray, bosluk_esigi: float) -> List[Tuple[str, float, float]]:
+    """
+    Başlık satırındaki kelimeleri, aralarındaki yatay boşluğa göre sütun
+    etiketlerine birleştirir: (etiket, x0, x1) listesi, soldan sağa.
+    """
+    x0, x1 = words.x0[satir], words.x1[satir]
+    yeni_sutun = np.ones(len(satir), dtype=bool)
+    yeni_sutun[1:] = (x0[1:] - x1[:-1]) > bosluk_esigi
+    baslangiclar = np.flatnonzero(yeni_sutun).tolist()
+    bitisler = baslangiclar[1:] + [len(satir)]
+    etiketler = [kucuk[i] for i in satir.tolist()]
+    return [(" ".join(etiketler[s:e]), float(x0[s]), float(x1[s:e].max())) for s, e in zip(baslangiclar, bitisler)]
+
+
+def kalem_tablosunu_cikar(words: KelimeDizisi, basliklar: Sequence[str] = ('mal hizmet', 'miktar'),
+                          bitis_satiri_mi: Optional[Callable[[str], bool]] = None) -> Optional[List[Dict[str, str]]]:
+    """
+    Kalem tablosunu yalnızca kelime koordinatlarından çıkarır (çizgi/kesişim
+    analizi yapılmaz).
+
+    Tüm `basliklar` etiketlerini içeren ilk satır başlık kabul edilir; sütun
+    aralıkları başlık etiketlerinin kutularından, komşu etiketlerin arasındaki
+    orta noktalarla türetilir. Başlığın altındaki satırlar y'ye göre gruplanıp
+    kelimeler merkezlerine göre sütunlara dağıtılır. Anahtar sütunda (son
+    başlık) kelimesi olmayan satır önceki kalemin devamı sayılır ve hücrelere
+    alt satır olarak eklenir. Satırlar arası boşluk açılınca ya da
+    `bitis_satiri_mi` doğru dönünce (ör. toplamlar satırı) tablo biter.
+
+    Başlık bulunamazsa ya da hiç kalem çıkmazsa None döner; çağıran taraf
+    tablo tabanlı yönteme geri düşebilir.
+    """
+    if len(words) == 0:
+        return None
+    yukseklik = float(np.median(words.bottom - words.top)) or 10.0
+    satirlar = words.satirlara_ayir(yukseklik * 0.5)
+    kucuk = [t.lower() for t in words.text.tolist()]
+
+    baslik_no = next((s for s, satir in enumerate(satirlar)
+                      if all(b in " ".join(kucuk[i] for i in satir.tolist()) for b in basliklar)), None)
+    if baslik_no is None:
+        return None
+    # Aynı etiketteki kelimeler arası boşluk yaklaşık yarım harf yüksekliğidir
+    sutunlar = _baslik_sutunlari(words, kucuk, satirlar[baslik_no], yukseklik * 0.6)
+    adlar = [ad for ad, _, _ in sutunlar]
+    if not all(b in adlar for b in basliklar):
+        return None
+    sinirlar = np.array([(sutunlar[i][2] + sutunlar[i + 1][1]) / 2 for i in range(len(sutunlar) - 1)])
+    anahtar_sutun = adlar.index(basliklar[-1])
+
+    kalemler: List[List[str]] = []
+    onceki_alt = float(words.bottom[satirlar[baslik_no]].max())
+    for satir in satirlar[baslik_no + 1:]:
+        if float(words.top[satir].min()) - onceki_alt > yukseklik * 2.5:
+            break
+        if bitis_satiri_mi is not None and bitis_satiri_mi(" ".join(words.text[satir].tolist())):
+            break
+        onceki_alt = float(words.bottom[satir].max())
+        merkez = (words.x0[satir] + words.x1[satir]) / 2
+        sutun_nolari = np.searchsorted(sinirlar, merkez, side='right').tolist()
+        hucreler: List[List[str]] = [[] for _ in sutunlar]
+        for i, sutun in zip(satir.tolist(), sutun_nolari):
+            hucreler[sutun].append(words.text[i])
+        metinler = [" ".join(h) for h in hucreler]
+        if not hucreler[anahtar_sutun] and kalemler:
+            onceki = kalemler[-1]
+            for sutun, metin in enumerate(metinler):
+                if metin:
+                    onceki[sutun] = f"{onceki[sutun]}\n{metin}" if onceki[sutun] else metin
+            continue
+        kalemler.append(metinler)
+    if not kalemler:
+        return None
+    return [dict(zip(adlar, kalem)) for kalem in kalemler]
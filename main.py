@@ -1,14 +1,19 @@
 import os
+import re
+import hashlib
 import json
 import csv
 import logging
-import glob
 from datetime import datetime
-from fatura_analiz_motoru import FaturaAnalizMotoru
-from typing import Dict
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from itertools import islice
+from fatura_analiz_motoru import ayarlardan_motor_olustur, KALEM_CIKARIM_YONTEMLERI, MOTOR_SURUMU
+from isci_havuzu import isci_baslat, isci_motoru, desenleri_serilestir, isci_ocr_sayisi
+from metrikler import SureHistogrami
+from cikti_yazici import SonucYazici, desen_alanlari, CIKTI_BICIMLERI, VARSAYILAN_SATIR_GRUBU
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import multiprocessing
-from tqdm import tqdm
 
 # Logging'i en başta ve temel seviyede yapılandır
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -27,15 +32,12 @@ def log_ayarlarini_yap(rapor_klasoru: str):
     )
     logging.info(f"📝 Hata kayıtları (log) şu dosyaya yazılacak: {log_dosyasi}")
 
-def analyze_file_for_pool(path: str, output_dir: str) -> Dict:
+def analyze_file_for_pool(path: str) -> Dict:
     """ProcessPoolExecutor ile kullanılabilir, üst seviye fonksiyon."""
     try:
-        local = FaturaAnalizMotoru()
-        try:
-            local.output_dir = output_dir
-        except Exception:
-            pass
-        return local.analiz_et(path)
+        # Motor işçi süreci başına bir kez kurulur (bkz. isci_havuzu.isci_baslat)
+        local = isci_motoru()
+        return {"dosya": path, **local.analiz_et(path)}
     except Exception as e:
         return {"hata": str(e), "dosya": path}
 
@@ -57,50 +59,27 @@ def ayarları_yukle() -> dict:
         logging.error(f"❌ Hata: '{config_dosyasi}' dosyası geçerli bir JSON formatında değil.")
         return None
 
-def sonuclari_csv_kaydet(rapor_klasoru: str, tum_sonuclar: list):
+def sonuclari_csv_kaydet(rapor_klasoru: str, tum_sonuclar: Iterable[Dict], alanlar: Optional[List[str]] = None) -> Optional[str]:
     """
-    Analiz sonuçlarını bir CSV dosyasına kaydeder.
+    Analiz sonuçlarını CSV'ye kaydeder (kalemler ayrı `_kalemler.csv`
+    dosyasına). Sütunlar patterns.json anahtarlarından gelir; sonuçlar akış
+    hâlinde yazılır ve değiştirilmez, `tum_sonuclar` bir üreteç de olabilir.
+    Sonuç dosyasının yolunu döndürür.
     """
-    if not tum_sonuclar:
-        return
-
-    csv_dosyasi = os.path.join(rapor_klasoru, f"toplu_fatura_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-    
-    # Yapılandırılmış verileri ve OCR skorunu al
-    yazilacak_veriler = []
-    for sonuc in tum_sonuclar:
-        veri = sonuc.get('structured', {})
-        # OCR istatistiklerinden güven skorunu ekle
-        ocr_stats = sonuc.get('ocr_istatistikleri', {})
-        veri['ortalama_guven_skoru'] = ocr_stats.get('ortalama_guven_skoru')
-        yazilacak_veriler.append(veri)
-    
-    # CSV başlıklarını (sütun isimlerini) dinamik olarak belirle
-    # Tüm faturalardaki bütün olası alanları topla
-    basliklar = set()
-    for veri in yazilacak_veriler:
-        basliklar.update(veri.keys())
-    
-    # Başlık sırasını belirle (güven skorunu başa alabiliriz)
-    sirali_basliklar = sorted(list(basliklar))
-    if 'ortalama_guven_skoru' in sirali_basliklar:
-        sirali_basliklar.insert(0, sirali_basliklar.pop(sirali_basliklar.index('ortalama_guven_skoru')))
-
+    if alanlar is None:
+        alanlar = desen_alanlari(json.loads(desenleri_serilestir()))
+    temel_yol = os.path.join(rapor_klasoru, f"toplu_fatura_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
     try:
-        with open(csv_dosyasi, 'w', newline='', encoding='utf-8-sig') as f:
-            # `DictWriter` nesnesi, sözlükleri CSV satırlarına yazmayı kolaylaştırır
-            writer = csv.DictWriter(f, fieldnames=sirali_basliklar)
-            
-            # Başlık satırını yaz
-            writer.writeheader()
-            
-            # Her bir faturanın verisini bir satır olarak yaz
-            writer.writerows(yazilacak_veriler)
-        
-        logging.info(f"📄 CSV raporu da başarıyla oluşturuldu: {csv_dosyasi}")
+        with SonucYazici(temel_yol, alanlar, bicim='csv') as yazici:
+            for sonuc in tum_sonuclar:
+                yazici.ekle(sonuc)
+        if not yazici.yazilan:
+            return None
+        logging.info(f"📄 CSV raporu da başarıyla oluşturuldu: {yazici.dosyalar['sonuclar']}")
+        return yazici.dosyalar['sonuclar']
     except Exception as e:
         logging.error(f"❌ CSV dosyası yazılırken bir hata oluştu: {e}")
-        logging.error(f"CSV dosyası yazılırken bir hata oluştu: {e}")
+        return None
 
 
 def sonuclari_turkce_formatla(analiz_sonucu: Dict) -> Dict:
@@ -165,228 +144,469 @@ def sonuclari_turkce_formatla(analiz_sonucu: Dict) -> Dict:
     return formatlanmis_sonuc
 
 
-def ocr_metnini_disa_aktar(dosya_yolu: str, cikti_dosyasi: str):
-    """Tek bir dosyanın ham OCR metnini dışa aktarır."""
-    # BU FONKSİYON GEÇİCİ OLARAK DEVRE DIŞI BIRAKILDI
-    logging.warning("ocr_metnini_disa_aktar fonksiyonu geçici olarak devre dışı.")
-    return
-    # try:
-    #     with open('config.json', 'r', encoding='utf-8') as f:
-    #         config = json.load(f)
-    #     tesseract_path = config.get('tesseract_cmd_path')
-    #     analiz_motoru = FaturaAnalizMotoru(tesseract_cmd_path=tesseract_path)
-        
-    #     sonuclar = analiz_motoru.analiz_et(dosya_yolu)
-    #     ham_metin = sonuclar.get("ham_metin", "Metin çıkarılamadı.")
-        
-    #     with open(cikti_dosyasi, 'w', encoding='utf-8') as f:
-    #         f.write(ham_metin)
-        
-    #     print(f"✅ Ham metin başarıyla kaydedildi: {cikti_dosyasi}")
-    # except Exception as e:
-    #     print(f"❌ Ham metin dışa aktarılırken bir hata oluştu: {e}")
-    #     logging.error(f"Ham metin dışa aktarılırken bir hata oluştu: {e}")
-
-
-def hizli_test_calistir(ham_metin_dosyasi: str):
-    """Kaydedilmiş ham metin üzerinden sadece Regex analizini çalıştırır."""
-    # BU FONKSİYON GEÇİCİ OLARAK DEVRE DIŞI BIRAKILDI
-    logging.warning("hizli_test_calistir fonksiyonu geçici olarak devre dışı.")
-    return
-    # try:
-    #     with open('config.json', 'r', encoding='utf-8') as f:
-    #         config = json.load(f)
-    #     tesseract_path = config.get('tesseract_cmd_path')
-    #     analiz_motoru = FaturaAnalizMotoru(tesseract_cmd_path=tesseract_path)
-        
-    #     with open(ham_metin_dosyasi, 'r', encoding='utf-8') as f:
-    #         ham_metin = f.read()
-            
-    #     yapilandirilmis_veri = analiz_motoru.yapilandirilmis_veri_cikar(ham_metin)
-        
-    #     print("\n--- HIZLI TEST SONUÇLARI ---")
-    #     print(json.dumps(yapilandirilmis_veri, indent=2, ensure_ascii=False))
-    # except Exception as e:
-    #     print(f"❌ Hızlı test başlatılırken bir hata oluştu: {e}")
-    #     logging.error(f"Hızlı test başlatılırken bir hata oluştu: {e}")
+def _arsiv_ac(yol: str, kip: str):
+    """Ham metin arşivini açar; `.gz` uzantılı arşivler gzip ile sıkıştırılır."""
+    if yol.endswith('.gz'):
+        import gzip
+        return gzip.open(yol, kip + 't', encoding='utf-8')
+    return open(yol, kip, encoding='utf-8')
 
 
-def ana_analiz_süreci():
+def ham_kayit_olustur(dosya_yolu: str) -> Dict:
+    """
+    İşçide çalışır: dosyanın desenlerden bağımsız çıkarımını (sayfa kelime
+    kutuları, kalemler) ve tam metnini tek bir arşiv kaydı olarak döndürür.
+    Dosya bir kez okunur; içerik özeti ve çıkarım aynı baytlardan yapılır.
+    """
+    try:
+        with open(dosya_yolu, 'rb') as f:
+            veri = f.read()
+        motor = isci_motoru()
+        cikarim = motor.kelimeleri_cikar(veri, dosya_adi=dosya_yolu)
+        cikarim.pop('metrics', None)
+        # Tam metin (bloklar satır satır) arama ve inceleme içindir; yeniden oynatma kelimelerden yapılır
+        ham_metin = motor.cikarimdan_sonuc_olustur(cikarim)['ham_metin']
+        return {'dosya': dosya_yolu, 'dosya_ozeti': hashlib.sha256(veri).hexdigest(), 'motor_surumu': MOTOR_SURUMU,
+                'cikarim_ozeti': motor.cikarim_ozeti, 'ham_metin': ham_metin, **cikarim}
+    except Exception as e:
+        return {'hata': str(e), 'dosya': dosya_yolu}
+
+
+def ocr_metnini_disa_aktar(girdi: str, cikti_dosyasi: str, ayarlar: Optional[dict] = None) -> int:
+    """
+    Tek bir dosyanın ya da bir klasördeki tüm faturaların ham çıkarımını
+    (kelime kutuları, kalemler, tam metin) belge başına bir JSONL satırı
+    olarak `cikti_dosyasi`na yazar (`.gz` ise sıkıştırılır). Kural
+    değişikliklerinden sonra `hizli_test_calistir` bu arşivi PDF açmadan
+    yeniden işler. Yazılan kayıt sayısını döndürür.
+    """
+    ayarlar = ayarlar if ayarlar is not None else (ayarları_yukle() or {})
+    if os.path.isdir(girdi):
+        dosyalar = list(fatura_dosyalarini_bul(girdi, ayarlar.get('desteklenen_formatlar', ['.pdf'])))
+    else:
+        dosyalar = [girdi]
+    if not dosyalar:
+        logging.warning(f"Dışa aktarılacak fatura bulunamadı: {girdi}")
+        return 0
+    isci_sayisi = min(len(dosyalar), ayarlar.get('parallel_workers', 0) or os.cpu_count() or 1)
+    logging.info(f"📦 {len(dosyalar)} faturanın ham çıkarımı {isci_sayisi} işçi ile '{cikti_dosyasi}' arşivine yazılacak.")
+
+    havuz_ayarlari = (desenleri_serilestir(), ayarlar, None,
+                      {'ocr_isci_sayisi': isci_ocr_sayisi(ayarlar, isci_sayisi), 'onbellek': None, 'debug_gorsel': False})
+    yazilan = 0
+    with _arsiv_ac(cikti_dosyasi, 'w') as cikti, \
+            ProcessPoolExecutor(max_workers=isci_sayisi, initializer=isci_baslat, initargs=havuz_ayarlari) as executor:
+        for kayit in executor.map(ham_kayit_olustur, dosyalar):
+            if 'hata' in kayit:
+                logging.error(f"❌ {kayit['dosya']} dışa aktarılırken hata oluştu: {kayit['hata']}")
+                continue
+            cikti.write(json.dumps(kayit, ensure_ascii=False, separators=(',', ':')) + '\n')
+            yazilan += 1
+    logging.info(f"✅ {yazilan} kayıt '{cikti_dosyasi}' arşivine yazıldı.")
+    return yazilan
+
+
+def hizli_test_calistir(ham_metin_dosyasi: str, cikti_dosyasi: Optional[str] = None,
+                        ayarlar: Optional[dict] = None) -> int:
+    """
+    `ocr_metnini_disa_aktar` arşivindeki kayıtlar üzerinden yalnızca
+    bölgeleme (`_identify_blocks`), regex (`_extract_data_from_blocks`) ve
+    `guardian_postprocess` aşamalarını güncel patterns.json ve çapalarla
+    çalıştırır. Sonuçlar toplu modla aynı biçimde JSONL olarak yazılır
+    (`cikti_bicimi` ayarlıysa tablolar da); `cikti_dosyasi` verilmezse
+    loglanır. İşlenen kayıt sayısını döndürür.
+    """
+    ayarlar = ayarlar if ayarlar is not None else (ayarları_yukle() or {})
+    desenler_json = desenleri_serilestir()
+    motor = ayarlardan_motor_olustur(ayarlar, patterns=json.loads(desenler_json), onbellek=None,
+                                     debug_gorsel=False, metrikler=True)
+    histogram = SureHistogrami()
+    farkli_cikarim = islenen = 0
+    cikti = open(cikti_dosyasi, 'w', encoding='utf-8') if cikti_dosyasi else None
+    tablo = tablo_yazicisi_olustur(ayarlar, desenler_json, cikti_dosyasi) if cikti_dosyasi else None
+    try:
+        with _arsiv_ac(ham_metin_dosyasi, 'r') as arsiv:
+            for satir in arsiv:
+                if not satir.strip():
+                    continue
+                kayit = json.loads(satir)
+                if kayit.get('cikarim_ozeti') != motor.cikarim_ozeti or kayit.get('motor_surumu') != MOTOR_SURUMU:
+                    farkli_cikarim += 1
+                try:
+                    sonuc = {'dosya': kayit['dosya'], **motor.cikarimdan_sonuc_olustur(kayit)}
+                except Exception as e:
+                    logging.error(f"❌ {kayit.get('dosya')} yeniden işlenirken hata oluştu: {e}")
+                    sonuc = {'hata': str(e), 'dosya': kayit.get('dosya')}
+                histogram.ekle(sonuc.get('metrics'))
+                islenen += 1
+                if cikti:
+                    cikti.write(json.dumps(sonuc, ensure_ascii=False) + '\n')
+                    if tablo:
+                        tablo.ekle(sonuc)
+                else:
+                    logging.info(f"--- {sonuc['dosya']} ---\n"
+                                 + json.dumps(sonuc.get('yapilandirilmis_veri'), indent=2, ensure_ascii=False))
+    finally:
+        if cikti:
+            cikti.close()
+        if tablo:
+            tablo.kapat()
+    if farkli_cikarim:
+        logging.warning(f"⚠️ {farkli_cikarim} kayıt farklı çıkarım ayarları ya da motor sürümüyle arşivlenmiş; "
+                        f"kelimeler yeniden çıkarılmadan kullanıldı.")
+    if len(histogram):
+        logging.info("⏱️ Aşama süreleri (ms):\n" + histogram.tablo())
+    logging.info(f"⚡ {islenen} kayıt yeniden işlendi" + (f" → {cikti_dosyasi}" if cikti_dosyasi else "."))
+    return islenen
+
+
+def fatura_dosyalarini_bul(fatura_klasoru: str, desteklenen_formatlar: List[str]) -> Iterator[str]:
+    """
+    Fatura klasörünü (alt klasörler dahil) dolaşır ve desteklenen uzantıdaki
+    dosyaları sabit (sıralı) bir düzende döndürür.
+    """
+    uzantilar = tuple(u.lower() for u in desteklenen_formatlar)
+    for kok, klasorler, dosyalar in os.walk(fatura_klasoru):
+        klasorler.sort()
+        for dosya_adi in sorted(dosyalar):
+            if dosya_adi.lower().endswith(uzantilar):
+                yield os.path.join(kok, dosya_adi)
+
+
+def islenmis_dosyalari_oku(sonuc_dosyasi: str, biriktirici: Optional['AkilliAnalizBiriktirici'] = None) -> Set[str]:
+    """
+    Önceki bir çalıştırmanın JSONL çıktısında kaydı bulunan dosyaları döndürür.
+    Yarım kalmış (bozuk) son satır yok sayılır. `biriktirici` verilirse kayıtlar
+    aynı geçişte akıllı analize de eklenir (devam eden çalıştırmanın raporu
+    tüm JSONL'i kapsasın).
+    """
+    islenmis = set()
+    if not os.path.exists(sonuc_dosyasi):
+        return islenmis
+    with open(sonuc_dosyasi, 'r', encoding='utf-8') as f:
+        for satir in f:
+            try:
+                kayit = json.loads(satir)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(kayit, dict) and kayit.get('dosya'):
+                islenmis.add(kayit['dosya'])
+                if biriktirici is not None:
+                    biriktirici.ekle(kayit)
+    return islenmis
+
+
+def ana_analiz_süreci(ayarlar: Optional[dict] = None, sonuc_dosyasi: Optional[str] = None):
     """
     Tüm faturaları işleyen ve raporlayan ana iş akışı.
     Bu fonksiyonu projenin ana giriş noktası olarak kullanın.
+
+    `klasor_yollari.fatura_klasoru` altındaki dosyalar `parallel_workers`
+    boyutunda (0 = CPU sayısı) bir süreç havuzuna dağıtılır; her sonuç
+    tamamlandığı anda JSONL dosyasına bir satır olarak yazılır. Yeniden
+    başlatıldığında JSONL'de kaydı olan dosyalar atlanır. `akilli_analiz`
+    açıksa analiz raporları tek geçişte biriktirilir ve her
+    `akilli_analiz_araligi` belgede ara rapor olarak yazılır.
     """
-    # Tek bir dosyayı test etmek için bu bölümü kullan
-    tek_dosya_yolu = r"27.08.2025_Gelen Fatura (1)/05.07.2025-NYS2025000000188.pdf"
-    
+    ayarlar = ayarlar or ayarları_yukle()
+    if ayarlar is None:
+        return
+
+    klasorler = ayarlar.get('klasor_yollari', {})
+    fatura_klasoru = klasorler.get('fatura_klasoru', 'ornek_faturalar')
+    rapor_klasoru = klasorler.get('rapor_klasoru', 'test_reports')
+    desteklenen_formatlar = ayarlar.get('desteklenen_formatlar', ['.pdf'])
+    isci_sayisi = ayarlar.get('parallel_workers', 0) or os.cpu_count() or 1
+
+    if not os.path.isdir(fatura_klasoru):
+        logging.error(f"❌ Fatura klasörü bulunamadı: '{fatura_klasoru}'")
+        return
+
+    os.makedirs(rapor_klasoru, exist_ok=True)
+    sonuc_dosyasi = sonuc_dosyasi or os.path.join(rapor_klasoru, 'toplu_sonuclar.jsonl')
+
+    # Akıllı analiz sonuçlar geldikçe biriktirilir; ham metinler bellekte tutulmaz
+    analiz = AkilliAnalizBiriktirici() if ayarlar.get('akilli_analiz') else None
+    ara_rapor_araligi = ayarlar.get('akilli_analiz_araligi', 0) if analiz else 0
+    islenmis = islenmis_dosyalari_oku(sonuc_dosyasi, analiz)
+    bekleyenler = [d for d in fatura_dosyalarini_bul(fatura_klasoru, desteklenen_formatlar) if d not in islenmis]
+    if islenmis:
+        logging.info(f"⏭️ {len(islenmis)} dosya önceki çalıştırmada işlenmiş, atlanacak.")
+    if not bekleyenler:
+        logging.info("✅ İşlenecek yeni fatura yok.")
+        return
+    logging.info(f"🔍 {len(bekleyenler)} fatura {isci_sayisi} işçi ile analiz edilecek → {sonuc_dosyasi}")
+
+    # Önceki çalıştırma satır ortasında kesildiyse yeni kayıt yeni satırdan başlasın
+    satir_basi_gerekli = False
+    if os.path.exists(sonuc_dosyasi) and os.path.getsize(sonuc_dosyasi) > 0:
+        with open(sonuc_dosyasi, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            satir_basi_gerekli = f.read(1) != b'\n'
+
+    from tqdm import tqdm  # yalnızca toplu modda gerekir; tek dosya/CLI başlangıcını yavaşlatmasın
+
+    # Desenler bir kez okunur; her işçi kendi motorunu bir kez kurar. Aşama
+    # süreleri her sonuca eklenir ve çalıştırma sonunda özetlenir.
+    desenler_json = desenleri_serilestir()
+    havuz_ayarlari = (desenler_json, ayarlar, None,
+                      {'ocr_isci_sayisi': isci_ocr_sayisi(ayarlar, isci_sayisi), 'metrikler': True})
+    histogram = SureHistogrami()
+    tablo = tablo_yazicisi_olustur(ayarlar, desenler_json, sonuc_dosyasi)
+
+    # Bellekte aynı anda tutulan iş sayısını sınırla (on binlerce dosyada da sabit)
+    kuyruk_siniri = isci_sayisi * 4
+    hata_sayisi = 0
+    with open(sonuc_dosyasi, 'a', encoding='utf-8') as cikti, \
+            ProcessPoolExecutor(max_workers=isci_sayisi, initializer=isci_baslat, initargs=havuz_ayarlari) as executor, \
+            tqdm(total=len(bekleyenler), desc="Faturalar Analiz Ediliyor") as ilerleme, \
+            (tablo or nullcontext()):
+        if satir_basi_gerekli:
+            cikti.write('\n')
+        dosya_sirasi = iter(bekleyenler)
+        calisanlar = set()
+        while True:
+            for dosya in dosya_sirasi:
+                calisanlar.add(executor.submit(analyze_file_for_pool, dosya))
+                if len(calisanlar) >= kuyruk_siniri:
+                    break
+            if not calisanlar:
+                break
+            tamamlananlar, calisanlar = wait(calisanlar, return_when=FIRST_COMPLETED)
+            for future in tamamlananlar:
+                sonuc = future.result()
+                if 'hata' in sonuc:
+                    hata_sayisi += 1
+                    logging.error(f"❌ {sonuc.get('dosya')} analiz edilirken hata oluştu: {sonuc['hata']}")
+                histogram.ekle(sonuc.get('metrics'))
+                cikti.write(json.dumps(sonuc, ensure_ascii=False) + '\n')
+                cikti.flush()
+                if tablo:
+                    tablo.ekle(sonuc)
+                if analiz:
+                    analiz.ekle(sonuc)
+                    if ara_rapor_araligi and analiz.toplam_fatura % ara_rapor_araligi == 0:
+                        akilli_analiz_raporla(analiz, rapor_klasoru, ara_rapor=True)
+                ilerleme.update(1)
+
+    logging.info(f"✅ Toplu analiz tamamlandı. Hatalı dosya: {hata_sayisi}. Sonuçlar: {sonuc_dosyasi}")
+    if tablo:
+        logging.info(f"📊 Tablolar: {tablo.dosyalar['sonuclar']}, {tablo.dosyalar['kalemler']}")
+    asama_sureleri_kaydet(histogram, rapor_klasoru)
+    if analiz:
+        akilli_analiz_raporla(analiz, rapor_klasoru)
+
+
+def tablo_yazicisi_olustur(ayarlar: dict, desenler_json: str, sonuc_dosyasi: str) -> Optional[SonucYazici]:
+    """
+    `cikti_bicimi` ayarı verilmişse ('parquet' ya da 'csv') JSONL'in yanına
+    sabit şemalı tabloları akış hâlinde yazan yazıcıyı kurar. Tablolar her
+    çalıştırmada yeni dosyalara yazılır (JSONL'e ekleme yapılırken de).
+    """
+    bicim = ayarlar.get('cikti_bicimi')
+    if not bicim:
+        return None
+    temel_yol = f"{os.path.splitext(sonuc_dosyasi)[0]}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    return SonucYazici(temel_yol, desen_alanlari(json.loads(desenler_json)), bicim,
+                       ayarlar.get('cikti_satir_grubu') or VARSAYILAN_SATIR_GRUBU)
+
+
+def asama_sureleri_kaydet(histogram: SureHistogrami, rapor_klasoru: str) -> None:
+    """Aşama süresi özetini (ms; p50/p95/p99) loglar ve asama_sureleri.json olarak kaydeder."""
+    if not len(histogram):
+        return
+    logging.info("⏱️ Aşama süreleri (ms):\n" + histogram.tablo())
+    dosya = os.path.join(rapor_klasoru, 'asama_sureleri.json')
+    with open(dosya, 'w', encoding='utf-8') as f:
+        json.dump(histogram.ozet(), f, ensure_ascii=False, indent=2)
+    logging.info(f"💾 Aşama süreleri '{dosya}' dosyasına kaydedildi.")
+
+
+def tek_dosya_analizi(tek_dosya_yolu: str, config_dosya_yolu: str = 'config.json', degisiklikler: Optional[dict] = None):
+    """Tek bir dosyayı analiz eder ve sonucu loglar. `degisiklikler` config değerlerini ezer."""
     # Tesseract yolunu config'den al
-    tesseract_path = None
+    config = {}
     try:
-        with open('config.json', 'r', encoding='utf-8') as f:
+        with open(config_dosya_yolu, 'r', encoding='utf-8') as f:
             config = json.load(f)
-        tesseract_path = config.get('tesseract_cmd_path')
     except FileNotFoundError:
-        logging.warning("config.json bulunamadı.")
+        logging.warning(f"config.json bulunamadı: {config_dosya_yolu}")
+    config.update(degisiklikler or {})
+    debug_gorsel = config.get('debug_gorsel', False)
 
-    analiz_motoru = FaturaAnalizMotoru(tesseract_cmd_path=tesseract_path)
+    analiz_motoru = ayarlardan_motor_olustur(config)
     
     logging.info(f"Tek dosya analizi başlatılıyor: {tek_dosya_yolu}")
     sonuclar = analiz_motoru.analiz_et(tek_dosya_yolu)
     
     logging.info("--- ANALİZ SONUÇLARI ---")
     logging.info(json.dumps(sonuclar.get('yapilandirilmis_veri'), indent=2, ensure_ascii=False))
-    logging.info("Debug görseli 'test_reports/debug_images' klasörüne kaydedildi.")
+    if sonuclar.get('metrics'):
+        logging.info(f"Aşama süreleri (ms): {json.dumps(sonuclar['metrics'], ensure_ascii=False)}")
+    if debug_gorsel:
+        analiz_motoru.hata_ayiklama_bekle()
+        if sonuclar.get('debug_gorsel_yolu'):
+            logging.info(f"Debug görseli kaydedildi: {sonuclar['debug_gorsel_yolu']}")
+
+
+# Akıllı analizde başarı oranı izlenen alanlar
+KRITIK_ALANLAR = {
+    'fatura_numarasi': 'Fatura Numarası',
+    'fatura_tarihi': 'Fatura Tarihi',
+    'genel_toplam': 'Genel Toplam',
+    'satici_firma_unvani': 'Satıcı Firma',
+    'alici_tckn': 'Alıcı TCKN',
+    'ettn': 'ETTN'
+}
+# Bu alanlardan en az ikisi eksikse regex uyumsuzluğu sayılır
+HATA_ANALIZI_ALANLARI = ['fatura_numarasi', 'fatura_tarihi', 'genel_toplam']
+# Bu kadar sözcükten uzun metinler yapısal bozulma sayılır
+YAPISAL_BOZULMA_SOZCUK_SINIRI = 500
+_SOZCUK = re.compile(r'\S+')
+
+
+def _guven_skoru(ocr_stats: dict) -> float:
+    guven_skoru = ocr_stats.get('ortalama_guven_skoru', '0%')
+    if isinstance(guven_skoru, str):
+        guven_skoru = float(guven_skoru.replace('%', ''))
+    return guven_skoru
+
+
+def _sozcuk_sayisi_asar(metin: str, sinir: int) -> bool:
+    """`len(metin.split()) > sinir` ile aynı; liste kurmadan sayar ve sınırı geçince durur."""
+    return next(islice(_SOZCUK.finditer(metin), sinir, None), None) is not None
 
 
-def akilli_test_analizi_yap(tum_sonuclar: list, rapor_klasoru: str):
+class AkilliAnalizBiriktirici:
     """
-    🧠 Test sonuçlarını akıllıca analiz eder ve iyileştirme önerileri sunar
+    Akıllı test analizinin istatistiklerini sonuçlar geldikçe tek geçişte
+    biriktirir; ham metinler saklanmaz. `analiz_verileri()` çalıştırmanın
+    herhangi bir anında `akilli_test_analizi_yap` ile aynı rapor sözlüğünü
+    üretir, böylece uzun toplu çalıştırmalarda ara raporlar yazılabilir.
     """
-    logging.info("🧠 AKILLI TEST ANALİZİ BAŞLATILIYOR...")
-    
-    # Analiz verilerini topla
-    analiz_verileri = {
-        'toplam_fatura': len(tum_sonuclar),
-        'basarili_alanlar': {},
-        'basarisiz_alanlar': {},
-        'ocr_kalite_analizi': {},
-        'regex_basari_oranlari': {},
-        'hata_turleri': {},
-        'iyilestirme_onerileri': [],
-        'pattern_matching_basari': []
-    }
-    
-    # Kritik alanları tanımla
-    kritik_alanlar = {
-        'fatura_numarasi': 'Fatura Numarası',
-        'fatura_tarihi': 'Fatura Tarihi', 
-        'genel_toplam': 'Genel Toplam',
-        'satici_firma_unvani': 'Satıcı Firma',
-        'alici_tckn': 'Alıcı TCKN',
-        'ettn': 'ETTN'
-    }
-    
-    # Her fatura için analiz yap
-    for sonuc in tum_sonuclar:
+
+    def __init__(self):
+        self.toplam_fatura = 0
+        self.basarili_alanlar: Dict[str, int] = {}
+        self.basarisiz_alanlar: Dict[str, int] = {}
+        self.ocr_kalite_analizi: Dict[str, int] = {}
+        self.regex_basari_oranlari: Dict[str, Dict[str, int]] = {}
+        self.hata_turleri = {
+            'ocr_kalitesi_dusuk': 0,
+            'regex_pattern_uyumsuz': 0,
+            'format_farkliligi': 0,
+            'karakter_tanima_hatasi': 0,
+            'yapisal_bozulma': 0
+        }
+        self.pattern_matching_basari: List[dict] = []
+
+    def ekle(self, sonuc: dict) -> None:
         structured_data = sonuc.get('structured', {})
         ocr_stats = sonuc.get('ocr_istatistikleri', {})
         regex_sonuclari = sonuc.get('regex', {})
-        
+        self.toplam_fatura += 1
+
         # OCR kalitesi analizi
-        guven_skoru = ocr_stats.get('ortalama_guven_skoru', '0%')
-        if isinstance(guven_skoru, str):
-            guven_skoru = float(guven_skoru.replace('%', ''))
-        
+        guven_skoru = _guven_skoru(ocr_stats)
         if guven_skoru >= 80:
             kalite_grubu = 'Yüksek'
         elif guven_skoru >= 60:
             kalite_grubu = 'Orta'
         else:
             kalite_grubu = 'Düşük'
-        
-        if kalite_grubu not in analiz_verileri['ocr_kalite_analizi']:
-            analiz_verileri['ocr_kalite_analizi'][kalite_grubu] = 0
-        analiz_verileri['ocr_kalite_analizi'][kalite_grubu] += 1
-        
+        self.ocr_kalite_analizi[kalite_grubu] = self.ocr_kalite_analizi.get(kalite_grubu, 0) + 1
+
         # Alan başarı analizi
-        for alan, aciklama in kritik_alanlar.items():
-            if alan not in analiz_verileri['basarili_alanlar']:
-                analiz_verileri['basarili_alanlar'][alan] = 0
-                analiz_verileri['basarisiz_alanlar'][alan] = 0
-            
-            if structured_data.get(alan):
-                analiz_verileri['basarili_alanlar'][alan] += 1
-            else:
-                analiz_verileri['basarisiz_alanlar'][alan] += 1
-        
+        for alan in KRITIK_ALANLAR:
+            hedef = self.basarili_alanlar if structured_data.get(alan) else self.basarisiz_alanlar
+            self.basarili_alanlar.setdefault(alan, 0)
+            self.basarisiz_alanlar.setdefault(alan, 0)
+            hedef[alan] += 1
+
         # Regex başarı analizi
         for regex_alan, sonuclar in regex_sonuclari.items():
-            if regex_alan not in analiz_verileri['regex_basari_oranlari']:
-                analiz_verileri['regex_basari_oranlari'][regex_alan] = {'bulundu': 0, 'bulunamadi': 0}
-            
-            if sonuclar and len(sonuclar) > 0:
-                analiz_verileri['regex_basari_oranlari'][regex_alan]['bulundu'] += 1
-            else:
-                analiz_verileri['regex_basari_oranlari'][regex_alan]['bulunamadi'] += 1
-        
-        # Pattern Matching Başarı Analizi
-        pattern_basari = pattern_matching_basari_analizi(sonuc)
-        if 'pattern_matching_basari' not in analiz_verileri:
-            analiz_verileri['pattern_matching_basari'] = []
-        analiz_verileri['pattern_matching_basari'].append(pattern_basari)
-    
-    # Başarı oranlarını hesapla
-    basari_oranlari = {}
-    for alan in kritik_alanlar:
-        toplam = analiz_verileri['basarili_alanlar'][alan] + analiz_verileri['basarisiz_alanlar'][alan]
-        if toplam > 0:
-            oran = (analiz_verileri['basarili_alanlar'][alan] / toplam) * 100
-            basari_oranlari[alan] = f"{oran:.1f}%"
-    
-    # Hata türlerini analiz et
-    hata_analizi = hata_turlerini_analiz_et(tum_sonuclar)
-    analiz_verileri['hata_turleri'] = hata_analizi
-    
-    # İyileştirme önerileri oluştur
-    iyilestirme_onerileri = iyilestirme_onerileri_olustur(basari_oranlari, hata_analizi, analiz_verileri)
-    analiz_verileri['iyilestirme_onerileri'] = iyilestirme_onerileri
-    
+            sayac = self.regex_basari_oranlari.setdefault(regex_alan, {'bulundu': 0, 'bulunamadi': 0})
+            sayac['bulundu' if sonuclar else 'bulunamadi'] += 1
+
+        self.pattern_matching_basari.append(pattern_matching_basari_analizi(sonuc))
+
+        # Hata türleri
+        if guven_skoru < 60:
+            self.hata_turleri['ocr_kalitesi_dusuk'] += 1
+        if sum(1 for alan in HATA_ANALIZI_ALANLARI if not structured_data.get(alan)) >= 2:
+            self.hata_turleri['regex_pattern_uyumsuz'] += 1
+        ham_metin = ocr_stats.get('ham_metin', '')
+        if ' - ' in ham_metin or ' | ' in ham_metin:
+            self.hata_turleri['format_farkliligi'] += 1
+        if '©' in ham_metin or '®' in ham_metin or '™' in ham_metin:
+            self.hata_turleri['karakter_tanima_hatasi'] += 1
+        if _sozcuk_sayisi_asar(ham_metin, YAPISAL_BOZULMA_SOZCUK_SINIRI):
+            self.hata_turleri['yapisal_bozulma'] += 1
+
+    def basari_oranlari(self) -> Dict[str, str]:
+        basari_oranlari = {}
+        for alan, basarili in self.basarili_alanlar.items():
+            toplam = basarili + self.basarisiz_alanlar[alan]
+            if toplam > 0:
+                basari_oranlari[alan] = f"{(basarili / toplam) * 100:.1f}%"
+        return basari_oranlari
+
+    def analiz_verileri(self) -> dict:
+        """Anlık rapor sözlüğü; biriktiricinin iç durumundan bağımsız bir kopyadır."""
+        analiz_verileri = {
+            'toplam_fatura': self.toplam_fatura,
+            'basarili_alanlar': dict(self.basarili_alanlar),
+            'basarisiz_alanlar': dict(self.basarisiz_alanlar),
+            'ocr_kalite_analizi': dict(self.ocr_kalite_analizi),
+            'regex_basari_oranlari': {k: dict(v) for k, v in self.regex_basari_oranlari.items()},
+            'hata_turleri': dict(self.hata_turleri),
+            'iyilestirme_onerileri': [],
+            'pattern_matching_basari': list(self.pattern_matching_basari)
+        }
+        analiz_verileri['iyilestirme_onerileri'] = iyilestirme_onerileri_olustur(
+            self.basari_oranlari(), analiz_verileri['hata_turleri'], analiz_verileri)
+        return analiz_verileri
+
+
+def akilli_test_analizi_yap(tum_sonuclar: Iterable[dict], rapor_klasoru: str):
+    """
+    🧠 Test sonuçlarını akıllıca analiz eder ve iyileştirme önerileri sunar
+    """
+    logging.info("🧠 AKILLI TEST ANALİZİ BAŞLATILIYOR...")
+    biriktirici = AkilliAnalizBiriktirici()
+    for sonuc in tum_sonuclar:
+        biriktirici.ekle(sonuc)
+    analiz_verileri = biriktirici.analiz_verileri()
+
     # Analiz raporunu yazdır
-    akilli_analiz_raporu_yazdir(analiz_verileri, basari_oranlari)
-    
+    akilli_analiz_raporu_yazdir(analiz_verileri, biriktirici.basari_oranlari())
+
     # Detaylı analiz raporunu kaydet
     akilli_analiz_raporu_kaydet(analiz_verileri, rapor_klasoru)
-    
+
     return analiz_verileri
 
-def hata_turlerini_analiz_et(tum_sonuclar: list) -> dict:
+def akilli_analiz_raporla(biriktirici: AkilliAnalizBiriktirici, rapor_klasoru: str, ara_rapor: bool = False) -> None:
+    """
+    Toplu modda biriktiriciden JSON ve HTML raporlarını yazar. Ara raporlar
+    sabit adlı dosyaların üzerine yazılır ve ekrana basılmaz.
+    """
+    if not biriktirici.toplam_fatura:
+        return
+    analiz_verileri = biriktirici.analiz_verileri()
+    if not ara_rapor:
+        akilli_analiz_raporu_yazdir(analiz_verileri, biriktirici.basari_oranlari())
+    akilli_analiz_raporu_kaydet(analiz_verileri, rapor_klasoru, ara_rapor)
+    akilli_analiz_html_kaydet(analiz_verileri, rapor_klasoru, ara_rapor)
+
+def hata_turlerini_analiz_et(tum_sonuclar: Iterable[dict]) -> dict:
     """
     🔍 Hata türlerini kategorize eder ve analiz eder
     """
-    hata_turleri = {
-        'ocr_kalitesi_dusuk': 0,
-        'regex_pattern_uyumsuz': 0,
-        'format_farkliligi': 0,
-        'karakter_tanima_hatasi': 0,
-        'yapisal_bozulma': 0
-    }
-    
+    biriktirici = AkilliAnalizBiriktirici()
     for sonuc in tum_sonuclar:
-        structured_data = sonuc.get('structured', {})
-        ocr_stats = sonuc.get('ocr_istatistikleri', {})
-        regex_sonuclari = sonuc.get('regex', {})
-        
-        # OCR kalitesi düşük
-        guven_skoru = ocr_stats.get('ortalama_guven_skoru', '0%')
-        if isinstance(guven_skoru, str):
-            guven_skoru = float(guven_skoru.replace('%', ''))
-        
-        if guven_skoru < 60:
-            hata_turleri['ocr_kalitesi_dusuk'] += 1
-        
-        # Regex pattern uyumsuzluğu
-        eksik_alanlar = []
-        for alan in ['fatura_numarasi', 'fatura_tarihi', 'genel_toplam']:
-            if not structured_data.get(alan):
-                eksik_alanlar.append(alan)
-        
-        if len(eksik_alanlar) >= 2:
-            hata_turleri['regex_pattern_uyumsuz'] += 1
-        
-        # Format farklılığı
-        ham_metin = ocr_stats.get('ham_metin', '')
-        if ' - ' in ham_metin or ' | ' in ham_metin:
-            hata_turleri['format_farkliligi'] += 1
-        
-        # Karakter tanıma hatası
-        if '©' in ham_metin or '®' in ham_metin or '™' in ham_metin:
-            hata_turleri['karakter_tanima_hatasi'] += 1
-        
-        # Yapısal bozulma
-        if len(ham_metin.split()) > 500:  # Çok uzun metin
-            hata_turleri['yapisal_bozulma'] += 1
-    
-    return hata_turleri
+        biriktirici.ekle(sonuc)
+    return biriktirici.hata_turleri
 
 def iyilestirme_onerileri_olustur(basari_oranlari: dict, hata_analizi: dict, analiz_verileri: dict) -> list:
     """
@@ -461,22 +681,32 @@ def akilli_analiz_raporu_yazdir(analiz_verileri: dict, basari_oranlari: dict):
                 dosya_adi = os.path.basename(fatura['dosya'])
                 logging.info(f"     {dosya_adi}: %{fatura['basari_orani']:.1f}")
 
-def akilli_analiz_raporu_kaydet(analiz_verileri: dict, rapor_klasoru: str):
+def _rapor_yolu(rapor_klasoru: str, ad: str, uzanti: str, ara_rapor: bool) -> str:
+    """Son raporlar zaman damgalı, ara raporlar her seferinde üzerine yazılan `<ad>_ara` dosyalarıdır."""
+    ek = 'ara' if ara_rapor else datetime.now().strftime('%Y%m%d_%H%M%S')
+    return os.path.join(rapor_klasoru, f"{ad}_{ek}.{uzanti}")
+
+def _raporu_yaz(yol: str, icerik: str) -> None:
+    # Geçici dosya + os.replace: ara rapor okunurken yarım dosya görülmesin
+    gecici = yol + '.tmp'
+    with open(gecici, 'w', encoding='utf-8') as f:
+        f.write(icerik)
+    os.replace(gecici, yol)
+
+def akilli_analiz_raporu_kaydet(analiz_verileri: dict, rapor_klasoru: str, ara_rapor: bool = False):
     """
     💾 Akıllı analiz raporunu dosyaya kaydeder
     """
-    rapor_dosyasi = os.path.join(rapor_klasoru, f"akilli_analiz_raporu_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-    
-    with open(rapor_dosyasi, 'w', encoding='utf-8') as f:
-        json.dump(analiz_verileri, f, ensure_ascii=False, indent=4)
-    
-    logging.info(f"💾 Akıllı analiz raporu kaydedildi: {rapor_dosyasi}")
+    rapor_dosyasi = _rapor_yolu(rapor_klasoru, 'akilli_analiz_raporu', 'json', ara_rapor)
+    _raporu_yaz(rapor_dosyasi, json.dumps(analiz_verileri, ensure_ascii=False, indent=4))
+    if not ara_rapor:
+        logging.info(f"💾 Akıllı analiz raporu kaydedildi: {rapor_dosyasi}")
 
-def akilli_analiz_html_kaydet(analiz_verileri: dict, rapor_klasoru: str):
+def akilli_analiz_html_kaydet(analiz_verileri: dict, rapor_klasoru: str, ara_rapor: bool = False):
     """
     Akıllı analiz özetini basit bir HTML olarak kaydeder.
     """
-    html_yolu = os.path.join(rapor_klasoru, f"akilli_analiz_ozet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html")
+    html_yolu = _rapor_yolu(rapor_klasoru, 'akilli_analiz_ozet', 'html', ara_rapor)
 
     # Başarı oranlarını hesapla
     basarili = analiz_verileri.get('basarili_alanlar', {})
@@ -516,10 +746,9 @@ def akilli_analiz_html_kaydet(analiz_verileri: dict, rapor_klasoru: str):
     </body></html>
     """
 
-    with open(html_yolu, 'w', encoding='utf-8') as f:
-        f.write(html)
-
-    logging.info(f"📄 HTML özet oluşturuldu: {html_yolu}")
+    _raporu_yaz(html_yolu, html)
+    if not ara_rapor:
+        logging.info(f"📄 HTML özet oluşturuldu: {html_yolu}")
 
 from utils import norm_amount as _norm_amount, norm_date as _norm_date
 
@@ -594,10 +823,7 @@ def hata_turu_tespit_et(eksik_alanlar: list, ocr_stats: dict, regex_sonuclari: d
     """
     🔍 Tek bir fatura için hata türünü tespit eder
     """
-    guven_skoru = ocr_stats.get('ortalama_guven_skoru', '0%')
-    if isinstance(guven_skoru, str):
-        guven_skoru = float(guven_skoru.replace('%', ''))
-    
+    guven_skoru = _guven_skoru(ocr_stats)
     ham_metin = ocr_stats.get('ham_metin', '')
     
     # OCR kalitesi düşük
@@ -617,7 +843,7 @@ def hata_turu_tespit_et(eksik_alanlar: list, ocr_stats: dict, regex_sonuclari: d
         return "Karakter Tanıma Hatası"
     
     # Yapısal bozulma
-    if len(ham_metin.split()) > 500:
+    if _sozcuk_sayisi_asar(ham_metin, YAPISAL_BOZULMA_SOZCUK_SINIRI):
         return "Yapısal Bozulma"
     
     return "Bilinmeyen Hata"
@@ -665,7 +891,7 @@ def pattern_matching_basari_analizi(sonuc: dict) -> dict:
     regex_sonuclari = sonuc.get('regex', {})
     
     # Kritik alanlar için pattern matching başarısı
-    kritik_alanlar = ['fatura_numarasi', 'fatura_tarihi', 'genel_toplam']
+    kritik_alanlar = HATA_ANALIZI_ALANLARI
     pattern_basari = {
         'dosya': sonuc.get('dosya', ''),
         'toplam_alan': len(kritik_alanlar),
@@ -702,28 +928,46 @@ def pattern_matching_basari_analizi(sonuc: dict) -> dict:
     return pattern_basari
 
 if __name__ == "__main__":
+    import argparse
     multiprocessing.freeze_support() # Windows için
-    # Tek bir dosyayı test etmek için bu bölümü kullan
-    tek_dosya_yolu = r"27.08.2025_Gelen Fatura (1)/05.07.2025-NYS2025000000188.pdf"
+
+    parser = argparse.ArgumentParser(description="Akıllı Fatura Tanıma - komut satırı")
+    parser.add_argument('--dosya', help="Yalnızca bu dosyayı analiz et (toplu mod yerine)")
+    parser.add_argument('--cikti', help="Toplu modda JSONL sonuç dosyası (varsayılan: <rapor_klasoru>/toplu_sonuclar.jsonl)")
+    parser.add_argument('--kalem-yontemi', choices=KALEM_CIKARIM_YONTEMLERI,
+                        help="Ürün kalemi çıkarım yöntemi (config.json'daki kalem_cikarim_yontemi değerini ezer)")
+    parser.add_argument('--metrikler', action='store_true', help="Tek dosya modunda aşama sürelerini de göster")
+    parser.add_argument('--profil', metavar='KLASOR', help="Her belge için cProfile dökümünü bu klasöre yaz")
+    parser.add_argument('--disa-aktar', metavar='ARSIV',
+                        help="Ham çıkarımı (kelime kutuları, kalemler, metin) JSONL arşivine yaz (.gz ise sıkıştırılır); "
+                             "--dosya yoksa fatura klasörünün tamamı")
+    parser.add_argument('--bicim', choices=CIKTI_BICIMLERI,
+                        help="JSONL'in yanına sabit şemalı sonuç ve kalem tabloları da yaz (config.json'daki cikti_bicimi değerini ezer)")
+    parser.add_argument('--hizli-test', metavar='ARSIV',
+                        help="Arşivdeki kayıtları PDF açmadan yalnızca desen aşamasıyla yeniden işle (sonuçlar --cikti'ya)")
+    args = parser.parse_args()
+    degisiklikler = {'kalem_cikarim_yontemi': args.kalem_yontemi} if args.kalem_yontemi else {}
+    if args.metrikler:
+        degisiklikler['metrikler'] = True
+    if args.profil:
+        degisiklikler['profil_klasoru'] = args.profil
+    if args.bicim:
+        degisiklikler['cikti_bicimi'] = args.bicim
 
     # Proje ana dizinini bu dosyanın konumuna göre al
     PROJE_DIZINI = os.path.dirname(os.path.abspath(__file__))
     config_dosya_yolu = os.path.join(PROJE_DIZINI, 'config.json')
-    
-    # Tesseract yolunu config'den al
-    tesseract_path = None
-    try:
-        with open(config_dosya_yolu, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        tesseract_path = config.get('tesseract_cmd_path')
-    except FileNotFoundError:
-        logging.warning(f"config.json bulunamadı: {config_dosya_yolu}")
 
-    analiz_motoru = FaturaAnalizMotoru(tesseract_cmd_path=tesseract_path)
-    
-    logging.info(f"Tek dosya analizi başlatılıyor: {tek_dosya_yolu}")
-    sonuclar = analiz_motoru.analiz_et(tek_dosya_yolu)
-    
-    logging.info("--- ANALİZ SONUÇLARI ---")
-    logging.info(json.dumps(sonuclar.get('yapilandirilmis_veri'), indent=2, ensure_ascii=False))
-    logging.info("Debug görseli 'test_reports/debug_images' klasörüne kaydedildi.")
+    if args.hizli_test:
+        hizli_test_calistir(args.hizli_test, args.cikti, {**(ayarları_yukle() or {}), **degisiklikler})
+    elif args.disa_aktar:
+        ayarlar = {**(ayarları_yukle() or {}), **degisiklikler}
+        kaynak = args.dosya or ayarlar.get('klasor_yollari', {}).get('fatura_klasoru', 'ornek_faturalar')
+        ocr_metnini_disa_aktar(kaynak, args.disa_aktar, ayarlar)
+    elif args.dosya:
+        tek_dosya_analizi(args.dosya, config_dosya_yolu, degisiklikler)
+    else:
+        ayarlar = ayarları_yukle()
+        if ayarlar is not None:
+            ayarlar.update(degisiklikler)
+            ana_analiz_süreci(ayarlar, sonuc_dosyasi=args.cikti)
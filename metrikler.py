@@ -0,0 +1,120 @@
+import os
+import time
+import cProfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Aşama sürelerinin özetlendiği yüzdelikler
+YUZDELIKLER = (50, 95, 99)
+
+
+class AsamaSureleri:
+    """
+    Tek bir belgenin aşama sürelerini (perf_counter) toplar. Aynı aşama
+    birden çok kez ölçülürse (ör. her sayfada bloklama) süreler toplanır.
+    OCR iş parçacıkları da yazabildiğinden ekleme kilitlidir.
+    """
+
+    def __init__(self):
+        self.sureler: Dict[str, float] = {}
+        self._kilit = threading.Lock()
+        self._baslangic = time.perf_counter()
+
+    def ekle(self, asama: str, sure: float) -> None:
+        with self._kilit:
+            self.sureler[asama] = self.sureler.get(asama, 0.0) + sure
+
+    @contextmanager
+    def olc(self, asama: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ekle(asama, time.perf_counter() - t)
+
+    def sozluk(self) -> Dict[str, float]:
+        """Sonuca eklenen `metrics` değeri: aşama -> milisaniye, ayrıca 'toplam'."""
+        with self._kilit:
+            ms = {asama: round(sure * 1000, 3) for asama, sure in self.sureler.items()}
+        ms['toplam'] = round((time.perf_counter() - self._baslangic) * 1000, 3)
+        return ms
+
+
+class _OlcumYok:
+    """Metrikler kapalıyken kullanılan, hiçbir şey ölçmeyen yer tutucu."""
+
+    def ekle(self, asama: str, sure: float) -> None:
+        pass
+
+    @contextmanager
+    def olc(self, asama: str) -> Iterator[None]:
+        yield
+
+
+OLCUM_YOK = _OlcumYok()
+
+
+def yuzdelik(sirali: List[float], p: float) -> float:
+    """Sıralı listede en yakın sıra yöntemiyle p. yüzdelik."""
+    if not sirali:
+        return 0.0
+    sira = max(0, min(len(sirali) - 1, int(-(-p * len(sirali) // 100)) - 1))
+    return sirali[sira]
+
+
+class SureHistogrami:
+    """
+    Belgelerin `metrics` sözlüklerini biriktirir ve aşama başına adet,
+    ortalama, p50/p95/p99 ve en büyük süreyi (ms) özetler.
+    """
+
+    def __init__(self):
+        self._degerler: Dict[str, List[float]] = {}
+
+    def ekle(self, metrics: Optional[Dict[str, float]]) -> None:
+        for asama, ms in (metrics or {}).items():
+            self._degerler.setdefault(asama, []).append(float(ms))
+
+    def __len__(self) -> int:
+        return len(self._degerler.get('toplam', ()))
+
+    def ozet(self) -> Dict[str, Dict[str, float]]:
+        ozet = {}
+        for asama, degerler in self._degerler.items():
+            sirali = sorted(degerler)
+            satir = {'adet': len(sirali), 'ortalama': round(sum(sirali) / len(sirali), 3)}
+            for p in YUZDELIKLER:
+                satir[f'p{p}'] = round(yuzdelik(sirali, p), 3)
+            satir['maks'] = round(sirali[-1], 3)
+            ozet[asama] = satir
+        # En pahalı aşamalar başta
+        return dict(sorted(ozet.items(), key=lambda kv: kv[1]['ortalama'], reverse=True))
+
+    def tablo(self) -> str:
+        """Loglamak için düz metin özet tablosu."""
+        satirlar = [f"{'aşama':<20}{'adet':>7}{'ort':>10}" + "".join(f"{f'p{p}':>10}" for p in YUZDELIKLER) + f"{'maks':>10}"]
+        for asama, s in self.ozet().items():
+            satirlar.append(f"{asama:<20}{s['adet']:>7}{s['ortalama']:>10.1f}"
+                            + "".join(f"{s[f'p{p}']:>10.1f}" for p in YUZDELIKLER) + f"{s['maks']:>10.1f}")
+        return "\n".join(satirlar)
+
+
+@contextmanager
+def profille(klasor: Optional[str], ad: str) -> Iterator[None]:
+    """
+    `klasor` verilmişse bloğu cProfile ile çalıştırır ve istatistikleri
+    `<klasor>/<ad>.prof` dosyasına yazar (snakeviz / pstats ile açılabilir).
+    """
+    if not klasor:
+        yield
+        return
+    profil = cProfile.Profile()
+    profil.enable()
+    try:
+        yield
+    finally:
+        profil.disable()
+        os.makedirs(klasor, exist_ok=True)
+        guvenli_ad = "".join(c if c.isalnum() or c in '._-' else '_' for c in ad)
+        profil.dump_stats(os.path.join(klasor, f"{guvenli_ad}.prof"))
@@ -0,0 +1,367 @@
+import os
+import json
+import time
+import uuid
+import signal
+import asyncio
+import logging
+import multiprocessing
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from isci_havuzu import isci_baslat, isci_motoru, desenleri_serilestir, isci_ocr_sayisi
+
+VARSAYILAN_SERVIS_AYARLARI = {
+    'host': '127.0.0.1',
+    'port': 8765,
+    'isci_sayisi': 0,           # 0 = CPU sayısı
+    'kuyruk_boyutu': 256,       # dolunca yeni yüklemeler 429 ile reddedilir
+    'is_zaman_asimi_sn': 120,
+    'max_yukleme_mb': 25,
+    'sonuc_saklama_sn': 900,    # tamamlanan işler bu süre sonra bellekten silinir
+}
+SON_DURUMLAR = ('tamamlandi', 'hata', 'zaman_asimi')
+HTTP_DURUMLARI = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                  411: 'Length Required', 413: 'Payload Too Large', 415: 'Unsupported Media Type',
+                  429: 'Too Many Requests', 500: 'Internal Server Error'}
+
+
+def isi_calistir(icerik: bytes, dosya_adi: str) -> Dict[str, Any]:
+    """Süreç havuzunda çalışan görev: işçinin motoruyla içeriği bellekten analiz eder."""
+    return isci_motoru().analiz_et(icerik, dosya_adi=dosya_adi)
+
+
+def _isci_pid_kaydet(pid: Any, *havuz_ayarlari) -> None:
+    """Havuz `initializer`'ı: işçinin PID'ini paylaşılan değere yazar, ardından motoru kurar."""
+    pid.value = os.getpid()
+    isci_baslat(*havuz_ayarlari)
+
+
+class Is:
+    """Kuyruktaki tek bir analiz işi. Durum her değiştiğinde bekleyen akışlar uyandırılır."""
+
+    def __init__(self, dosya_adi: str, icerik: bytes):
+        self.id = uuid.uuid4().hex
+        self.dosya_adi = dosya_adi
+        self.icerik: Optional[bytes] = icerik
+        self.durum = 'kuyrukta'
+        self.sonuc: Optional[Dict[str, Any]] = None
+        self.hata: Optional[str] = None
+        self.olusturma = time.time()
+        self.bitis: Optional[float] = None
+        self._olay = asyncio.Event()
+
+    def durumu_guncelle(self, durum: str, sonuc: Optional[Dict] = None, hata: Optional[str] = None) -> None:
+        self.durum, self.sonuc, self.hata = durum, sonuc, hata
+        if durum in SON_DURUMLAR:
+            self.bitis = time.time()
+        eski, self._olay = self._olay, asyncio.Event()
+        eski.set()
+
+    async def degisiklik_bekle(self) -> None:
+        await self._olay.wait()
+
+    def sozluk(self) -> Dict[str, Any]:
+        veri = {'is_id': self.id, 'dosya': self.dosya_adi, 'durum': self.durum}
+        if self.sonuc is not None:
+            veri['sonuc'] = self.sonuc
+        if self.hata is not None:
+            veri['hata'] = self.hata
+        return veri
+
+
+class AnalizServisi:
+    """
+    Fatura yüklemelerini kabul eden asyncio tabanlı yerel HTTP servisi.
+
+    Yüklenen dosya diske yazılmadan, bellekte sınırlı bir kuyruğa konur
+    (en fazla `kuyruk_boyutu` x `max_yukleme_mb`); kuyruk doluysa istemciye 429 döner (geri basınç). Kuyruk,
+    işçi sayısı kadar dağıtıcı görev tarafından motorlara aktarılır. Her
+    dağıtıcının tek süreçli kendi havuzu vardır: zaman aşımına uğrayan
+    (ör. takılan Tesseract) ya da çöken iş yalnızca o süreci öldürür ve
+    süreç yeniden kurulur; diğer işler etkilenmez.
+
+    Uç noktalar:
+      POST /isler?dosya_adi=fatura.pdf   gövde: dosyanın ham baytları -> 202 {is_id}
+      GET  /isler/<id>                   işin durumu ve (bittiyse) sonucu
+      GET  /isler/<id>/akis              durum değişiklikleri, NDJSON akışı olarak
+      GET  /saglik                       kuyruk ve işçi durumu
+    """
+
+    def __init__(self, ayarlar: Optional[Dict] = None):
+        self.logger = logging.getLogger(__name__)
+        self.ayarlar = ayarlar or {}
+        servis_ayarlari = {**VARSAYILAN_SERVIS_AYARLARI, **(self.ayarlar.get('servis') or {})}
+        self.host = servis_ayarlari['host']
+        self.port = int(servis_ayarlari['port'])
+        self.isci_sayisi = int(servis_ayarlari['isci_sayisi']) or os.cpu_count() or 1
+        self.kuyruk_boyutu = int(servis_ayarlari['kuyruk_boyutu'])
+        self.zaman_asimi = float(servis_ayarlari['is_zaman_asimi_sn'])
+        self.max_yukleme = int(float(servis_ayarlari['max_yukleme_mb']) * 1024 * 1024)
+        self.sonuc_saklama = float(servis_ayarlari['sonuc_saklama_sn'])
+        self.desteklenen_formatlar = tuple(f.lower() for f in self.ayarlar.get('desteklenen_formatlar', ['.pdf']))
+        self.isler: Dict[str, Is] = {}
+        self._kuyruk: Optional[asyncio.Queue] = None
+        self._havuz_ayarlari: Optional[tuple] = None
+        self._havuzlar: List[ProcessPoolExecutor] = []
+        # Her havuzun tek işçisinin PID'i; işçi başlarken kendisi yazar (bkz. _isci_pid_kaydet)
+        self._isci_pidleri: List[Any] = []
+        self._gorevler = []
+        self._calisan = 0
+        self.yeniden_baslatilan = 0
+
+    async def baslat(self) -> asyncio.AbstractServer:
+        self._kuyruk = asyncio.Queue(maxsize=self.kuyruk_boyutu)
+        self._havuz_ayarlari = (desenleri_serilestir(), self.ayarlar, None,
+                                {'debug_gorsel': False, 'ocr_isci_sayisi': isci_ocr_sayisi(self.ayarlar, self.isci_sayisi)})
+        havuzlar = [self._havuz_olustur() for _ in range(self.isci_sayisi)]
+        self._havuzlar = [havuz for havuz, _ in havuzlar]
+        self._isci_pidleri = [pid for _, pid in havuzlar]
+        self._gorevler = [asyncio.create_task(self._dagitici(sira)) for sira in range(self.isci_sayisi)]
+        self._gorevler.append(asyncio.create_task(self._eski_isleri_temizle()))
+        sunucu = await asyncio.start_server(self._baglanti, self.host, self.port)
+        self.logger.info(f"Servis http://{self.host}:{self.port} adresinde dinliyor "
+                         f"({self.isci_sayisi} işçi, kuyruk {self.kuyruk_boyutu})")
+        return sunucu
+
+    async def durdur(self) -> None:
+        for gorev in self._gorevler:
+            gorev.cancel()
+        await asyncio.gather(*self._gorevler, return_exceptions=True)
+        for havuz in self._havuzlar:
+            havuz.shutdown(wait=True, cancel_futures=True)
+        self._havuzlar, self._isci_pidleri = [], []
+
+    # --- İş yürütme ---
+
+    # Süreçte çalıştırılan görev (modül düzeyinde olmalı; süreçlere adıyla gönderilir)
+    is_fonksiyonu = staticmethod(isi_calistir)
+
+    def _havuz_olustur(self) -> Tuple[ProcessPoolExecutor, Any]:
+        """Tek işçili havuzu ve işçinin PID'inin yazılacağı paylaşılan değeri döndürür."""
+        pid = multiprocessing.Value('i', 0, lock=False)
+        havuz = ProcessPoolExecutor(max_workers=1, initializer=_isci_pid_kaydet, initargs=(pid, *self._havuz_ayarlari))
+        return havuz, pid
+
+    def _havuzu_yenile(self, sira: int, oldur: bool = True) -> None:
+        """
+        Dağıtıcının havuzunu kapatıp yenisini kurar. Süreçte çalışan analiz
+        başka türlü kesilemediğinden `oldur` ile işçi süreci öldürülür;
+        çökmüş (BrokenProcessPool) havuzun işçisi zaten sonlanmıştır, PID'i
+        başka bir sürece geçmiş olabileceğinden öldürülmez.
+        """
+        pid = self._isci_pidleri[sira].value
+        if oldur and pid:
+            try:
+                # Windows'ta SIGKILL yoktur; os.kill SIGTERM ile süreci sonlandırır
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError as e:
+                self.logger.warning(f"İşçi süreci sonlandırılamadı (PID {pid}): {e}")
+        self._havuzlar[sira].shutdown(wait=False, cancel_futures=True)
+        self._havuzlar[sira], self._isci_pidleri[sira] = self._havuz_olustur()
+        self.yeniden_baslatilan += 1
+
+    async def _dagitici(self, sira: int) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            is_ = await self._kuyruk.get()
+            self._calisan += 1
+            try:
+                is_.durumu_guncelle('isleniyor')
+                gorev = loop.run_in_executor(self._havuzlar[sira], self.is_fonksiyonu, is_.icerik, is_.dosya_adi)
+                try:
+                    sonuc = await asyncio.wait_for(gorev, self.zaman_asimi)
+                    is_.durumu_guncelle('tamamlandi', sonuc={'dosya': is_.dosya_adi, **sonuc})
+                except asyncio.TimeoutError:
+                    is_.durumu_guncelle('zaman_asimi', hata=f"İş {self.zaman_asimi:g} sn içinde tamamlanmadı")
+                    self.logger.warning(f"İş zaman aşımına uğradı, işçi süreci yeniden başlatılıyor: {is_.id} ({is_.dosya_adi})")
+                    self._havuzu_yenile(sira)
+                except BrokenProcessPool as e:
+                    is_.durumu_guncelle('hata', hata=f"İşçi süreci beklenmedik şekilde sonlandı: {e}")
+                    self.logger.error(f"İşçi süreci çöktü, yeniden başlatılıyor: {is_.id} ({is_.dosya_adi})")
+                    self._havuzu_yenile(sira, oldur=False)
+                except Exception as e:
+                    is_.durumu_guncelle('hata', hata=str(e))
+                    self.logger.error(f"İş başarısız: {is_.id} ({is_.dosya_adi}): {e}")
+            finally:
+                self._calisan -= 1
+                self._kuyruk.task_done()
+                is_.icerik = None
+
+    async def _eski_isleri_temizle(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, min(60.0, self.sonuc_saklama / 4)))
+            sinir = time.time() - self.sonuc_saklama
+            for is_id in [i for i, is_ in self.isler.items() if is_.bitis is not None and is_.bitis < sinir]:
+                del self.isler[is_id]
+
+    def is_ekle(self, dosya_adi: str, icerik: bytes) -> Optional[Is]:
+        """İşi kuyruğa koyar; kuyruk doluysa None döner."""
+        if self._kuyruk.full():
+            return None
+        is_ = Is(dosya_adi, icerik)
+        self.isler[is_.id] = is_
+        self._kuyruk.put_nowait(is_)
+        return is_
+
+    # --- HTTP ---
+
+    async def _baglanti(self, okuyucu: asyncio.StreamReader, yazici: asyncio.StreamWriter) -> None:
+        try:
+            istek = await self._istegi_oku(okuyucu)
+            if istek is None:
+                return
+            await self._yonlendir(*istek, yazici)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            self.logger.exception("İstek işlenirken hata")
+            try:
+                await self._yanit(yazici, 500, {'hata': 'Sunucu hatası'})
+            except Exception:
+                pass
+        finally:
+            try:
+                yazici.close()
+                await yazici.wait_closed()
+            except Exception:
+                pass
+
+    async def _istegi_oku(self, okuyucu: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], asyncio.StreamReader]]:
+        istek_satiri = (await okuyucu.readline()).decode('latin-1').strip()
+        if not istek_satiri:
+            return None
+        yontem, hedef, _ = (istek_satiri.split(' ', 2) + ['', ''])[:3]
+        basliklar: Dict[str, str] = {}
+        while True:
+            satir = (await okuyucu.readline()).decode('latin-1')
+            if satir in ('\r\n', '\n', ''):
+                break
+            ad, _, deger = satir.partition(':')
+            basliklar[ad.strip().lower()] = deger.strip()
+        return yontem.upper(), hedef, basliklar, okuyucu
+
+    async def _yonlendir(self, yontem: str, hedef: str, basliklar: Dict[str, str], okuyucu: asyncio.StreamReader,
+                         yazici: asyncio.StreamWriter) -> None:
+        url = urlsplit(hedef)
+        parcalar = [p for p in url.path.split('/') if p]
+        if parcalar == ['saglik'] and yontem == 'GET':
+            await self._yanit(yazici, 200, {'kuyrukta': self._kuyruk.qsize(), 'kuyruk_boyutu': self.kuyruk_boyutu,
+                                            'isleniyor': self._calisan, 'isci_sayisi': self.isci_sayisi,
+                                            'yeniden_baslatilan_isci': self.yeniden_baslatilan,
+                                            'bilinen_is': len(self.isler)})
+        elif parcalar == ['isler']:
+            if yontem != 'POST':
+                await self._yanit(yazici, 405, {'hata': 'Yalnızca POST desteklenir'})
+                return
+            await self._yukleme(parse_qs(url.query), basliklar, okuyucu, yazici)
+        elif len(parcalar) in (2, 3) and parcalar[0] == 'isler' and yontem == 'GET':
+            is_ = self.isler.get(parcalar[1])
+            if is_ is None:
+                await self._yanit(yazici, 404, {'hata': 'İş bulunamadı'})
+            elif len(parcalar) == 3 and parcalar[2] == 'akis':
+                await self._akis(is_, yazici)
+            elif len(parcalar) == 2:
+                await self._yanit(yazici, 200, is_.sozluk())
+            else:
+                await self._yanit(yazici, 404, {'hata': 'Bulunamadı'})
+        else:
+            await self._yanit(yazici, 404, {'hata': 'Bulunamadı'})
+
+    async def _yukleme(self, sorgu: Dict[str, list], basliklar: Dict[str, str], okuyucu: asyncio.StreamReader,
+                       yazici: asyncio.StreamWriter) -> None:
+        dosya_adi = os.path.basename((sorgu.get('dosya_adi') or [basliklar.get('x-dosya-adi', '')])[0])
+        if not dosya_adi.lower().endswith(self.desteklenen_formatlar):
+            await self._yanit(yazici, 415, {'hata': f"Desteklenmeyen dosya türü: '{dosya_adi}'",
+                                            'desteklenen_formatlar': list(self.desteklenen_formatlar)})
+            return
+        if 'content-length' not in basliklar:
+            await self._yanit(yazici, 411, {'hata': 'Content-Length gerekli'})
+            return
+        try:
+            uzunluk = int(basliklar['content-length'])
+        except ValueError:
+            await self._yanit(yazici, 400, {'hata': 'Geçersiz Content-Length'})
+            return
+        if uzunluk > self.max_yukleme:
+            await self._yanit(yazici, 413, {'hata': f"Dosya {self.max_yukleme // (1024 * 1024)} MB sınırını aşıyor"})
+            return
+        # Kuyruk doluysa gövde okunmadan reddedilir
+        if self._kuyruk.full():
+            await self._yanit(yazici, 429, {'hata': 'Kuyruk dolu, daha sonra tekrar deneyin'}, {'Retry-After': '5'})
+            return
+        icerik = await okuyucu.readexactly(uzunluk)
+        is_ = self.is_ekle(dosya_adi, icerik)
+        if is_ is None:
+            await self._yanit(yazici, 429, {'hata': 'Kuyruk dolu, daha sonra tekrar deneyin'}, {'Retry-After': '5'})
+            return
+        await self._yanit(yazici, 202, is_.sozluk(), {'Location': f"/isler/{is_.id}"})
+
+    async def _akis(self, is_: Is, yazici: asyncio.StreamWriter) -> None:
+        """İşin durumunu her değişiklikte bir JSON satırı olarak (chunked) gönderir; iş bitince kapanır."""
+        yazici.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+        bekleme: Optional[asyncio.Future] = None
+        try:
+            while True:
+                bekleme = asyncio.ensure_future(is_.degisiklik_bekle())
+                satir = (json.dumps(is_.sozluk(), ensure_ascii=False) + "\n").encode('utf-8')
+                yazici.write(f"{len(satir):x}\r\n".encode('ascii') + satir + b"\r\n")
+                await yazici.drain()
+                if is_.durum in SON_DURUMLAR:
+                    break
+                await bekleme
+            yazici.write(b"0\r\n\r\n")
+            await yazici.drain()
+        finally:
+            # İstemci akış ortasında koparsa (drain ConnectionError) bekleme sızmasın
+            if bekleme is not None:
+                bekleme.cancel()
+
+    async def _yanit(self, yazici: asyncio.StreamWriter, kod: int, govde: Dict[str, Any],
+                     ek_basliklar: Optional[Dict[str, str]] = None) -> None:
+        veri = json.dumps(govde, ensure_ascii=False).encode('utf-8')
+        basliklar = {'Content-Type': 'application/json; charset=utf-8', 'Content-Length': str(len(veri)),
+                     'Connection': 'close', **(ek_basliklar or {})}
+        baslik_metni = "".join(f"{k}: {v}\r\n" for k, v in basliklar.items())
+        yazici.write(f"HTTP/1.1 {kod} {HTTP_DURUMLARI.get(kod, '')}\r\n{baslik_metni}\r\n".encode('latin-1') + veri)
+        await yazici.drain()
+
+
+async def servisi_calistir(ayarlar: Optional[Dict] = None) -> None:
+    servis = AnalizServisi(ayarlar)
+    sunucu = await servis.baslat()
+    try:
+        async with sunucu:
+            await sunucu.serve_forever()
+    finally:
+        await servis.durdur()
+
+
+if __name__ == '__main__':
+    import argparse
+    import multiprocessing
+    multiprocessing.freeze_support()  # Windows için
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="Akıllı Fatura Tanıma - analiz servisi")
+    parser.add_argument('--config', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json'))
+    parser.add_argument('--host', help="Dinlenecek adres (config.json'daki servis.host değerini ezer)")
+    parser.add_argument('--port', type=int, help="Dinlenecek port (config.json'daki servis.port değerini ezer)")
+    args = parser.parse_args()
+
+    ayarlar: Dict[str, Any] = {}
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            ayarlar = json.load(f)
+    except FileNotFoundError:
+        logging.warning(f"config.json bulunamadı: {args.config}; varsayılan ayarlar kullanılacak")
+    servis_ayarlari = dict(ayarlar.get('servis') or {})
+    if args.host: servis_ayarlari['host'] = args.host
+    if args.port: servis_ayarlari['port'] = args.port
+    ayarlar['servis'] = servis_ayarlari
+    try:
+        asyncio.run(servisi_calistir(ayarlar))
+    except KeyboardInterrupt:
+        logging.info("Servis durduruldu.")
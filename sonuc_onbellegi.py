@@ -0,0 +1,129 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Optional, Any, List, Tuple
+
+VARSAYILAN_KLASOR = '.cache/analiz'
+VARSAYILAN_MAX_BOYUT_MB = 512
+
+
+def dosya_ozeti(dosya_yolu: str, parca_boyutu: int = 1 << 20) -> str:
+    """Dosya içeriğinin SHA-256 özetini parça parça okuyarak hesaplar."""
+    h = hashlib.sha256()
+    with open(dosya_yolu, 'rb') as f:
+        for parca in iter(lambda: f.read(parca_boyutu), b''):
+            h.update(parca)
+    return h.hexdigest()
+
+
+def desen_ozeti(patterns: Dict) -> str:
+    """Desen setinin (anahtar sırasından bağımsız) SHA-256 özeti."""
+    kanonik = json.dumps(patterns, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(kanonik.encode('utf-8')).hexdigest()
+
+
+class SonucOnbellegi:
+    """
+    Analiz sonuçları için diskte tutulan, içerik özetine dayalı önbellek.
+
+    Anahtar; dosya baytlarının SHA-256 özeti, desen ve motor ayarlarının özeti ve motor
+    sürümünden oluşur. Kayıtlar `klasor` altında özetin ilk iki karakterine
+    göre alt klasörlere JSON olarak yazılır; yazma atomiktir, bu yüzden aynı
+    klasör CLI, değerlendirme betiği ve Streamlit arayüzü arasında (ve süreç
+    havuzu işçileri arasında) paylaşılabilir. Toplam boyut `max_boyut_mb`
+    aşıldığında en uzun süredir erişilmeyen kayıtlar silinir (LRU; erişim
+    zamanı olarak dosya mtime'ı kullanılır).
+    """
+
+    def __init__(self, klasor: str = VARSAYILAN_KLASOR, max_boyut_mb: float = VARSAYILAN_MAX_BOYUT_MB):
+        self.logger = logging.getLogger(__name__)
+        self.klasor = klasor
+        self.max_boyut = int(max_boyut_mb * 1024 * 1024)
+        os.makedirs(self.klasor, exist_ok=True)
+        # Süreç içi tahmini boyut; sınır aşılınca diskteki gerçek boyut yeniden sayılır
+        self._tahmini_boyut = sum(boyut for _, _, boyut in self._kayitlar())
+
+    @staticmethod
+    def anahtar_olustur(icerik_ozeti: str, desen_ozeti: str, motor_surumu: str) -> str:
+        return hashlib.sha256(f"{icerik_ozeti}:{desen_ozeti}:{motor_surumu}".encode('utf-8')).hexdigest()
+
+    def _yol(self, anahtar: str) -> str:
+        return os.path.join(self.klasor, anahtar[:2], f"{anahtar}.json")
+
+    def getir(self, anahtar: str) -> Optional[Dict[str, Any]]:
+        yol = self._yol(anahtar)
+        try:
+            with open(yol, 'r', encoding='utf-8') as f:
+                kayit = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Önbellek kaydı okunamadı, yok sayılacak: {yol} ({e})")
+            return None
+        try:
+            os.utime(yol, None)  # LRU için erişim zamanını güncelle
+        except OSError:
+            pass
+        return kayit
+
+    def kaydet(self, anahtar: str, sonuc: Dict[str, Any]) -> None:
+        yol = self._yol(anahtar)
+        try:
+            os.makedirs(os.path.dirname(yol), exist_ok=True)
+            fd, gecici = tempfile.mkstemp(dir=os.path.dirname(yol), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(sonuc, f, ensure_ascii=False)
+            # Aynı anahtarın üzerine yazılıyorsa eski kaydın boyutu düşülür
+            try:
+                eski_boyut = os.path.getsize(yol)
+            except OSError:
+                eski_boyut = 0
+            os.replace(gecici, yol)
+            self._tahmini_boyut += os.path.getsize(yol) - eski_boyut
+        except Exception as e:
+            self.logger.warning(f"Önbelleğe yazılamadı: {e}")
+            return
+        if self._tahmini_boyut > self.max_boyut:
+            self._temizle()
+
+    def _kayitlar(self) -> List[Tuple[float, str, int]]:
+        kayitlar = []
+        for kok, _, dosyalar in os.walk(self.klasor):
+            for dosya_adi in dosyalar:
+                if not dosya_adi.endswith('.json'): continue
+                yol = os.path.join(kok, dosya_adi)
+                try:
+                    st = os.stat(yol)
+                except OSError:
+                    continue
+                kayitlar.append((st.st_mtime, yol, st.st_size))
+        return kayitlar
+
+    def _temizle(self) -> None:
+        """Toplam boyut sınırın %90'ının altına inene kadar en eski kayıtları siler."""
+        kayitlar = sorted(self._kayitlar())
+        toplam = sum(boyut for _, _, boyut in kayitlar)
+        hedef = int(self.max_boyut * 0.9)
+        silinen = 0
+        for _, yol, boyut in kayitlar:
+            if toplam <= hedef: break
+            try:
+                os.remove(yol)
+                toplam -= boyut
+                silinen += 1
+            except OSError:
+                continue
+        self._tahmini_boyut = toplam
+        if silinen:
+            self.logger.info(f"Önbellekten {silinen} eski kayıt silindi.")
+
+
+def onbellek_olustur(ayarlar: Optional[Dict]) -> Optional[SonucOnbellegi]:
+    """config.json'daki `onbellek` bölümünden önbellek oluşturur; kapalıysa None döner."""
+    onbellek_ayarlari = (ayarlar or {}).get('onbellek') or {}
+    if not onbellek_ayarlari.get('aktif', False):
+        return None
+    return SonucOnbellegi(onbellek_ayarlari.get('klasor', VARSAYILAN_KLASOR),
+                          onbellek_ayarlari.get('max_boyut_mb', VARSAYILAN_MAX_BOYUT_MB))
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Modüller proje kökünde düz dosyalar olarak durur
+PROJE_DIZINI = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJE_DIZINI not in sys.path:
+    sys.path.insert(0, PROJE_DIZINI)
@@ -0,0 +1,23 @@
+from main import AkilliAnalizBiriktirici, hata_turlerini_analiz_et
+
+
+def test_biriktirici_temel_girdileri_okur():
+    sonuclar = [
+        # Raporlar yalnızca 'structured' ve 'ocr_istatistikleri.ham_metin' alanlarını okur
+        {'dosya': 'a.pdf', 'structured': {'fatura_numarasi': 'A1', 'fatura_tarihi': '01-01-2024'},
+         'ocr_istatistikleri': {'ortalama_guven_skoru': '85%', 'ham_metin': 'SATIR - 1 ©'}},
+        {'dosya': 'b.pdf', 'yapilandirilmis_veri': {'fatura_numarasi': 'B1', 'fatura_tarihi': '02-01-2024'},
+         'ham_metin': 'SATIR | 2 ®'},
+    ]
+    biriktirici = AkilliAnalizBiriktirici()
+    for sonuc in sonuclar:
+        biriktirici.ekle(sonuc)
+    veriler = biriktirici.analiz_verileri()
+
+    assert veriler['basarili_alanlar']['fatura_numarasi'] == 1
+    assert veriler['basarisiz_alanlar']['fatura_numarasi'] == 1
+    assert veriler['hata_turleri']['format_farkliligi'] == 1
+    assert veriler['hata_turleri']['karakter_tanima_hatasi'] == 1
+    assert veriler['hata_turleri']['regex_pattern_uyumsuz'] == 1
+    assert [p['basarili_alan'] for p in veriler['pattern_matching_basari']] == [2, 0]
+    assert hata_turlerini_analiz_et(sonuclar) == veriler['hata_turleri']
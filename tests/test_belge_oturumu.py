@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+import pytest
+
+from belge_oturumu import BelgeOturumu, tiff_sayfa_sayisi
+
+RENKLER = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (128, 128, 128)]
+
+
+@pytest.fixture
+def cok_sayfali_tiff(tmp_path):
+    """Her sayfası farklı düz renkte, 4 sayfalık TIFF."""
+    yol = str(tmp_path / 'tarama.tif')
+    kareler = [np.full((40, 30, 3), renk, dtype=np.uint8) for renk in RENKLER]
+    assert cv2.imwritemulti(yol, kareler)
+    return yol
+
+
+def _renk(kare):
+    return tuple(int(v) for v in kare[0, 0])
+
+
+def test_tiff_sayfalari_yoldan_ve_bellekten_tek_tek_okunur(cok_sayfali_tiff):
+    with open(cok_sayfali_tiff, 'rb') as f:
+        veri = f.read()
+    assert tiff_sayfa_sayisi(veri) == len(RENKLER)
+    for kaynak, ad in ((cok_sayfali_tiff, None), (veri, 'tarama.tif')):
+        with BelgeOturumu(kaynak, dosya_adi=ad) as oturum:
+            assert oturum.goruntu_sayfa_sayisi == len(RENKLER)
+            assert [_renk(oturum._goruntu_karesi(i)) for i in range(len(RENKLER))] == RENKLER
+
+
+def test_opencv_yolu_acamazsa_dosya_bellege_okunmaz(cok_sayfali_tiff, monkeypatch):
+    # ASCII dışı yollarda olduğu gibi imreadmulti başarısız olur
+    monkeypatch.setattr(cv2, 'imreadmulti', lambda *a, **k: (False, []))
+    monkeypatch.setattr(cv2, 'imcount', lambda *a, **k: 0)
+    cozulen = []
+    orijinal = cv2.imdecodemulti
+
+    def sayan(*a, **k):
+        cozulen.append(k.get('range'))
+        return orijinal(*a, **k)
+    monkeypatch.setattr(cv2, 'imdecodemulti', sayan)
+
+    with BelgeOturumu(cok_sayfali_tiff) as oturum:
+        assert oturum.goruntu_sayfa_sayisi == len(RENKLER)
+        assert _renk(oturum._goruntu_karesi(2)) == RENKLER[2]
+        assert oturum.veri is None
+    assert cozulen == []
+    # Kopyalanan bellek eşlemi dosyayı değiştirmez
+    with open(cok_sayfali_tiff, 'rb') as f:
+        assert tiff_sayfa_sayisi(f.read()) == len(RENKLER)
+
+
+def test_range_desteklemeyen_opencv_tum_kareleri_cozmez(cok_sayfali_tiff, monkeypatch):
+    def eski_imdecodemulti(tampon, bayraklar, *a, **k):
+        if 'range' in k:
+            raise TypeError("'range' is an invalid keyword argument")
+        raise AssertionError("tüm kareler çözülmemeli")
+    monkeypatch.setattr(cv2, 'imdecodemulti', eski_imdecodemulti)
+
+    with open(cok_sayfali_tiff, 'rb') as f:
+        veri = f.read()
+    with BelgeOturumu(veri, dosya_adi='tarama.tif') as oturum:
+        assert [_renk(oturum._goruntu_karesi(i)) for i in range(len(RENKLER))] == RENKLER
+        assert oturum._goruntu_karesi(len(RENKLER)) is None
+    assert oturum.veri == veri
@@ -0,0 +1,19 @@
+import random
+
+from capa_eslestirici import CapaEslestirici
+
+
+def test_tara_alt_dizge_eslesmesiyle_ayni():
+    capalar = {'toplamlar': ['Amount Due', 'toplam', 'genel toplam', ''], 'fatura_bilgileri': ['ettn', 'fatura no'],
+               'bos': []}
+    metinler = ['GENEL TOPLAM', 'amount duettn', 'Fatura No: 12', 'toplam', 'yok', '']
+    rastgele = random.Random(3)
+    parcalar = ['amount', ' due', 'ttn', 'e', 'fatura', ' no', 'genel ', 'toplam', 'x']
+    metinler += [''.join(rastgele.choice(parcalar) for _ in range(6)) for _ in range(200)]
+
+    beklenen = {kategori: [i for i, metin in enumerate(metinler)
+                           if any(k.lower() in metin.lower() for k in kelimeler if k)]
+                for kategori, kelimeler in capalar.items()}
+    assert CapaEslestirici(capalar).tara(metinler) == beklenen
+    # Çakışan kelimeler ("amount due" + "ettn") iki kategoriye de düşer
+    assert 1 in beklenen['toplamlar'] and 1 in beklenen['fatura_bilgileri']
@@ -0,0 +1,14 @@
+import csv
+
+from cikti_yazici import SonucYazici
+
+
+def test_csv_ilk_sutun_guven_skoru(tmp_path):
+    temel = str(tmp_path / 'rapor')
+    with SonucYazici(temel, ['fatura_no'], bicim='csv') as yazici:
+        yazici.ekle({'dosya': 'a.pdf', 'ocr_istatistikleri': {'ortalama_guven_skoru': '87.5%'},
+                     'yapilandirilmis_veri': {'fatura_no': 'A1', 'urun_kalemleri': [{'ad': 'kalem'}]}})
+    with open(yazici.dosyalar['sonuclar'], encoding='utf-8-sig') as f:
+        satirlar = list(csv.reader(f))
+    assert satirlar[0] == ['ortalama_guven_skoru', 'dosya', 'hata', 'fatura_no', 'kalem_sayisi']
+    assert satirlar[1] == ['87.5%', 'a.pdf', '', 'A1', '1']
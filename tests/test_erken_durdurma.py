@@ -0,0 +1,57 @@
+import pytest
+
+from belge_oturumu import BelgeOturumu
+from fatura_analiz_motoru import FaturaAnalizMotoru
+from benchmark.sentetik_fatura import fatura_pdf_olustur
+
+
+@pytest.fixture
+def ayristirilan_sayfalar(monkeypatch):
+    """pdfplumber ile kelimeleri gerçekten çıkarılan (önbellekte olmayan) sayfa numaraları."""
+    sayfalar = []
+    orijinal = BelgeOturumu.sayfa_kelimeleri
+
+    def sayan(self, sayfa_no=0):
+        if sayfa_no not in self._kelimeler:
+            sayfalar.append(sayfa_no)
+        return orijinal(self, sayfa_no)
+
+    monkeypatch.setattr(BelgeOturumu, 'sayfa_kelimeleri', sayan)
+    return sayfalar
+
+
+@pytest.mark.parametrize('yontem', ['pdfplumber', 'kelime'])
+def test_erken_durdurma_sonraki_sayfalari_ayristirmaz(tmp_path, ayristirilan_sayfalar, yontem):
+    # Kalemler ve toplamlar ilk iki sayfada, ardından 18 sayfa genel şartlar
+    yol = str(tmp_path / 'ekli.pdf')
+    beklenen = fatura_pdf_olustur(yol, kalem_sayisi=10, sayfa_sayisi=2, ek_sayfa_sayisi=18)
+
+    sonuc = FaturaAnalizMotoru(onbellek=None, kalem_cikarim_yontemi=yontem).analiz_et(yol)
+
+    # İlk sayfa, son sayfa ve toplamların bulunduğu sayfa; ek sayfalar ne alan ne kalem geçişinde okunur
+    assert sorted(ayristirilan_sayfalar) == [0, 1, 19]
+    veri = sonuc['yapilandirilmis_veri']
+    assert veri['odenecek_tutar'] == beklenen['odenecek_tutar']
+    assert len(veri['urun_kalemleri']) == 10
+
+    # Durdurma kapalıyken tüm sayfalar okunur ve alanlar aynıdır
+    ayristirilan_sayfalar.clear()
+    tam = FaturaAnalizMotoru(onbellek=None, kalem_cikarim_yontemi=yontem, erken_durdurma_alanlari=[]).analiz_et(yol)
+    assert sorted(ayristirilan_sayfalar) == list(range(20))
+    assert tam['yapilandirilmis_veri'] == veri
+
+
+def test_kalemler_tum_tablo_sayfalarindan_okunur(tmp_path, ayristirilan_sayfalar):
+    # Kalemler her sayfadaysa erken durdurma kalemleri kesmemeli
+    yol = str(tmp_path / 'uzun.pdf')
+    fatura_pdf_olustur(yol, kalem_sayisi=40, sayfa_sayisi=4)
+    sonuc = FaturaAnalizMotoru(onbellek=None).analiz_et(yol)
+    assert len(sonuc['yapilandirilmis_veri']['urun_kalemleri']) == 40
+    assert sorted(ayristirilan_sayfalar) == [0, 1, 2, 3]
+
+
+def test_varsayilan_durdurma_alanlari_zorunlu_toplamlardir():
+    motor = FaturaAnalizMotoru(onbellek=None)
+    assert 'toplam_iskonto' not in motor.erken_durdurma_alanlari
+    assert 'yazi_ile_tutar' not in motor.erken_durdurma_alanlari
+    assert 'odenecek_tutar' in motor.erken_durdurma_alanlari
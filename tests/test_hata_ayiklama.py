@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from hata_ayiklama import DEBUG_KLASORU
+from isci_havuzu import isci_baslat, desenleri_serilestir
+from main import analyze_file_for_pool
+from benchmark.sentetik_fatura import fatura_pdf_olustur
+
+
+def test_havuz_iscisi_kapanirken_debug_gorselleri_yazilir(tmp_path, monkeypatch):
+    yol = str(tmp_path / 'fatura.pdf')
+    fatura_pdf_olustur(yol)
+    desenler = desenleri_serilestir()
+    monkeypatch.chdir(tmp_path)
+
+    havuz_ayarlari = (desenler, {}, None, {'debug_gorsel': True, 'onbellek': None})
+    with ProcessPoolExecutor(max_workers=1, initializer=isci_baslat, initargs=havuz_ayarlari) as havuz:
+        sonuc = havuz.submit(analyze_file_for_pool, yol).result()
+    assert 'hata' not in sonuc
+
+    # İşçi görevi bitirip döndükten sonra kuyrukta kalan görsel, süreç kapanırken yazılmış olmalı
+    assert os.listdir(tmp_path / DEBUG_KLASORU) == [os.path.basename(sonuc['debug_gorsel_yolu'])]
+
+
+def test_ayni_adli_farkli_yuklemelerin_gorselleri_cakismaz(tmp_path, monkeypatch):
+    from fatura_analiz_motoru import FaturaAnalizMotoru
+    from sonuc_onbellegi import SonucOnbellegi
+
+    birinci, ikinci = tmp_path / 'a.pdf', tmp_path / 'b.pdf'
+    fatura_pdf_olustur(str(birinci), tohum=1)
+    fatura_pdf_olustur(str(ikinci), tohum=2)
+    monkeypatch.chdir(tmp_path)
+
+    onbellek = SonucOnbellegi(str(tmp_path / 'onbellek'))
+    motor = FaturaAnalizMotoru(debug_gorsel=True, onbellek=onbellek)
+    try:
+        # Aynı adla iki ayrı kullanıcıdan gelen yükleme
+        sonuclar = [motor.analiz_et(yol.read_bytes(), dosya_adi='fatura.pdf') for yol in (birinci, ikinci)]
+        motor.hata_ayiklama_bekle()
+    finally:
+        motor.kapat()
+
+    yollar = [s['debug_gorsel_yolu'] for s in sonuclar]
+    assert yollar[0] != yollar[1]
+    assert all(os.path.exists(yol) for yol in yollar)
+    # Debug açıkken önbelleğe bakılmaz, görsel her çalıştırmada yeniden çizilir
+    motor = FaturaAnalizMotoru(debug_gorsel=True, onbellek=onbellek)
+    try:
+        assert motor.analiz_et(birinci.read_bytes(), dosya_adi='fatura.pdf').get('debug_gorsel_yolu')
+        motor.hata_ayiklama_bekle()
+    finally:
+        motor.kapat()
+    # Yol bu çalıştırmaya özgüdür; önbellekten dönen sonuçta yer almaz
+    motor = FaturaAnalizMotoru(onbellek=onbellek)
+    try:
+        assert 'debug_gorsel_yolu' not in motor.analiz_et(birinci.read_bytes(), dosya_adi='fatura.pdf')
+    finally:
+        motor.kapat()
+
+
+def test_goruntu_girdisi_motorun_dpi_varsayimiyla_render_edilir(tmp_path, monkeypatch):
+    import cv2
+    import numpy as np
+    from hata_ayiklama import hata_ayiklama_yazicisi
+
+    monkeypatch.chdir(tmp_path)
+    # 100 DPI varsayılan 300x400 piksellik tarama: 3x4 inç
+    _, png = cv2.imencode('.png', np.full((400, 300, 3), 255, dtype=np.uint8))
+    yazici = hata_ayiklama_yazicisi()
+    yol = yazici.ekle(png.tobytes(), (216.0, 288.0), dosya_adi='tarama.png', goruntu_dpi=100)
+    yazici.bekle()
+    # Sayfa 3x4 inç olarak render edilmeli: 150 DPI'da 450x600
+    assert cv2.imread(yol).shape[:2] == (600, 450)
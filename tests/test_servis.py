@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import asyncio
+
+from servis import AnalizServisi, Is
+
+
+def sahte_is(icerik: bytes, dosya_adi: str):
+    """Süreçte çalışan sahte görev: içeriğe göre takılır, çöker ya da hemen döner."""
+    if icerik == b'asili':
+        time.sleep(60)
+    elif icerik == b'yavas':
+        time.sleep(1.5)
+    elif icerik == b'cokme':
+        os._exit(1)
+    return {'boyut': len(icerik)}
+
+
+class SahteServis(AnalizServisi):
+    is_fonksiyonu = staticmethod(sahte_is)
+
+
+def _servis(**servis_ayarlari) -> SahteServis:
+    ayarlar = {'servis': {'host': '127.0.0.1', 'port': 0, 'isci_sayisi': 1, 'kuyruk_boyutu': 4,
+                          'is_zaman_asimi_sn': 30, 'max_yukleme_mb': 1, **servis_ayarlari}}
+    return SahteServis(ayarlar)
+
+
+async def _istek(port: int, yontem: str, yol: str, govde: bytes = b'', basliklar=None):
+    okuyucu, yazici = await asyncio.open_connection('127.0.0.1', port)
+    if basliklar is None:
+        basliklar = {'Content-Length': str(len(govde))}
+    baslik_metni = "".join(f"{k}: {v}\r\n" for k, v in basliklar.items())
+    yazici.write(f"{yontem} {yol} HTTP/1.1\r\nHost: test\r\n{baslik_metni}\r\n".encode('latin-1') + govde)
+    await yazici.drain()
+    # Yanıt Content-Length ile okunur: çatallanan işçi süreçleri bağlantıyı miras aldığından EOF gelmeyebilir
+    baslik = (await okuyucu.readuntil(b"\r\n\r\n")).decode('latin-1')
+    uzunluk = int(baslik.lower().split('content-length:')[1].split()[0])
+    veri = await okuyucu.readexactly(uzunluk)
+    yazici.close()
+    return int(baslik.split()[1]), json.loads(veri), baslik
+
+
+def _calistir(servis: SahteServis, senaryo):
+    async def ana():
+        sunucu = await servis.baslat()
+        try:
+            await senaryo(sunucu.sockets[0].getsockname()[1])
+        finally:
+            sunucu.close()
+            await servis.durdur()
+    asyncio.run(ana())
+
+
+async def _bitmesini_bekle(port: int, is_id: str, sure: float = 20) -> dict:
+    son = time.monotonic() + sure
+    while time.monotonic() < son:
+        _, durum, _ = await _istek(port, 'GET', f'/isler/{is_id}')
+        if durum['durum'] in ('tamamlandi', 'hata', 'zaman_asimi'):
+            return durum
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"İş {sure} sn içinde bitmedi")
+
+
+def test_desteklenmeyen_tur_415():
+    async def senaryo(port):
+        kod, govde, _ = await _istek(port, 'POST', '/isler?dosya_adi=zararli.exe', b'x')
+        assert kod == 415
+        assert govde['desteklenen_formatlar'] == ['.pdf']
+    _calistir(_servis(), senaryo)
+
+
+def test_content_length_yok_411():
+    async def senaryo(port):
+        kod, _, _ = await _istek(port, 'POST', '/isler?dosya_adi=a.pdf', basliklar={})
+        assert kod == 411
+    _calistir(_servis(), senaryo)
+
+
+def test_buyuk_yukleme_413():
+    async def senaryo(port):
+        # Gövde gönderilmeden yalnızca başlıkla reddedilmeli
+        kod, _, _ = await _istek(port, 'POST', '/isler?dosya_adi=a.pdf',
+                              basliklar={'Content-Length': str(2 * 1024 * 1024)})
+        assert kod == 413
+    _calistir(_servis(), senaryo)
+
+
+def test_kuyruk_dolu_429():
+    async def senaryo(port):
+        kod, ilk, _ = await _istek(port, 'POST', '/isler?dosya_adi=a.pdf', b'yavas')
+        assert kod == 202
+        # İlk iş işçiye geçince kuyrukta tek yer kalır
+        while (await _istek(port, 'GET', '/saglik'))[1]['isleniyor'] == 0:
+            await asyncio.sleep(0.02)
+        kod, _, _ = await _istek(port, 'POST', '/isler?dosya_adi=b.pdf', b'yavas')
+        assert kod == 202
+        kod, _, baslik = await _istek(port, 'POST', '/isler?dosya_adi=c.pdf', b'yavas')
+        assert kod == 429
+        assert 'Retry-After: 5' in baslik
+        assert (await _bitmesini_bekle(port, ilk['is_id']))['durum'] == 'tamamlandi'
+    _calistir(_servis(kuyruk_boyutu=1), senaryo)
+
+
+def test_zaman_asimi_isciyi_yeniden_baslatir():
+    async def senaryo(port):
+        _, asili, _ = await _istek(port, 'POST', '/isler?dosya_adi=a.pdf', b'asili')
+        _, sonraki, _ = await _istek(port, 'POST', '/isler?dosya_adi=b.pdf', b'hizli')
+        assert (await _bitmesini_bekle(port, asili['is_id']))['durum'] == 'zaman_asimi'
+        # Tek işçi takılan işi beklemeye devam etseydi bu iş 60 sn sürerdi
+        sonuc = await _bitmesini_bekle(port, sonraki['is_id'], sure=15)
+        assert sonuc['durum'] == 'tamamlandi'
+        assert sonuc['sonuc']['boyut'] == 5
+        _, saglik, _ = await _istek(port, 'GET', '/saglik')
+        assert saglik['yeniden_baslatilan_isci'] == 1
+    _calistir(_servis(is_zaman_asimi_sn=0.5), senaryo)
+
+
+def test_coken_isci_havuzu_yeniden_kurulur():
+    async def senaryo(port):
+        _, coken, _ = await _istek(port, 'POST', '/isler?dosya_adi=a.pdf', b'cokme')
+        assert (await _bitmesini_bekle(port, coken['is_id']))['durum'] == 'hata'
+        _, sonraki, _ = await _istek(port, 'POST', '/isler?dosya_adi=b.pdf', b'hizli')
+        assert (await _bitmesini_bekle(port, sonraki['is_id'], sure=15))['durum'] == 'tamamlandi'
+    _calistir(_servis(), senaryo)
+
+
+def test_akis_koptugunda_bekleme_iptal_edilir():
+    class KopanYazici:
+        def write(self, veri):
+            pass
+
+        async def drain(self):
+            raise ConnectionResetError
+
+    async def ana():
+        is_ = Is('a.pdf', b'x')
+        try:
+            await AnalizServisi()._akis(is_, KopanYazici())
+        except ConnectionResetError:
+            pass
+        await asyncio.sleep(0)
+        # İş hiç bitmese de akışa ait bekleyen görev kalmamalı
+        bekleyenler = [g for g in asyncio.all_tasks() if 'degisiklik_bekle' in repr(g.get_coro()) and not g.done()]
+        assert bekleyenler == []
+    asyncio.run(ana())
@@ -0,0 +1,24 @@
+from fatura_analiz_motoru import FaturaAnalizMotoru
+from sonuc_onbellegi import SonucOnbellegi
+
+
+def test_ayni_anahtarin_uzerine_yazmak_boyutu_sisirmez(tmp_path):
+    onbellek = SonucOnbellegi(str(tmp_path))
+    for i in range(5):
+        onbellek.kaydet('ab' * 32, {'deger': 'x' * (100 + i)})
+    assert onbellek._tahmini_boyut == sum(boyut for _, _, boyut in onbellek._kayitlar())
+
+
+def test_sonucu_degistiren_ayarlar_anahtara_girer(tmp_path):
+    onbellek = SonucOnbellegi(str(tmp_path))
+    varsayilan = FaturaAnalizMotoru(onbellek=onbellek)
+    ozetler = {
+        varsayilan._ayar_ozeti,
+        FaturaAnalizMotoru(onbellek=onbellek, erken_durdurma_alanlari=[])._ayar_ozeti,
+        FaturaAnalizMotoru(onbellek=onbellek, erken_durdurma_alanlari=['odenecek_tutar'])._ayar_ozeti,
+        FaturaAnalizMotoru(onbellek=onbellek, kalem_cikarim_yontemi='kelime')._ayar_ozeti,
+    }
+    assert len(ozetler) == 4
+    # Alan sırası anahtarı değiştirmez
+    ters = FaturaAnalizMotoru(onbellek=onbellek, erken_durdurma_alanlari=list(reversed(varsayilan.erken_durdurma_alanlari)))
+    assert ters._ayar_ozeti == varsayilan._ayar_ozeti
@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+
+from metrikler import AsamaSureleri
+from utils import preprocess_image, _egim_acisi, EGIM_ESIGI
+
+
+def _sayfa(aci: float = 0.0) -> np.ndarray:
+    """Beyaz zemin üzerinde satır satır metin; `aci` derece döndürülmüş."""
+    img = np.full((1400, 1000, 3), 255, dtype=np.uint8)
+    for i in range(20):
+        cv2.putText(img, f"SATIR {i} MAL HIZMET TOPLAM 1.234,56 TL", (80, 120 + i * 60),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+    if aci:
+        M = cv2.getRotationMatrix2D((500, 700), aci, 1.0)
+        img = cv2.warpAffine(img, M, (1000, 1400), borderValue=(255, 255, 255))
+    return img
+
+
+def _seyrek_sayfa() -> np.ndarray:
+    """Düz A4 sayfa; metin yalnızca sol üst ve sağ alt köşede."""
+    img = np.full((3508, 2480, 3), 255, dtype=np.uint8)
+    cv2.putText(img, "FATURA NO: ABC2024000001", (150, 250), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 4)
+    cv2.putText(img, "ODENECEK TUTAR: 1.234,56 TL", (1300, 3300), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 0, 0), 4)
+    return img
+
+
+def test_skew_egik_sayfayi_duzeltir():
+    egik = _sayfa(4.0)
+    assert abs(_egim_acisi(cv2.cvtColor(egik, cv2.COLOR_BGR2GRAY))) > 3
+    cikti = preprocess_image(egik, 'skew')
+    assert abs(_egim_acisi(cikti)) < EGIM_ESIGI + 0.5
+
+
+def test_auto_seyrek_duz_sayfayi_dondurmez():
+    # Tüm mürekkep üzerinde minAreaRect bu düzende büyük, sahte bir açı verir
+    seyrek = _seyrek_sayfa()
+    assert np.array_equal(preprocess_image(seyrek, 'auto'), preprocess_image(seyrek, 'clean'))
+
+
+def test_adim_sureleri_olcume_eklenir():
+    olcum = AsamaSureleri()
+    preprocess_image(_sayfa(4.0), 'skew', sureler=olcum)
+    assert {'on_isleme_gri', 'on_isleme_gurultu', 'on_isleme_esikleme', 'on_isleme_egim'} <= set(olcum.sureler)
@@ -1,5 +1,8 @@
 import re
+import time
 import logging
+from typing import Any, Dict, Optional
+import numpy as np
 
 
 def norm_amount(value: str) -> str:
@@ -37,52 +40,98 @@ def validate_patterns_structure(patterns: dict, logger: logging.Logger) -> None:
 
 
 # --- Görüntü Ön İşleme Preset'leri ---
-import cv2
-import numpy as np
+# cv2 yalnızca görüntü işlenirken (OCR yolunda) içe aktarılır; dijital PDF
+# analizi ve CLI başlangıcı OpenCV'nin yükleme maliyetini ödemez
+
+# Eğim, uzun kenarı bu boyuta küçültülmüş görüntüde kestirilir
+EGIM_ORNEK_BOYUTU = 1000
+# Bu açının (derece) altındaki eğimler için döndürme yapılmaz
+EGIM_ESIGI = 0.3
+
+
+def _gri(bgr_image: np.ndarray) -> np.ndarray:
+    # Gri/BGR/BGRA girişleri tek seferde griye çevrilir
+    import cv2
+    if bgr_image.ndim == 2:
+        return bgr_image
+    kod = cv2.COLOR_BGRA2GRAY if bgr_image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+    return cv2.cvtColor(bgr_image, kod)
+
+
+def _egim_acisi(gray_image: np.ndarray) -> float:
+    """
+    minAreaRect tabanlı eğrilik kestirimi; mürekkep noktaları tam çözünürlük
+    yerine küçültülmüş görüntüden alınır. Dönen değer görüntüyü düzeltmek
+    için uygulanacak döndürme açısıdır (derece).
+    """
+    import cv2
+    # Tam sayılı küçültme oranı INTER_AREA'nın hızlı yolunu kullanır
+    oran = -(-max(gray_image.shape[:2]) // EGIM_ORNEK_BOYUTU)
+    kucuk = gray_image if oran <= 1 else cv2.resize(gray_image, None, fx=1.0 / oran, fy=1.0 / oran, interpolation=cv2.INTER_AREA)
+    _, murekkep = cv2.threshold(kucuk, 127, 255, cv2.THRESH_BINARY_INV)
+    coords = cv2.findNonZero(murekkep)
+    if coords is None:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    # OpenCV sürümüne göre açı [-90, 0) ya da (0, 90] aralığında döner; (-45, 45]'e katlanır
+    angle = ((angle + 45.0) % 90.0) - 45.0
+    return angle
 
 
 def _deskew_image(gray_image: np.ndarray) -> np.ndarray:
-    # Basit minAreaRect tabanlı eğrilik düzeltme
-    coords = np.column_stack(np.where(gray_image < 255))
-    if coords.size == 0:
+    # Basit minAreaRect tabanlı eğrilik düzeltme; küçük açılarda görüntü aynen döner.
+    # Giriş ikili olduğundan döndürmede doğrusal ara değerleme yeterlidir.
+    import cv2
+    angle = _egim_acisi(gray_image)
+    if abs(angle) < EGIM_ESIGI:
         return gray_image
-    rect = cv2.minAreaRect(coords[:, ::-1])
-    angle = rect[-1]
-    if angle < -45:
-        angle = -(90 + angle)
-    else:
-        angle = -angle
     (h, w) = gray_image.shape[:2]
     M = cv2.getRotationMatrix2D((w // 2, h // 2), angle, 1.0)
-    rotated = cv2.warpAffine(gray_image, M, (w, h), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+    rotated = cv2.warpAffine(gray_image, M, (w, h), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
     return rotated
 
 
-def preprocess_image(bgr_image: np.ndarray, preset: str = 'auto') -> np.ndarray:
-    # Giriş BGR; çıkış ikili/iyileştirilmiş gri olabilir
-    gray = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2GRAY)
-
-    if preset == 'scan':
-        denoised = cv2.medianBlur(gray, 3)
-        _, th = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        opened = cv2.morphologyEx(th, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
-        return opened
-
-    if preset == 'skew':
-        denoised = cv2.medianBlur(gray, 3)
-        _, th = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+def preprocess_image(bgr_image: np.ndarray, preset: str = 'auto', sureler: Optional[Any] = None) -> np.ndarray:
+    """
+    Giriş BGR (ya da gri); çıkış ikili/iyileştirilmiş gri olabilir. Görüntü
+    bir kez griye çevrilir ve adımlar aynı tamponlar üzerinde çalışır.
+    'auto' parlaklığa göre 'scan' ya da 'clean' seçer; döndürme yalnızca
+    'skew' ön ayarında yapılır. `sureler` verilirse (metrikler.AsamaSureleri)
+    adım süreleri `on_isleme_<adım>` olarak eklenir.
+    """
+    import cv2
+    t = time.perf_counter()
+
+    def olc(adim: str) -> None:
+        nonlocal t
+        if sureler is not None:
+            simdi = time.perf_counter()
+            sureler.ekle(f"on_isleme_{adim}", simdi - t)
+            t = simdi
+
+    gray = _gri(bgr_image)
+    olc('gri')
+
+    if preset not in ('scan', 'skew', 'clean'):
+        # auto: basit heuristik
+        preset = 'scan' if cv2.mean(gray)[0] < 140 else 'clean'
+
+    if preset in ('scan', 'skew'):
+        th = cv2.medianBlur(gray, 3)
+        olc('gurultu')
+        cv2.threshold(th, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=th)
+        olc('esikleme')
+        if preset == 'scan':
+            cv2.morphologyEx(th, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8), dst=th)
+            olc('morfoloji')
+            return th
         deskewed = _deskew_image(th)
+        olc('egim')
         return deskewed
 
-    if preset == 'clean':
-        th = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 31, 15)
-        return th
-
-    # auto: basit heuristik
-    mean_intensity = gray.mean()
-    if mean_intensity < 140:
-        return preprocess_image(bgr_image, 'scan')
-    return preprocess_image(bgr_image, 'clean')
+    th = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY, 31, 15)
+    olc('esikleme')
+    return th
 
 
 # --- Guardian Post-Process ---
@@ -0,0 +1,78 @@
+from typing import List, Dict, Tuple
+import numpy as np
+
+# Metin bölgelerinin arandığı önizleme çözünürlüğü: 72 DPI'da 1 piksel = 1 pt
+ONIZLEME_DPI = 72
+# Bölge başına Tesseract sayfa bölütleme kipi. Üst bilgi blokları düzenli metin
+# blokları (6); toplamlar dağınık etiket/tutar çiftleri (11); gövde (kalem
+# tablosu) farklı boyutlu tek sütunlu satırlar (4). Kelime kutuları yeniden
+# satırlara gruplandığından PSM'in okuma sırası sonucu etkilemez.
+BOLGE_PSM = {'satici': 6, 'alici': 6, 'fatura_bilgileri': 6, 'toplamlar': 11, 'govde': 4}
+BOLGE_KENAR_PAYI = 6.0  # pt; kırpımın metin kenarına yapışmaması için
+
+Kutu = Tuple[float, float, float, float]
+
+
+def metin_bolgelerini_bul(goruntu: np.ndarray, dpi: int = ONIZLEME_DPI) -> List[Kutu]:
+    """
+    Düşük çözünürlüklü sayfa görüntüsünde metin içeren bölgeleri bulur (OCR
+    yapmadan). Mürekkep pikselleri yatayda kelime aralığını kapatacak kadar
+    genişletilip bağlı bileşenlere ayrılır. Çok küçük lekeler (gürültü) ile
+    küçük, kareye yakın ve büyük ölçüde dolu bileşenler (logo, damga) atılır.
+    Kutular sayfa biriminde (pt) döner.
+    """
+    import cv2
+    gri = cv2.cvtColor(goruntu, cv2.COLOR_BGR2GRAY) if goruntu.ndim == 3 else goruntu
+    _, ikili = cv2.threshold(gri, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    if cv2.countNonZero(ikili) < 0.001 * ikili.size:
+        return []  # boş sayfa
+    olcek = dpi / 72.0
+    cekirdek = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, int(round(9 * olcek))), max(1, int(round(3 * olcek)))))
+    genis = cv2.dilate(ikili, cekirdek)
+    sayi, _, istatistikler, _ = cv2.connectedComponentsWithStats(genis, connectivity=8)
+    kutular: List[Kutu] = []
+    min_boyut = 4 * olcek
+    for x, y, w, h, _ in istatistikler[1:].tolist():
+        if w < min_boyut or h < min_boyut:
+            continue
+        doluluk = cv2.countNonZero(ikili[y:y + h, x:x + w]) / float(w * h)
+        en_boy = max(w, h) / float(min(w, h))
+        if doluluk > 0.6 and en_boy < 3 and max(w, h) < 200 * olcek:
+            continue  # logo/damga benzeri dolu leke
+        kutular.append((x / olcek, y / olcek, (x + w) / olcek, (y + h) / olcek))
+    return kutular
+
+
+def bolge_adi(cx: float, cy: float, sinirlar: Dict[str, float]) -> str:
+    """Merkezi verilen noktanın bölgesi; `_identify_blocks` ile aynı öncelik sırası."""
+    solda = cx < sinirlar['x_divider']
+    if cy < sinirlar['y_seller_end'] and solda:
+        return 'satici'
+    if cy < sinirlar['y_buyer_info_end']:
+        return 'alici' if solda else 'fatura_bilgileri'
+    if cy > sinirlar['y_totals_start']:
+        return 'toplamlar'
+    return 'govde'
+
+
+def bolge_kirpimlari(kutular: List[Kutu], sinirlar: Dict[str, float], page_size: Tuple[float, float],
+                     kenar_payi: float = BOLGE_KENAR_PAYI) -> List[Tuple[str, Kutu, np.ndarray]]:
+    """
+    Metin bölgelerini merkezlerine göre bölgelere dağıtır ve her bölge için
+    (bölge adı, kırpım kutusu, bölgenin metin kutuları) döndürür. Kırpım,
+    bölgedeki metin kutularının kenar paylı birleşimidir; boş kenar
+    boşlukları ve metin dışı alanlar render/OCR'a girmez.
+    """
+    gruplar: Dict[str, List[Kutu]] = {}
+    for kutu in kutular:
+        gruplar.setdefault(bolge_adi((kutu[0] + kutu[2]) / 2, (kutu[1] + kutu[3]) / 2, sinirlar), []).append(kutu)
+    genislik, yukseklik = page_size
+    sonuc = []
+    for ad in BOLGE_PSM:
+        if ad not in gruplar:
+            continue
+        dizi = np.array(gruplar[ad], dtype=np.float64)
+        kirpim = (max(0.0, float(dizi[:, 0].min()) - kenar_payi), max(0.0, float(dizi[:, 1].min()) - kenar_payi),
+                  min(genislik, float(dizi[:, 2].max()) + kenar_payi), min(yukseklik, float(dizi[:, 3].max()) + kenar_payi))
+        sonuc.append((ad, kirpim, dizi))
+    return sonuc